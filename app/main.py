@@ -0,0 +1,38 @@
+""" Single-process deployment serving the user, todo and time APIs together.
+
+    uvicorn app.main:app
+
+All routers run in one interpreter, so they share one engine and connection pool
+(shared.database.session), one token/user cache and one hashing pool.
+"""
+from fastapi import FastAPI
+from shared.metrics import RequestMetricsMiddleware
+from shared.routes.internal import router as internal_router
+from shared.routes.metrics import router as metrics_router
+from shared.routes.changes import router as changes_router
+from app.user.routes.internal import router as user_internal_router
+from app.user.purge import purge_lifespan
+from app.time.routes.internal import router as time_internal_router
+from app.user.main import users_router
+from app.todo.main import todos_router
+from app.time.main import schedules
+
+app = FastAPI(title="DayFlow", lifespan=purge_lifespan)
+
+app.include_router(users_router, prefix="/users", tags=["users"])
+app.include_router(todos_router)
+app.include_router(schedules.router)
+app.include_router(internal_router)
+app.include_router(metrics_router)
+app.include_router(changes_router)
+app.add_middleware(RequestMetricsMiddleware)
+app.include_router(user_internal_router)
+app.include_router(time_internal_router)
+
+@app.get("/")
+def read_root():
+    return {"service": "DayFlow", "services": ["user", "todo", "time"], "status": "running"}
+
+@app.get("/health")
+def health_check():
+    return {"status": "healthy"}
\ No newline at end of file
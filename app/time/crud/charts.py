@@ -0,0 +1,142 @@
+""" Server-side Plotly charts of logged hours.
+
+Charts are built from the daily rollup plus expanded recurrences, aggregated with pandas
+and rendered with Plotly. Both libraries are imported on first render only, so the
+service starts as fast as before. Rendered charts are kept in a process-local LRU keyed
+by a data-version stamp: the owner's schedule_data_versions counter, which every schedule
+write bumps in its own transaction, plus the recurrence rules' stamp. A write moves the
+stamp, so a stale chart is never served and simply ages out.
+"""
+import importlib.util
+import os
+from datetime import date, timedelta
+from typing import List, Optional
+
+from dotenv import load_dotenv
+from sqlalchemy import Select, func, select
+from sqlalchemy.orm import Session
+
+from app.time.models.rollup import ScheduleDailyRollup, ScheduleDataVersion
+from app.time.crud.recurrence import occurrence_dates, recurrences_between, recurrences_version_columns
+from shared.cache import TTLCache
+
+load_dotenv()
+
+CHART_CACHE_ENABLED = os.getenv("CHART_CACHE_ENABLED", "true").lower() in ("1", "true", "yes")
+CHART_CACHE_SIZE = int(os.getenv("CHART_CACHE_SIZE", "128"))
+# Longer ranges are rendered but not cached, so one wide chart cannot evict the hot ones
+CHART_CACHE_MAX_DAYS = int(os.getenv("CHART_CACHE_MAX_DAYS", "731"))
+
+CHART_KINDS = ("daily", "activities", "weekly")
+CHART_FORMATS = {"json": "application/json", "png": "image/png", "svg": "image/svg+xml"}
+
+# Rendered chart bodies keyed by (kind, format, owner, start, end, version stamp)
+chart_cache = TTLCache(maxsize=CHART_CACHE_SIZE, enabled=CHART_CACHE_ENABLED)
+
+class ChartFormatUnavailable(Exception):
+    """ A static image was requested but the kaleido renderer is not installed """
+
+def chart_version_query(owner_id: Optional[int] = None) -> Select:
+    """ (data version, *recurrence stamp). Without an owner the versions of all owners are
+    summed; each only ever grows, so any write still moves the sum. """
+    version = select(func.coalesce(func.sum(ScheduleDataVersion.version), 0))
+    if owner_id is not None:
+        version = version.where(ScheduleDataVersion.owner_id == owner_id)
+    return select(
+        version.scalar_subquery(),
+        *(select(column).scalar_subquery() for column in recurrences_version_columns()),
+    )
+
+def chart_version(db: Session, owner_id: Optional[int] = None) -> tuple:
+    return tuple(db.execute(chart_version_query(owner_id)).one())
+
+def chart_rows(db: Session, start: date, end: date, owner_id: Optional[int] = None) -> List[tuple]:
+    """ (date, activity, planned, hours) per rollup row in the range, plus one row per
+    recurring occurrence """
+    stmt = select(
+        ScheduleDailyRollup.date, ScheduleDailyRollup.activity, ScheduleDailyRollup.planned, ScheduleDailyRollup.hours,
+    ).where(
+        ScheduleDailyRollup.date >= start,
+        ScheduleDailyRollup.date <= end
+    )
+    if owner_id is not None:
+        stmt = stmt.where(ScheduleDailyRollup.owner_id == owner_id)
+    rows = [tuple(row) for row in db.execute(stmt)]
+    rows.extend(
+        (day, rule.activity, rule.planned is not False, rule.hours)
+        for rule in db.scalars(recurrences_between(start, end, owner_id))
+        for day in occurrence_dates(rule, start, end)
+    )
+    return rows
+
+def check_format(fmt: str):
+    if fmt != "json" and importlib.util.find_spec("kaleido") is None:
+        raise ChartFormatUnavailable(f"Rendering {fmt} charts requires the kaleido package")
+
+def build_chart(kind: str, rows: List[tuple], start: date, end: date, fmt: str = "json") -> bytes:
+    """ Aggregate rows with pandas and render the chart as Plotly figure JSON or an image """
+    import pandas as pd
+    import plotly.graph_objects as go
+
+    frame = pd.DataFrame(rows, columns=["date", "activity", "planned", "hours"])
+    frame["date"] = pd.to_datetime(frame["date"])
+    frame["planned"] = frame["planned"].astype(bool)
+    frame["hours"] = frame["hours"].astype(float)
+
+    if kind == "daily":
+        days = pd.date_range(start, end, freq="D")
+        totals = frame.pivot_table(index="date", columns="planned", values="hours", aggfunc="sum")
+        totals = totals.reindex(index=days, columns=[True, False]).fillna(0.0)
+        figure = go.Figure([
+            go.Bar(name="Planned", x=days, y=totals[True]),
+            go.Bar(name="Actual", x=days, y=totals[False]),
+        ])
+        figure.update_layout(barmode="group", xaxis_title="Date", yaxis_title="Hours", title="Hours per day")
+    elif kind == "activities":
+        totals = frame.groupby("activity")["hours"].sum().sort_values(ascending=False)
+        figure = go.Figure([go.Pie(labels=totals.index, values=totals.to_numpy(), sort=False)])
+        figure.update_layout(title="Hours per activity")
+    elif kind == "weekly":
+        first_week = start - timedelta(days=start.weekday())
+        weeks = pd.date_range(first_week, end, freq="W-MON")
+        frame["week"] = frame["date"] - pd.to_timedelta(frame["date"].dt.weekday, unit="D")
+        totals = frame.pivot_table(index="week", columns="planned", values="hours", aggfunc="sum")
+        totals = totals.reindex(index=weeks, columns=[True, False]).fillna(0.0)
+        figure = go.Figure([
+            go.Scatter(name="Planned", x=weeks, y=totals[True], mode="lines+markers"),
+            go.Scatter(name="Actual", x=weeks, y=totals[False], mode="lines+markers"),
+        ])
+        figure.update_layout(xaxis_title="Week", yaxis_title="Hours", title="Hours per week")
+    else:
+        raise ValueError(f"Unknown chart kind: {kind}")
+
+    if fmt == "json":
+        return figure.to_json().encode("utf-8")
+    check_format(fmt)
+    return figure.to_image(format=fmt)
+
+def chart_cache_key(kind: str, fmt: str, start: date, end: date, owner_id: Optional[int], stamp: tuple) -> tuple:
+    return (kind, fmt, owner_id, start, end, tuple(stamp))
+
+def cache_chart(key: tuple, body: bytes):
+    _, _, _, start, end, _ = key
+    if (end - start).days < CHART_CACHE_MAX_DAYS:
+        chart_cache.set(key, body)
+
+def render_chart(
+    db: Session, kind: str, start: date, end: date, owner_id: Optional[int] = None,
+    fmt: str = "json", stamp: Optional[tuple] = None,
+) -> bytes:
+    """ Rendered chart for the range, served from the cache until the data version moves.
+    Callers that already fetched the stamp (for an ETag) pass it to skip that query. """
+    if start > end:
+        raise ValueError("Start date must be before end date")
+    check_format(fmt)
+    if stamp is None:
+        stamp = chart_version(db, owner_id)
+    key = chart_cache_key(kind, fmt, start, end, owner_id, stamp)
+    body = chart_cache.get(key)
+    if body is None:
+        body = build_chart(kind, chart_rows(db, start, end, owner_id), start, end, fmt)
+        cache_chart(key, body)
+    return body
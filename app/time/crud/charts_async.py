@@ -0,0 +1,29 @@
+from sqlalchemy.ext.asyncio import AsyncSession
+from starlette.concurrency import run_in_threadpool
+from typing import Optional
+from datetime import date
+
+from app.time.crud import charts as crud_charts
+
+# Rows are fetched on the session's connection; the pandas/Plotly render runs in the
+# threadpool so a cold chart does not block the event loop.
+
+async def chart_version(db: AsyncSession, owner_id: Optional[int] = None) -> tuple:
+    return tuple((await db.execute(crud_charts.chart_version_query(owner_id))).one())
+
+async def render_chart(
+    db: AsyncSession, kind: str, start: date, end: date, owner_id: Optional[int] = None,
+    fmt: str = "json", stamp: Optional[tuple] = None,
+) -> bytes:
+    if start > end:
+        raise ValueError("Start date must be before end date")
+    crud_charts.check_format(fmt)
+    if stamp is None:
+        stamp = await chart_version(db, owner_id)
+    key = crud_charts.chart_cache_key(kind, fmt, start, end, owner_id, stamp)
+    body = crud_charts.chart_cache.get(key)
+    if body is None:
+        rows = await db.run_sync(crud_charts.chart_rows, start, end, owner_id)
+        body = await run_in_threadpool(crud_charts.build_chart, kind, rows, start, end, fmt)
+        crud_charts.cache_chart(key, body)
+    return body
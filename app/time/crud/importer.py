@@ -0,0 +1,170 @@
+import csv
+import os
+import re
+from datetime import date, datetime, timedelta
+from typing import IO, Iterator, List, Optional, Tuple
+
+from dotenv import load_dotenv
+from pydantic import ValidationError
+from sqlalchemy import insert
+from sqlalchemy.orm import Session
+
+from app.time.models.schedule import Schedule
+from app.time.schemas.schedule import ScheduleCreate
+from app.time.crud.rollup import apply_rollup_deltas
+from shared.changes.feed import record_change
+
+load_dotenv()
+
+# Validated rows inserted and committed per transaction
+IMPORT_CHUNK_SIZE = int(os.getenv("IMPORT_CHUNK_SIZE", "5000"))
+# Per-line errors kept in the report; further failures are only counted
+IMPORT_MAX_ERRORS = int(os.getenv("IMPORT_MAX_ERRORS", "1000"))
+
+Record = Tuple[int, Optional[dict], Optional[str]]
+
+class UnreadableInput(Exception):
+    """ The upload cannot be read past this line (bad encoding or broken CSV quoting) """
+
+    def __init__(self, line: int, message: str):
+        super().__init__(message)
+        self.line = line
+
+class _Lines:
+    """ Decode an upload line by line, so a bad byte is reported at its own line and not at the
+    start of a buffered block. Line endings are kept, as with newline="". """
+
+    def __init__(self, stream: IO[bytes]):
+        self.number = 0
+        self._pieces = (piece for raw in stream for piece in raw.splitlines(keepends=True))
+
+    def __iter__(self):
+        return self
+
+    def __next__(self) -> str:
+        piece = next(self._pieces)
+        self.number += 1
+        try:
+            return piece.decode("utf-8-sig" if self.number == 1 else "utf-8")
+        except UnicodeDecodeError as err:
+            raise UnreadableInput(self.number, f"not valid UTF-8: {err.reason}") from err
+
+def parse_csv(stream: IO[bytes]) -> Iterator[Record]:
+    """ Yield (line, fields, error) per CSV row with columns activity,hours,date[,planned] """
+    lines = _Lines(stream)
+    reader = csv.DictReader(lines)
+    while True:
+        try:
+            fields = next(reader)
+        except StopIteration:
+            return
+        except csv.Error as err:
+            raise UnreadableInput(lines.number, f"malformed CSV: {err}") from err
+        data = {key.strip().lower(): (value or "").strip() for key, value in fields.items() if key}
+        if data.get("planned", "") == "":
+            data.pop("planned", None)
+        yield reader.line_num, data, None
+
+_DURATION = re.compile(r"^P(?:(\d+)W)?(?:(\d+)D)?(?:T(?:(\d+)H)?(?:(\d+)M)?(?:(\d+)S)?)?$")
+
+def _ics_datetime(value: str) -> datetime:
+    value = value.rstrip("Z")
+    if "T" not in value:
+        raise ValueError("all-day events are not supported")
+    return datetime.strptime(value, "%Y%m%dT%H%M%S")
+
+def _ics_duration(value: str) -> timedelta:
+    match = _DURATION.match(value)
+    if not match:
+        raise ValueError(f"invalid DURATION '{value}'")
+    weeks, days, hours, minutes, seconds = (int(part or 0) for part in match.groups())
+    return timedelta(weeks=weeks, days=days, hours=hours, minutes=minutes, seconds=seconds)
+
+def _unfold(lines: Iterator[str]) -> Iterator[Tuple[int, str]]:
+    """ Join RFC 5545 folded lines, keeping the number of the first physical line """
+    pending, pending_line = None, 0
+    for number, raw in enumerate(lines, start=1):
+        line = raw.rstrip("\r\n")
+        if line[:1] in (" ", "\t") and pending is not None:
+            pending += line[1:]
+            continue
+        if pending is not None:
+            yield pending_line, pending
+        pending, pending_line = line, number
+    if pending is not None:
+        yield pending_line, pending
+
+def parse_ics(stream: IO[bytes]) -> Iterator[Record]:
+    """ Yield (line, fields, error) per VEVENT, using SUMMARY, DTSTART and DTEND/DURATION """
+    event, start_line = None, 0
+    for number, line in _unfold(_Lines(stream)):
+        if line == "BEGIN:VEVENT":
+            event, start_line = {}, number
+            continue
+        if event is None:
+            continue
+        if line == "END:VEVENT":
+            try:
+                start = _ics_datetime(event["DTSTART"])
+                if "DTEND" in event:
+                    length = _ics_datetime(event["DTEND"]) - start
+                else:
+                    length = _ics_duration(event.get("DURATION", ""))
+                fields = {
+                    "activity": event.get("SUMMARY", ""),
+                    "hours": length.total_seconds() / 3600,
+                    "date": start.date(),
+                }
+                end = start + length
+                if end.date() == start.date() and end > start:
+                    # Events within one day keep their time slot
+                    fields["start_time"], fields["end_time"] = start.time(), end.time()
+                yield start_line, fields, None
+            except (KeyError, ValueError) as err:
+                yield start_line, None, f"invalid event: {err}"
+            event = None
+            continue
+        name, _, value = line.partition(":")
+        event[name.split(";", 1)[0].upper()] = value
+
+def import_schedules(db: Session, records: Iterator[Record]) -> dict:
+    """ Validate parsed records and insert them in bounded transactions of IMPORT_CHUNK_SIZE rows.
+    An unreadable line stops the import: rows before it are kept and the report names the
+    line in stopped_at_line, or ValueError is raised when nothing was imported. """
+    imported, failed, errors, stopped_at_line = 0, 0, [], None
+    chunk: List[ScheduleCreate] = []
+
+    def flush():
+        nonlocal imported
+        if chunk:
+            db.execute(insert(Schedule), [schedule.model_dump() for schedule in chunk])
+            apply_rollup_deltas(db, chunk)
+            # One event per chunk: the inserts return no ids, and clients refetch the dates anyway
+            record_change(db, "schedules", "imported", None, {
+                "count": len(chunk), "dates": sorted({schedule.date for schedule in chunk}),
+            })
+            db.commit()
+            imported += len(chunk)
+            chunk.clear()
+
+    try:
+        for line, fields, error in records:
+            if error is None:
+                try:
+                    chunk.append(ScheduleCreate(**fields))
+                except ValidationError as err:
+                    error = "; ".join(f"{'.'.join(map(str, e['loc']))}: {e['msg']}" for e in err.errors())
+            if error is not None:
+                failed += 1
+                if len(errors) < IMPORT_MAX_ERRORS:
+                    errors.append({"line": line, "error": error})
+            if len(chunk) >= IMPORT_CHUNK_SIZE:
+                flush()
+    except UnreadableInput as err:
+        stopped_at_line = err.line
+        failed += 1
+        errors.append({"line": err.line, "error": str(err)})
+    flush()
+    if stopped_at_line is not None and not imported:
+        raise ValueError(f"line {stopped_at_line}: {errors[-1]['error']}")
+    return {"imported": imported, "failed": failed, "errors": errors, "stopped_at_line": stopped_at_line}
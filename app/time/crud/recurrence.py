@@ -0,0 +1,228 @@
+""" Recurring schedules, expanded lazily at query time.
+
+Each rule expands through its own date generator and the generators are merged by date
+with heapq.merge, so a range only walks the occurrences inside it. Expanded ranges are
+kept in a process-local LRU keyed by the rules' version stamp: any create, edit or delete
+moves the stamp, so a stale expansion is never served and simply ages out.
+"""
+import heapq
+import os
+from datetime import date, datetime, time, timedelta
+from typing import Iterable, Iterator, List, NamedTuple, Optional
+
+from dotenv import load_dotenv
+from sqlalchemy import Select, func, or_, select
+from sqlalchemy.orm import Session
+
+from app.time.models.recurrence import ScheduleRecurrence, ScheduleRecurrenceException
+from app.time.crud.rollup import UNOWNED
+from app.time.schemas.schedule import ScheduleRecurrenceCreate
+from shared.cache import TTLCache
+from shared.changes.feed import record_change
+
+load_dotenv()
+
+RECURRENCE_CACHE_ENABLED = os.getenv("RECURRENCE_CACHE_ENABLED", "true").lower() in ("1", "true", "yes")
+RECURRENCE_CACHE_SIZE = int(os.getenv("RECURRENCE_CACHE_SIZE", "256"))
+# Longer ranges are expanded but not cached, so one wide query cannot evict the hot ranges
+RECURRENCE_CACHE_MAX_DAYS = int(os.getenv("RECURRENCE_CACHE_MAX_DAYS", "366"))
+
+# Materialized occurrences keyed by (version stamp, start, end)
+occurrence_cache = TTLCache(maxsize=RECURRENCE_CACHE_SIZE, enabled=RECURRENCE_CACHE_ENABLED)
+
+class Occurrence(NamedTuple):
+    """ One expanded occurrence, ordered like SCHEDULE_RESPONSE_COLUMNS plus recurrence_id """
+    activity: str
+    hours: float
+    date: date
+    planned: bool
+    start_time: Optional[time]
+    end_time: Optional[time]
+    id: Optional[int]
+    created_at: datetime
+    recurrence_id: int
+
+def _ceil_multiple(value: int, step: int) -> int:
+    return -(-value // step) * step
+
+def _daily(rule: ScheduleRecurrence, start: date, end: date) -> Iterator[date]:
+    first, mask = rule.start_date, rule.weekday_mask
+    step = timedelta(days=rule.interval)
+    day = first + timedelta(days=_ceil_multiple(max((start - first).days, 0), rule.interval))
+    while day <= end:
+        if mask is None or mask & (1 << day.weekday()):
+            yield day
+        if end - day < step:
+            return
+        day += step
+
+def _weekly(rule: ScheduleRecurrence, start: date, end: date) -> Iterator[date]:
+    first = rule.start_date
+    mask = rule.weekday_mask if rule.weekday_mask is not None else 1 << first.weekday()
+    weekdays = [weekday for weekday in range(7) if mask & (1 << weekday)]
+    # Weeks are counted from the Monday of start_date's week, as RRULE does with WKST=MO
+    anchor = first - timedelta(days=first.weekday())
+    low = max(start, first)
+    monday = anchor + timedelta(weeks=_ceil_multiple((low - anchor).days // 7, rule.interval))
+    step = timedelta(weeks=rule.interval)
+    while monday <= end:
+        for weekday in weekdays:
+            if (end - monday).days < weekday:
+                return
+            day = monday + timedelta(days=weekday)
+            if day >= low:
+                yield day
+        if end - monday < step:
+            return
+        monday += step
+
+def _monthly(rule: ScheduleRecurrence, start: date, end: date) -> Iterator[date]:
+    first = rule.start_date
+    low = max(start, first)
+    months = _ceil_multiple((low.year - first.year) * 12 + low.month - first.month, rule.interval)
+    while True:
+        year, month = divmod(first.year * 12 + first.month - 1 + months, 12)
+        month += 1
+        if (year, month) > (end.year, end.month):
+            return
+        try:
+            day = date(year, month, first.day)
+        except ValueError:
+            # e.g. the 31st in a 30-day month: RFC 5545 skips the occurrence
+            day = None
+        if day is not None and low <= day <= end:
+            yield day
+        months += rule.interval
+
+_EXPANDERS = {"daily": _daily, "weekly": _weekly, "monthly": _monthly}
+
+def occurrence_dates(rule: ScheduleRecurrence, start: date, end: date) -> Iterator[date]:
+    """ Ascending occurrence dates of a rule within [start, end], minus its exceptions """
+    if rule.until is not None:
+        end = min(end, rule.until)
+    if end < start or end < rule.start_date:
+        return
+    skipped = set(rule.exceptions)
+    for day in _EXPANDERS[rule.frequency](rule, start, end):
+        if day not in skipped:
+            yield day
+
+def occurrence(rule: ScheduleRecurrence, day: date) -> Occurrence:
+    return Occurrence(
+        rule.activity, rule.hours, day, rule.planned, rule.start_time, rule.end_time, None, rule.created_at, rule.id
+    )
+
+def _rule_occurrences(rule: ScheduleRecurrence, start: date, end: date) -> Iterator[Occurrence]:
+    for day in occurrence_dates(rule, start, end):
+        yield occurrence(rule, day)
+
+def iter_occurrences(rules: Iterable[ScheduleRecurrence], start: date, end: date) -> Iterator[Occurrence]:
+    """ Occurrences of every rule within [start, end], merged lazily into date order """
+    return heapq.merge(*(_rule_occurrences(rule, start, end) for rule in rules), key=lambda occurrence: occurrence.date)
+
+def recurrences_version_columns() -> tuple:
+    """ (count, max(id), sum(revision)): ids are never reused and every edit bumps a revision,
+    so creates move max(id), deletes lower the count and edits raise the sum. """
+    return (
+        func.count(ScheduleRecurrence.id),
+        func.max(ScheduleRecurrence.id),
+        func.coalesce(func.sum(ScheduleRecurrence.revision), 0),
+    )
+
+def recurrences_version_query() -> Select:
+    return select(*recurrences_version_columns())
+
+def recurrences_between(start: date, end: date, owner_id: Optional[int] = None) -> Select:
+    """ Rules that can have occurrences within [start, end]; owner_id 0 selects unowned rules, as in the rollup """
+    stmt = select(ScheduleRecurrence).where(
+        ScheduleRecurrence.start_date <= end,
+        or_(ScheduleRecurrence.until.is_(None), ScheduleRecurrence.until >= start),
+    )
+    if owner_id is not None:
+        stmt = stmt.where(func.coalesce(ScheduleRecurrence.owner_id, UNOWNED) == owner_id)
+    return stmt.order_by(ScheduleRecurrence.id)
+
+def occurrences_between(db: Session, start: date, end: date, stamp: Optional[tuple] = None) -> List[Occurrence]:
+    """ Date-ordered occurrences within [start, end], served from the cache until a rule changes.
+    Callers that already fetched the version stamp pass it to skip that query. """
+    if stamp is None:
+        stamp = db.execute(recurrences_version_query()).one()
+    stamp = tuple(stamp)
+    if not stamp[0]:
+        return []
+    key = (stamp, start, end)
+    cached = occurrence_cache.get(key)
+    if cached is not None:
+        return cached
+    occurrences = list(iter_occurrences(db.scalars(recurrences_between(start, end)), start, end))
+    if (end - start).days < RECURRENCE_CACHE_MAX_DAYS:
+        occurrence_cache.set(key, occurrences)
+    return occurrences
+
+def _weekday_mask(weekdays: Optional[List[int]]) -> Optional[int]:
+    if weekdays is None:
+        return None
+    if not weekdays or any(weekday not in range(7) for weekday in weekdays):
+        raise ValueError("weekdays must list days from 0 (Monday) to 6 (Sunday)")
+    mask = 0
+    for weekday in weekdays:
+        mask |= 1 << weekday
+    return mask
+
+def _change_payload(rule: ScheduleRecurrence) -> dict:
+    """ What the change feed publishes for a rule: enough to know which dates to refetch """
+    return {"id": rule.id, "start_date": rule.start_date, "until": rule.until}
+
+def create_recurrence(db: Session, recurrence: ScheduleRecurrenceCreate) -> ScheduleRecurrence:
+    """ Store a rule; raises ValueError for an interval below 1, an until before start_date
+    or weekdays on a monthly rule """
+    if recurrence.interval < 1:
+        raise ValueError("interval must be at least 1")
+    if recurrence.until is not None and recurrence.until < recurrence.start_date:
+        raise ValueError("until must not be before start_date")
+    if recurrence.frequency == "monthly" and recurrence.weekdays is not None:
+        raise ValueError("weekdays apply to daily and weekly rules only")
+    rule = ScheduleRecurrence(
+        **recurrence.model_dump(exclude={"weekdays", "exceptions"}),
+        weekday_mask=_weekday_mask(recurrence.weekdays),
+        skipped=[ScheduleRecurrenceException(date=day) for day in sorted(set(recurrence.exceptions))],
+    )
+    db.add(rule)
+    db.flush()
+    record_change(db, "recurrences", "created", rule.id, _change_payload(rule))
+    db.commit()
+    db.refresh(rule)
+    return rule
+
+def get_recurrences(db: Session, skip: int = 0, limit: int = 100) -> List[ScheduleRecurrence]:
+    return list(db.scalars(select(ScheduleRecurrence).order_by(ScheduleRecurrence.id).offset(skip).limit(limit)))
+
+def get_recurrence(db: Session, recurrence_id: int) -> Optional[ScheduleRecurrence]:
+    return db.get(ScheduleRecurrence, recurrence_id)
+
+def delete_recurrence(db: Session, recurrence_id: int) -> bool:
+    rule = db.get(ScheduleRecurrence, recurrence_id)
+    if rule is None:
+        return False
+    record_change(db, "recurrences", "deleted", recurrence_id, _change_payload(rule))
+    db.delete(rule)
+    db.commit()
+    return True
+
+def set_exception(db: Session, recurrence_id: int, day: date, skipped: bool = True) -> Optional[ScheduleRecurrence]:
+    """ Skip (or restore) one occurrence date, bumping the rule's revision; None if the rule does not exist """
+    rule = db.get(ScheduleRecurrence, recurrence_id)
+    if rule is None:
+        return None
+    existing = next((row for row in rule.skipped if row.date == day), None)
+    if skipped and existing is None:
+        rule.skipped.append(ScheduleRecurrenceException(date=day))
+    elif not skipped and existing is not None:
+        rule.skipped.remove(existing)
+    else:
+        return rule
+    rule.revision = ScheduleRecurrence.revision + 1
+    record_change(db, "recurrences", "updated", recurrence_id, {**_change_payload(rule), "date": day, "skipped": skipped})
+    db.commit()
+    db.refresh(rule)
+    return rule
@@ -0,0 +1,28 @@
+from sqlalchemy.ext.asyncio import AsyncSession
+from typing import List, Optional
+from datetime import date
+
+from app.time.models.recurrence import ScheduleRecurrence
+from app.time.schemas.schedule import ScheduleRecurrenceCreate
+from app.time.crud import recurrence as crud_recurrence
+
+# Rules carry their exceptions and expansion is plain Python, so every path runs
+# the sync implementation on the session's connection.
+
+async def create_recurrence(db: AsyncSession, recurrence: ScheduleRecurrenceCreate) -> ScheduleRecurrence:
+    return await db.run_sync(crud_recurrence.create_recurrence, recurrence)
+
+async def get_recurrences(db: AsyncSession, skip: int = 0, limit: int = 100) -> List[ScheduleRecurrence]:
+    return await db.run_sync(crud_recurrence.get_recurrences, skip, limit)
+
+async def get_recurrence(db: AsyncSession, recurrence_id: int) -> Optional[ScheduleRecurrence]:
+    return await db.run_sync(crud_recurrence.get_recurrence, recurrence_id)
+
+async def delete_recurrence(db: AsyncSession, recurrence_id: int) -> bool:
+    return await db.run_sync(crud_recurrence.delete_recurrence, recurrence_id)
+
+async def set_exception(db: AsyncSession, recurrence_id: int, day: date, skipped: bool = True) -> Optional[ScheduleRecurrence]:
+    return await db.run_sync(crud_recurrence.set_exception, recurrence_id, day, skipped)
+
+async def occurrences_between(db: AsyncSession, start: date, end: date, stamp: Optional[tuple] = None) -> list:
+    return await db.run_sync(crud_recurrence.occurrences_between, start, end, stamp)
@@ -0,0 +1,168 @@
+from collections import defaultdict
+from datetime import date
+from typing import Iterable, List, Optional
+
+from sqlalchemy import delete, func, insert, select, tuple_, update
+from sqlalchemy.orm import Session
+
+from app.time.models.schedule import Schedule
+from app.time.models.rollup import ScheduleDailyRollup, ScheduleDataVersion
+
+# Rollup key used for schedules that have no owner
+UNOWNED = 0
+
+def _key(owner_id: Optional[int], day: date, activity: str, planned: Optional[bool]) -> tuple:
+    return (owner_id or UNOWNED, day, activity, planned is not False)
+
+def _upsert_statement(db: Session):
+    """ INSERT ... ON CONFLICT DO UPDATE for dialects that support it, else None.
+    Executed with a parameter list so the compiled statement is cached. """
+    dialect = db.get_bind().dialect.name
+    if dialect == "postgresql":
+        from sqlalchemy.dialects.postgresql import insert as dialect_insert
+    elif dialect == "sqlite":
+        from sqlalchemy.dialects.sqlite import insert as dialect_insert
+    else:
+        return None
+    stmt = dialect_insert(ScheduleDailyRollup)
+    return stmt.on_conflict_do_update(
+        index_elements=["owner_id", "date", "activity", "planned"],
+        set_={
+            "hours": ScheduleDailyRollup.hours + stmt.excluded.hours,
+            "entries": ScheduleDailyRollup.entries + stmt.excluded.entries,
+        },
+    )
+
+def bump_data_version(db: Session, owner_ids: Iterable[int]):
+    """ Move the data version of each owner forward inside the caller's transaction """
+    owner_ids = sorted(set(owner_ids))
+    if not owner_ids:
+        return
+    dialect = db.get_bind().dialect.name
+    if dialect in ("postgresql", "sqlite"):
+        if dialect == "postgresql":
+            from sqlalchemy.dialects.postgresql import insert as dialect_insert
+        else:
+            from sqlalchemy.dialects.sqlite import insert as dialect_insert
+        stmt = dialect_insert(ScheduleDataVersion)
+        stmt = stmt.on_conflict_do_update(
+            index_elements=["owner_id"], set_={"version": ScheduleDataVersion.version + 1},
+        )
+        db.execute(stmt, [{"owner_id": owner_id, "version": 1} for owner_id in owner_ids])
+        return
+    for owner_id in owner_ids:
+        updated = db.execute(
+            update(ScheduleDataVersion)
+            .where(ScheduleDataVersion.owner_id == owner_id)
+            .values(version=ScheduleDataVersion.version + 1)
+        )
+        if updated.rowcount == 0:
+            db.execute(insert(ScheduleDataVersion).values(owner_id=owner_id, version=1))
+
+def apply_rollup_deltas(db: Session, schedules: Iterable, sign: int = 1):
+    """ Add (sign=1) or remove (sign=-1) schedules from the rollup inside the caller's transaction.
+    Accepts Schedule rows or ScheduleCreate payloads (which have no owner). """
+    deltas = defaultdict(lambda: [0.0, 0])
+    for schedule in schedules:
+        owner_id = getattr(schedule, "owner_id", None)
+        delta = deltas[_key(owner_id, schedule.date, schedule.activity, schedule.planned)]
+        delta[0] += sign * schedule.hours
+        delta[1] += sign
+    if not deltas:
+        return
+    rows = [
+        {"owner_id": owner_id, "date": day, "activity": activity, "planned": planned, "hours": hours, "entries": entries}
+        for (owner_id, day, activity, planned), (hours, entries) in deltas.items()
+    ]
+    stmt = _upsert_statement(db)
+    if stmt is not None:
+        db.execute(stmt, rows)
+    else:
+        for row in rows:
+            key = (
+                ScheduleDailyRollup.owner_id == row["owner_id"],
+                ScheduleDailyRollup.date == row["date"],
+                ScheduleDailyRollup.activity == row["activity"],
+                ScheduleDailyRollup.planned == row["planned"],
+            )
+            updated = db.execute(update(ScheduleDailyRollup).where(*key).values(
+                hours=ScheduleDailyRollup.hours + row["hours"],
+                entries=ScheduleDailyRollup.entries + row["entries"],
+            ))
+            if updated.rowcount == 0:
+                db.execute(insert(ScheduleDailyRollup).values(**row))
+    if sign < 0:
+        db.execute(delete(ScheduleDailyRollup).where(
+            tuple_(
+                ScheduleDailyRollup.owner_id,
+                ScheduleDailyRollup.date,
+                ScheduleDailyRollup.activity,
+                ScheduleDailyRollup.planned,
+            ).in_(list(deltas)),
+            ScheduleDailyRollup.entries <= 0,
+        ))
+    bump_data_version(db, (owner_id for owner_id, _, _, _ in deltas))
+
+def _raw_totals(owner_id: Optional[int] = None):
+    stmt = select(
+        func.coalesce(Schedule.owner_id, UNOWNED),
+        Schedule.date,
+        Schedule.activity,
+        func.coalesce(Schedule.planned, True),
+        func.sum(Schedule.hours),
+        func.count(),
+    )
+    if owner_id is not None:
+        stmt = stmt.where(func.coalesce(Schedule.owner_id, UNOWNED) == owner_id)
+    return stmt.group_by(
+        func.coalesce(Schedule.owner_id, UNOWNED),
+        Schedule.date,
+        Schedule.activity,
+        func.coalesce(Schedule.planned, True),
+    )
+
+def rebuild_rollup(db: Session, owner_id: Optional[int] = None) -> int:
+    """ Recompute the rollup from raw schedules (all owners, or one), returning rows written """
+    clear = delete(ScheduleDailyRollup)
+    if owner_id is not None:
+        clear = clear.where(ScheduleDailyRollup.owner_id == owner_id)
+    db.execute(clear)
+    columns = ["owner_id", "date", "activity", "planned", "hours", "entries"]
+    result = db.execute(
+        insert(ScheduleDailyRollup).from_select(columns, _raw_totals(owner_id))
+    )
+    if owner_id is not None:
+        bump_data_version(db, [owner_id])
+    else:
+        owners = select(ScheduleDailyRollup.owner_id).union(select(ScheduleDataVersion.owner_id))
+        bump_data_version(db, db.scalars(owners))
+    db.commit()
+    return result.rowcount
+
+def check_rollup(db: Session, owner_id: Optional[int] = None, tolerance: float = 1e-6) -> List[dict]:
+    """ Compare the rollup against a raw recomputation and list every key that differs """
+    expected = {tuple(row[:4]): (row[4], row[5]) for row in db.execute(_raw_totals(owner_id))}
+    stored_stmt = select(
+        ScheduleDailyRollup.owner_id,
+        ScheduleDailyRollup.date,
+        ScheduleDailyRollup.activity,
+        ScheduleDailyRollup.planned,
+        ScheduleDailyRollup.hours,
+        ScheduleDailyRollup.entries,
+    )
+    if owner_id is not None:
+        stored_stmt = stored_stmt.where(ScheduleDailyRollup.owner_id == owner_id)
+    stored = {tuple(row[:4]): (row[4], row[5]) for row in db.execute(stored_stmt)}
+
+    mismatches = []
+    for key in expected.keys() | stored.keys():
+        want = expected.get(key, (0.0, 0))
+        have = stored.get(key, (0.0, 0))
+        if abs(want[0] - have[0]) > tolerance or want[1] != have[1]:
+            owner, day, activity, planned = key
+            mismatches.append({
+                "owner_id": owner, "date": day.isoformat(), "activity": activity, "planned": bool(planned),
+                "expected_hours": want[0], "rollup_hours": have[0],
+                "expected_entries": want[1], "rollup_entries": have[1],
+            })
+    return mismatches
@@ -1,26 +1,184 @@
+from sqlalchemy import Select, case, delete, func, insert, select
 from sqlalchemy.orm import Session
-from typing import List
+from typing import Iterable, List, Optional
 from datetime import date
+from operator import attrgetter, itemgetter
+import heapq
 
 from app.time.models.schedule import Schedule
+from app.time.models.rollup import ScheduleDailyRollup
+from app.time.crud.rollup import apply_rollup_deltas
+from app.time.crud.slots import ScheduleConflictError, find_conflicts
+from app.time.crud.recurrence import Occurrence, occurrence_dates, occurrences_between, recurrences_between, recurrences_version_columns
 from app.time.schemas.schedule import ScheduleCreate
+from shared.database.batch import bulk_insert, chunked, supports_insert_returning, supports_returning
+from shared.changes.feed import record_change
 
-def create_schedule(db: Session, schedule: ScheduleCreate) -> Schedule:
-    db_schedule = Schedule(**schedule.model_dump())
-    db.add(db_schedule)
+# Columns in ScheduleResponse field order, for the row-tuple serialization fast path
+SCHEDULE_RESPONSE_COLUMNS = (
+    Schedule.activity, Schedule.hours, Schedule.date, Schedule.planned, Schedule.start_time, Schedule.end_time,
+    Schedule.id, Schedule.created_at,
+)
+
+def _change_payload(schedule) -> dict:
+    """ SCHEDULE_RESPONSE_COLUMNS of a row or entity, as published on the change feed """
+    return {column.key: getattr(schedule, column.key) for column in SCHEDULE_RESPONSE_COLUMNS}
+
+def create_schedule(db: Session, schedule: ScheduleCreate, allow_overlap: bool = False):
+    """ Insert a schedule with INSERT ... RETURNING (no refresh SELECT) and roll it up.
+    Raises ScheduleConflictError when its time slot overlaps another entry that day,
+    unless allow_overlap is set. """
+    if schedule.start_time is not None and not allow_overlap:
+        conflicts = find_conflicts(db, schedule.date, schedule.start_time, schedule.end_time)
+        if conflicts:
+            raise ScheduleConflictError(conflicts)
+    if not supports_insert_returning(db):
+        db_schedule = Schedule(**schedule.model_dump())
+        db.add(db_schedule)
+        apply_rollup_deltas(db, [db_schedule])
+        db.flush()
+        record_change(db, "schedules", "created", db_schedule.id, _change_payload(db_schedule))
+        db.commit()
+        db.refresh(db_schedule)
+        return db_schedule
+    row = db.execute(insert(Schedule).values(**schedule.model_dump()).returning(*SCHEDULE_RESPONSE_COLUMNS)).one()
+    apply_rollup_deltas(db, [schedule])
+    record_change(db, "schedules", "created", row.id, _change_payload(row))
     db.commit()
-    db.refresh(db_schedule)
-    return db_schedule
+    return row
+
+def _schedules(db: Session, rows_only: bool):
+    return db.query(*SCHEDULE_RESPONSE_COLUMNS) if rows_only else db.query(Schedule)
+
+def merge_occurrences(schedules: Iterable, occurrences: Iterable[Occurrence], rows_only: bool) -> list:
+    """ Merge date-ordered stored schedules with date-ordered occurrences (stored first on a tie).
+    Column tuples gain a trailing null recurrence_id so they line up with Occurrence. """
+    if rows_only:
+        schedules = (tuple(row) + (None,) for row in schedules)
+        return list(heapq.merge(schedules, occurrences, key=itemgetter(2)))
+    return list(heapq.merge(schedules, occurrences, key=attrgetter("date")))
 
-def get_schedules_by_date(db: Session, target_date: date) -> List[Schedule]:
-    return db.query(Schedule).filter(Schedule.date == target_date).all()
+def get_schedules_by_date(db: Session, target_date: date, rows_only: bool = False, recurrence_stamp: Optional[tuple] = None) -> list:
+    """ Stored schedules for one day followed by that day's recurring occurrences """
+    schedules = _schedules(db, rows_only).filter(Schedule.date == target_date).all()
+    return merge_occurrences(schedules, occurrences_between(db, target_date, target_date, recurrence_stamp), rows_only)
 
-def get_schedules_by_date_range(db: Session, start: date, end: date) -> List[Schedule]:
-    return db.query(Schedule).filter(
+def get_schedules_by_date_range(db: Session, start: date, end: date, rows_only: bool = False) -> list:
+    """ Stored schedules and recurring occurrences between start and end, ordered by date """
+    schedules = _schedules(db, rows_only).filter(
         Schedule.date >= start,
         Schedule.date <= end
     ).order_by(Schedule.date).all()
+    return merge_occurrences(schedules, occurrences_between(db, start, end), rows_only)
+
+def schedules_version_query(target_date: date) -> Select:
+    """ (count, max(created_at), max(id)) for one day, then the recurrence version stamp:
+    schedules are never edited in place, so inserts move max(id) and created_at while
+    deletes move the count; rules can add occurrences to any day. """
+    return select(
+        func.count(Schedule.id),
+        func.max(Schedule.created_at),
+        func.max(Schedule.id),
+        *(select(column).scalar_subquery() for column in recurrences_version_columns()),
+    ).where(
+        Schedule.date == target_date
+    )
+
+def get_schedules_version(db: Session, target_date: date):
+    return db.execute(schedules_version_query(target_date)).one()
+
+def export_schedules_query(start: date, end: date, owner_id: Optional[int] = None) -> Select:
+    """ Column-only SELECT for streaming exports of a date range """
+    stmt = select(
+        Schedule.id, Schedule.activity, Schedule.hours, Schedule.date, Schedule.planned, Schedule.created_at
+    ).where(
+        Schedule.date >= start,
+        Schedule.date <= end
+    )
+    if owner_id is not None:
+        stmt = stmt.where(Schedule.owner_id == owner_id)
+    return stmt.order_by(Schedule.date, Schedule.id)
 
 def delete_schedule(db: Session, schedule_id: int):
-    db.query(Schedule).filter(Schedule.id == schedule_id).delete()
-    db.commit()
\ No newline at end of file
+    """ DELETE ... RETURNING the rollup key, so removing a schedule needs no prior SELECT """
+    if supports_returning(db):
+        stmt = delete(Schedule).where(Schedule.id == schedule_id).execution_options(synchronize_session=False)
+        deleted = db.execute(stmt.returning(
+            Schedule.owner_id, Schedule.date, Schedule.activity, Schedule.planned, Schedule.hours
+        )).first()
+        if deleted:
+            apply_rollup_deltas(db, [deleted], sign=-1)
+            record_change(db, "schedules", "deleted", schedule_id, {"id": schedule_id, "date": deleted.date})
+        db.commit()
+        return
+    db_schedule = db.query(Schedule).filter(Schedule.id == schedule_id).first()
+    if db_schedule:
+        apply_rollup_deltas(db, [db_schedule], sign=-1)
+        record_change(db, "schedules", "deleted", schedule_id, {"id": schedule_id, "date": db_schedule.date})
+        db.delete(db_schedule)
+    db.commit()
+
+def create_schedules_bulk(db: Session, schedules: List[ScheduleCreate]) -> List[dict]:
+    """ Insert many schedules in one transaction, one INSERT statement per chunk """
+    results = []
+    for chunk in chunked(schedules):
+        ids = bulk_insert(db, Schedule, [schedule.model_dump() for schedule in chunk])
+        apply_rollup_deltas(db, chunk)
+        for schedule_id, schedule in zip(ids, chunk):
+            record_change(db, "schedules", "created", schedule_id, {"id": schedule_id, "date": schedule.date})
+        results.extend(
+            {"index": index, "id": schedule_id, "status": "created"}
+            for index, schedule_id in enumerate(ids, start=len(results))
+        )
+    db.commit()
+    return results
+
+def _period_key(day: date, group_by: str) -> str:
+    if group_by == "week":
+        iso_year, iso_week, _ = day.isocalendar()
+        return f"{iso_year}-W{iso_week:02d}"
+    if group_by == "month":
+        return day.strftime("%Y-%m")
+    return day.isoformat()
+
+def summarize_schedules(
+    db: Session, start: date, end: date, group_by: str = "day", owner_id: Optional[int] = None
+) -> dict:
+    """ Total hours between start and end grouped by activity/day/week/month, in columnar form.
+    Reads the daily rollup plus the recurrence rules overlapping the range, so the cost
+    scales with days in the range rather than entries. """
+    key = ScheduleDailyRollup.activity if group_by == "activity" else ScheduleDailyRollup.date
+    actual = func.sum(case((ScheduleDailyRollup.planned.is_(False), ScheduleDailyRollup.hours), else_=0.0))
+    stmt = select(key, func.sum(ScheduleDailyRollup.hours), actual, func.sum(ScheduleDailyRollup.entries)).where(
+        ScheduleDailyRollup.date >= start,
+        ScheduleDailyRollup.date <= end
+    )
+    if owner_id is not None:
+        stmt = stmt.where(ScheduleDailyRollup.owner_id == owner_id)
+    rows = db.execute(stmt.group_by(key).order_by(key)).all()
+    # Recurring schedules have no rollup rows: fold their occurrences in as extra per-day rows
+    occurrences = [
+        (rule.activity if group_by == "activity" else day, rule.hours, rule.hours if rule.planned is False else 0.0, 1)
+        for rule in db.scalars(recurrences_between(start, end, owner_id))
+        for day in occurrence_dates(rule, start, end)
+    ]
+    if occurrences:
+        rows = sorted(rows + occurrences, key=itemgetter(0))
+
+    # Days come back from SQL already summed and sorted; weeks and months fold those
+    # per-day rows, so at most one row per day in the range crosses the wire.
+    totals: dict = {}
+    for group, hours, actual_hours, entries in rows:
+        label = group if group_by == "activity" else _period_key(group, group_by)
+        bucket = totals.setdefault(label, [0.0, 0.0, 0])
+        bucket[0] += hours or 0.0
+        bucket[1] += actual_hours or 0.0
+        bucket[2] += entries
+    return {
+        "group_by": group_by,
+        "keys": list(totals),
+        "hours": [bucket[0] for bucket in totals.values()],
+        "planned_hours": [bucket[0] - bucket[1] for bucket in totals.values()],
+        "actual_hours": [bucket[1] for bucket in totals.values()],
+        "entries": [bucket[2] for bucket in totals.values()],
+    }
\ No newline at end of file
@@ -0,0 +1,59 @@
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from typing import List, Optional
+from datetime import date, time
+
+from app.time.models.schedule import Schedule
+from app.time.schemas.schedule import ScheduleCreate
+from app.time.crud import schedule as crud_schedule
+from app.time.crud import recurrence_async as crud_recurrence
+from app.time.crud import slots as crud_slots
+from app.time.crud.schedule import SCHEDULE_RESPONSE_COLUMNS, merge_occurrences
+
+async def create_schedule(db: AsyncSession, schedule: ScheduleCreate, allow_overlap: bool = False):
+    return await db.run_sync(crud_schedule.create_schedule, schedule, allow_overlap)
+
+async def _fetch(db: AsyncSession, stmt, rows_only: bool) -> list:
+    if rows_only:
+        return list((await db.execute(stmt)).all())
+    return list(await db.scalars(stmt))
+
+def _schedules(rows_only: bool):
+    return select(*SCHEDULE_RESPONSE_COLUMNS) if rows_only else select(Schedule)
+
+async def get_schedules_by_date(db: AsyncSession, target_date: date, rows_only: bool = False, recurrence_stamp: Optional[tuple] = None) -> list:
+    schedules = await _fetch(db, _schedules(rows_only).where(Schedule.date == target_date), rows_only)
+    occurrences = await crud_recurrence.occurrences_between(db, target_date, target_date, recurrence_stamp)
+    return merge_occurrences(schedules, occurrences, rows_only)
+
+async def get_schedules_version(db: AsyncSession, target_date: date):
+    return (await db.execute(crud_schedule.schedules_version_query(target_date))).one()
+
+async def get_schedules_by_date_range(db: AsyncSession, start: date, end: date, rows_only: bool = False) -> list:
+    stmt = _schedules(rows_only).where(
+        Schedule.date >= start,
+        Schedule.date <= end
+    ).order_by(Schedule.date)
+    schedules = await _fetch(db, stmt, rows_only)
+    return merge_occurrences(schedules, await crud_recurrence.occurrences_between(db, start, end), rows_only)
+
+async def delete_schedule(db: AsyncSession, schedule_id: int):
+    await db.run_sync(crud_schedule.delete_schedule, schedule_id)
+
+async def create_schedules_bulk(db: AsyncSession, schedules: List[ScheduleCreate]) -> List[dict]:
+    return await db.run_sync(crud_schedule.create_schedules_bulk, schedules)
+
+
+async def summarize_schedules(
+    db: AsyncSession, start: date, end: date, group_by: str = "day", owner_id: Optional[int] = None
+) -> dict:
+    return await db.run_sync(crud_schedule.summarize_schedules, start, end, group_by, owner_id)
+
+async def free_slots(
+    db: AsyncSession, start: date, end: date, day_start: time, day_end: Optional[time] = None,
+    min_minutes: int = 0, owner_id: Optional[int] = None,
+) -> List[dict]:
+    return await db.run_sync(crud_slots.free_slots, start, end, day_start, day_end, min_minutes, owner_id)
+
+async def list_conflicts(db: AsyncSession, start: date, end: date, owner_id: Optional[int] = None) -> List[dict]:
+    return await db.run_sync(crud_slots.list_conflicts, start, end, owner_id)
@@ -0,0 +1,170 @@
+""" Time-slot queries: overlap checks on create, free time and double-booking reports.
+
+Timed schedules come back in (date, start_time) order off the schedule indexes and
+recurring occurrences are added per day. Each (owner, day) is then handled with
+sort-and-sweep over half-open [start, end) second offsets: O(n log n) for n entries,
+never pairwise.
+"""
+import heapq
+import os
+from collections import defaultdict
+from datetime import date, datetime, time, timedelta
+from operator import itemgetter
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+
+from dotenv import load_dotenv
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+
+from app.time.models.schedule import Schedule
+from app.time.crud.recurrence import occurrence, occurrence_dates, recurrences_between
+from app.time.crud.rollup import UNOWNED
+
+load_dotenv()
+
+# Widest date range accepted by the free-time and conflict reports
+SLOT_QUERY_MAX_DAYS = int(os.getenv("SLOT_QUERY_MAX_DAYS", "366"))
+
+DAY_SECONDS = 24 * 3600
+
+class ScheduleConflictError(ValueError):
+    """ Raised when a timed schedule would overlap entries already booked that day """
+
+    def __init__(self, conflicts: list):
+        super().__init__("Schedule overlaps existing entries")
+        self.conflicts = conflicts
+
+def seconds(value: time) -> int:
+    return value.hour * 3600 + value.minute * 60 + value.second
+
+def merge_intervals(intervals: Iterable[Tuple[int, int]]) -> List[Tuple[int, int]]:
+    """ Union of half-open intervals: sort by start, then extend or close in one sweep """
+    merged: List[List[int]] = []
+    for start, end in sorted(intervals):
+        if merged and start <= merged[-1][1]:
+            merged[-1][1] = max(merged[-1][1], end)
+        else:
+            merged.append([start, end])
+    return [(start, end) for start, end in merged]
+
+def gaps(busy: List[Tuple[int, int]], lower: int, upper: int, min_length: int = 0) -> Iterator[Tuple[int, int]]:
+    """ Free stretches of [lower, upper) around merged busy intervals, at least min_length long """
+    cursor = lower
+    for start, end in busy:
+        if start >= upper:
+            break
+        if start > cursor and start - cursor >= min_length:
+            yield cursor, start
+        cursor = max(cursor, end)
+    if upper > cursor and upper - cursor >= min_length:
+        yield cursor, upper
+
+def overlapping_pairs(intervals: Iterable[Tuple[int, int, object]]) -> Iterator[Tuple[object, object]]:
+    """ Every overlapping pair, sweeping in start order with a min-heap of the active intervals'
+    ends: O(n log n + k) for k reported pairs """
+    active: list = []
+    for sequence, (start, end, item) in enumerate(sorted(intervals, key=itemgetter(0, 1))):
+        while active and active[0][0] <= start:
+            heapq.heappop(active)
+        for _, _, other in active:
+            yield other, item
+        heapq.heappush(active, (end, sequence, item))
+
+def _owner_clause(owner_id: int):
+    # owner_id 0 means unowned, as in the rollup
+    return Schedule.owner_id.is_(None) if owner_id == UNOWNED else Schedule.owner_id == owner_id
+
+def timed_entries(db: Session, start: date, end: date, owner_id: Optional[int] = None) -> Dict[tuple, list]:
+    """ Timed schedules and occurrences between start and end keyed by (owner, day); owner_id
+    None covers every owner. Entries without a time slot do not occupy time and are left out. """
+    stmt = select(Schedule).where(
+        Schedule.date >= start,
+        Schedule.date <= end,
+        Schedule.start_time.is_not(None),
+    )
+    if owner_id is not None:
+        stmt = stmt.where(_owner_clause(owner_id))
+    entries: Dict[tuple, list] = defaultdict(list)
+    for schedule in db.scalars(stmt.order_by(Schedule.date, Schedule.start_time)):
+        entries[(schedule.owner_id or UNOWNED, schedule.date)].append(schedule)
+    for rule in db.scalars(recurrences_between(start, end, owner_id)):
+        if rule.start_time is None:
+            continue
+        for day in occurrence_dates(rule, start, end):
+            entries[(rule.owner_id or UNOWNED, day)].append(occurrence(rule, day))
+    return entries
+
+def _check_range(start: date, end: date):
+    if (end - start).days >= SLOT_QUERY_MAX_DAYS:
+        raise ValueError(f"Date range exceeds {SLOT_QUERY_MAX_DAYS} days")
+
+def find_conflicts(db: Session, day: date, start_time: time, end_time: time, owner_id: int = UNOWNED) -> list:
+    """ Entries of one owner (0 = unowned) whose slot overlaps [start_time, end_time) on day,
+    found with a seek on (owner_id, date) and a range on start_time """
+    conflicts = list(db.scalars(select(Schedule).where(
+        _owner_clause(owner_id),
+        Schedule.date == day,
+        Schedule.start_time < end_time,
+        Schedule.end_time > start_time,
+    ).order_by(Schedule.start_time)))
+    for rule in db.scalars(recurrences_between(day, day, owner_id)):
+        if rule.start_time is None or not (rule.start_time < end_time and rule.end_time > start_time):
+            continue
+        conflicts.extend(occurrence(rule, occurrence_day) for occurrence_day in occurrence_dates(rule, day, day))
+    return conflicts
+
+def free_slots(
+    db: Session,
+    start: date,
+    end: date,
+    day_start: time = time(0),
+    day_end: Optional[time] = None,
+    min_minutes: int = 0,
+    owner_id: Optional[int] = None,
+) -> List[dict]:
+    """ Free stretches between day_start and day_end (midnight if None) on every day of the range.
+    Raises ValueError for an empty working day or a range wider than SLOT_QUERY_MAX_DAYS. """
+    _check_range(start, end)
+    lower = seconds(day_start)
+    upper = DAY_SECONDS if day_end is None else seconds(day_end)
+    if upper <= lower:
+        raise ValueError("day_end must be after day_start")
+    busy_by_day: Dict[date, list] = defaultdict(list)
+    # Only the slots matter here, so read three columns instead of whole entries
+    stmt = select(Schedule.date, Schedule.start_time, Schedule.end_time).where(
+        Schedule.date >= start,
+        Schedule.date <= end,
+        Schedule.start_time.is_not(None),
+    )
+    if owner_id is not None:
+        stmt = stmt.where(_owner_clause(owner_id))
+    for day, slot_start, slot_end in db.execute(stmt):
+        busy_by_day[day].append((seconds(slot_start), seconds(slot_end)))
+    for rule in db.scalars(recurrences_between(start, end, owner_id)):
+        if rule.start_time is not None:
+            for day in occurrence_dates(rule, start, end):
+                busy_by_day[day].append((seconds(rule.start_time), seconds(rule.end_time)))
+
+    slots = []
+    day = start
+    while day <= end:
+        midnight = datetime.combine(day, time(0))
+        for slot_start, slot_end in gaps(merge_intervals(busy_by_day.get(day, ())), lower, upper, min_minutes * 60):
+            slots.append({
+                "date": day,
+                "start": midnight + timedelta(seconds=slot_start),
+                "end": midnight + timedelta(seconds=slot_end),
+                "minutes": (slot_end - slot_start) / 60,
+            })
+        day += timedelta(days=1)
+    return slots
+
+def list_conflicts(db: Session, start: date, end: date, owner_id: Optional[int] = None) -> List[dict]:
+    """ Every pair of overlapping entries of the same owner on the same day.
+    Raises ValueError for a range wider than SLOT_QUERY_MAX_DAYS. """
+    _check_range(start, end)
+    conflicts = []
+    for (_, day), entries in sorted(timed_entries(db, start, end, owner_id).items(), key=lambda item: item[0][::-1]):
+        intervals = ((seconds(entry.start_time), seconds(entry.end_time), entry) for entry in entries)
+        conflicts.extend({"date": day, "first": first, "second": second} for first, second in overlapping_pairs(intervals))
+    return conflicts
@@ -1,11 +1,24 @@
 from fastapi import FastAPI
-from app.time.routes import schedules
+from shared.metrics import RequestMetricsMiddleware
+from shared.routes.internal import router as internal_router
+from shared.routes.metrics import router as metrics_router
+from shared.routes.changes import router as changes_router
+from app.time.routes.internal import router as time_internal_router
+from shared.database.session import DATABASE_MODE
 
-from shared.database.session import create_tables
+if DATABASE_MODE == "async":
+    from app.time.routes import schedules_async as schedules
+else:
+    from app.time.routes import schedules
 
 app = FastAPI(title="Timely - Time Tracking Service")
 
 app.include_router(schedules.router)
+app.include_router(internal_router)
+app.include_router(metrics_router)
+app.include_router(changes_router)
+app.add_middleware(RequestMetricsMiddleware)
+app.include_router(time_internal_router)
 
 @app.get("/")
 def read_root():
@@ -0,0 +1,33 @@
+""" Maintenance commands for the time service.
+
+    python -m app.time.manage rollup-rebuild [--owner-id N]
+    python -m app.time.manage rollup-check [--owner-id N]
+"""
+import argparse
+import sys
+
+from shared.database.session import SessionLocal
+from app.time.crud.rollup import check_rollup, rebuild_rollup
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(prog="python -m app.time.manage")
+    parser.add_argument("command", choices=["rollup-rebuild", "rollup-check"])
+    parser.add_argument("--owner-id", type=int, default=None, help="limit to one owner (0 = unowned)")
+    args = parser.parse_args(argv)
+
+    db = SessionLocal()
+    try:
+        if args.command == "rollup-rebuild":
+            written = rebuild_rollup(db, args.owner_id)
+            print(f"Rebuilt schedule_daily_rollup: {written} rows")
+            return 0
+        mismatches = check_rollup(db, args.owner_id)
+        for mismatch in mismatches:
+            print(mismatch)
+        print(f"{len(mismatches)} mismatched rollup keys")
+        return 1 if mismatches else 0
+    finally:
+        db.close()
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,63 @@
+from typing import List, Optional
+
+from sqlalchemy import Column, Integer, String, Float, Date, DateTime, Time, Boolean, ForeignKey, Index
+from sqlalchemy.sql import func
+from sqlalchemy.orm import relationship
+from shared.database.base import Base
+from app.user.models.user import User  # noqa: F401  (FK target)
+
+class ScheduleRecurrence(Base):
+    """ RRULE-style rule (FREQ, INTERVAL, BYDAY, UNTIL, EXDATE) standing in for repeated schedules.
+    Occurrences are expanded at query time and never stored. """
+    __tablename__ = "schedule_recurrences"
+    __table_args__ = (
+        # Range queries only load rules that can overlap the range
+        Index("ix_schedule_recurrences_start_until", "start_date", "until"),
+        # Never reuse ids (SQLite otherwise may), so max(id) in the version stamp only grows
+        {"sqlite_autoincrement": True},
+    )
+
+    id = Column(Integer, primary_key=True, index=True)
+    activity = Column(String(255), nullable=False)
+    hours = Column(Float, nullable=False)
+    planned = Column(Boolean, default=True)
+    start_time = Column(Time, nullable=True)
+    end_time = Column(Time, nullable=True)
+    frequency = Column(String(16), nullable=False)
+    interval = Column(Integer, nullable=False, default=1)
+    # Bit 0 = Monday ... bit 6 = Sunday; NULL repeats on start_date's weekday (weekly) or every day (daily)
+    weekday_mask = Column(Integer, nullable=True)
+    start_date = Column(Date, nullable=False)
+    until = Column(Date, nullable=True)
+    owner_id = Column(Integer, ForeignKey("users.id", name="fk_schedule_recurrence_owner_id"))
+    # Bumped on every change to the rule or its exceptions; part of the cache version stamp
+    revision = Column(Integer, nullable=False, default=1)
+    created_at = Column(DateTime, server_default=func.now())
+
+    skipped = relationship(
+        "ScheduleRecurrenceException",
+        cascade="all, delete-orphan",
+        lazy="selectin",
+        order_by="ScheduleRecurrenceException.date",
+    )
+
+    @property
+    def weekdays(self) -> Optional[List[int]]:
+        if self.weekday_mask is None:
+            return None
+        return [day for day in range(7) if self.weekday_mask & (1 << day)]
+
+    @property
+    def exceptions(self) -> List:
+        return [row.date for row in self.skipped]
+
+class ScheduleRecurrenceException(Base):
+    """ One occurrence date removed from a rule (EXDATE) """
+    __tablename__ = "schedule_recurrence_exceptions"
+
+    recurrence_id = Column(
+        Integer,
+        ForeignKey("schedule_recurrences.id", name="fk_recurrence_exception_recurrence_id", ondelete="CASCADE"),
+        primary_key=True,
+    )
+    date = Column(Date, primary_key=True)
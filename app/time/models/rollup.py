@@ -0,0 +1,21 @@
+from sqlalchemy import Column, Integer, String, Float, Date, Boolean
+from shared.database.base import Base
+
+class ScheduleDailyRollup(Base):
+    """ Hours per (owner, date, activity, planned), maintained alongside schedule writes """
+    __tablename__ = "schedule_daily_rollup"
+
+    # Schedules without an owner roll up under owner_id 0 so the key stays NOT NULL
+    owner_id = Column(Integer, primary_key=True, autoincrement=False)
+    date = Column(Date, primary_key=True)
+    activity = Column(String(255), primary_key=True)
+    planned = Column(Boolean, primary_key=True)
+    hours = Column(Float, nullable=False, default=0.0)
+    entries = Column(Integer, nullable=False, default=0)
+
+class ScheduleDataVersion(Base):
+    """ Per-owner counter bumped in the same transaction as every rollup write; cached charts key on it """
+    __tablename__ = "schedule_data_versions"
+
+    owner_id = Column(Integer, primary_key=True, autoincrement=False)
+    version = Column(Integer, nullable=False, default=0)
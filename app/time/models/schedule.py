@@ -1,17 +1,29 @@
-from sqlalchemy import Column, Integer, String, Float, Date, DateTime, Boolean, ForeignKey
+from sqlalchemy import Column, Integer, String, Float, Date, DateTime, Time, Boolean, ForeignKey, Index
 from sqlalchemy.sql import func
 from sqlalchemy.orm import relationship
 from shared.database.base import Base
+from app.user.models.user import User  # noqa: F401  (FK and relationship target)
 
 class Schedule(Base):
     __tablename__ = "schedules"
+    __table_args__ = (
+        # Day and range listings walk (date, start_time); overlap and free-time queries
+        # seek (owner_id, date) and range-scan start_time within the day
+        Index("ix_schedules_date_start_time", "date", "start_time"),
+        Index("ix_schedules_owner_date_start_end", "owner_id", "date", "start_time", "end_time"),
+        # Never reuse ids (SQLite otherwise may), so max(id) in the day ETag only grows
+        {"sqlite_autoincrement": True},
+    )
     
     id = Column(Integer, primary_key=True, index=True)
     activity = Column(String(255), nullable=False)
     hours = Column(Float, nullable=False)
     date = Column(Date, nullable=False)
     planned = Column(Boolean, default=True)
+    # Optional time slot within the day, [start_time, end_time)
+    start_time = Column(Time, nullable=True)
+    end_time = Column(Time, nullable=True)
     owner_id = Column(Integer, ForeignKey("users.id", name="fk_schedule_owner_id"))
     created_at = Column(DateTime, server_default=func.now())
     
-    owner = relationship("User", back_populates="schedules")
\ No newline at end of file
+    owner = relationship("User", backref="schedules")
\ No newline at end of file
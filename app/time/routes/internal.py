@@ -0,0 +1,14 @@
+from fastapi import APIRouter
+
+from app.time.crud.recurrence import occurrence_cache
+from app.time.crud.charts import chart_cache
+
+router = APIRouter(prefix="/internal", tags=["internal"])
+
+@router.get("/recurrence-cache")
+def recurrence_cache_stats():
+    return occurrence_cache.stats()
+
+@router.get("/chart-cache")
+def chart_cache_stats():
+    return chart_cache.stats()
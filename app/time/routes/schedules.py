@@ -1,31 +1,206 @@
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, File, HTTPException, Query, Request, Response, UploadFile
+from fastapi.responses import StreamingResponse
 from sqlalchemy.orm import Session
-from datetime import date
-from typing import List
+from datetime import date, time
+from typing import List, Literal, Optional
 
-from shared.database.session import get_db
-from app.time.schemas.schedule import ScheduleCreate, ScheduleResponse  # ✅ Updated
+from shared.database.session import get_routed_db, read_bind
+from shared.database.batch import BATCH_MAX_SIZE
+from shared.fastjson import FAST_SERIALIZATION, rows_response
+from shared.conditional import is_not_modified, not_modified, set_validators, weak_etag
+from shared.export import EXPORT_FORMATS, stream_query
+from shared.schemas import BatchResult
+from app.time.schemas.schedule import ScheduleCreate, ScheduleResponse, ScheduleBatchCreate, ScheduleSummary, ScheduleImportReport  # ✅ Updated
+from app.time.schemas.schedule import ScheduleEntryResponse, ScheduleRecurrenceCreate, ScheduleRecurrenceResponse, FreeSlot, ScheduleConflict
 from app.time.crud.schedule import (  # ✅ Updated
-    create_schedule, get_schedules_by_date, get_schedules_by_date_range, delete_schedule
+    create_schedule, get_schedules_by_date, get_schedules_by_date_range, get_schedules_version, delete_schedule,
+    create_schedules_bulk, summarize_schedules, export_schedules_query, SCHEDULE_RESPONSE_COLUMNS,
 )
+from app.time.crud.slots import ScheduleConflictError, free_slots, list_conflicts
+from app.time.crud.importer import import_schedules, parse_csv, parse_ics
+from app.time.crud.recurrence import create_recurrence, get_recurrences, delete_recurrence, set_exception
+from app.time.crud.charts import CHART_FORMATS, ChartFormatUnavailable, chart_version, render_chart
 
 router = APIRouter(prefix="/schedules", tags=["schedules"])
 
+SCHEDULE_FIELDS = [column.key for column in SCHEDULE_RESPONSE_COLUMNS]
+HOURS = (SCHEDULE_FIELDS.index("hours"),)
+# Listings mix stored schedules with occurrences expanded from recurrence rules
+SCHEDULE_ENTRY_FIELDS = SCHEDULE_FIELDS + ["recurrence_id"]
+
+def _conflict(err: ScheduleConflictError) -> HTTPException:
+    return HTTPException(status_code=409, detail={
+        "message": str(err),
+        "conflicts": [ScheduleEntryResponse.model_validate(entry).model_dump(mode="json") for entry in err.conflicts],
+    })
+
 @router.post("/", response_model=ScheduleResponse)
-def create_new_schedule(schedule: ScheduleCreate, db: Session = Depends(get_db)):
-    return create_schedule(db, schedule)
+def create_new_schedule(schedule: ScheduleCreate, allow_overlap: bool = False, db: Session = Depends(get_routed_db)):
+    """ Create a schedule; a timed entry overlapping another one that day is rejected with 409
+    listing the conflicts, unless allow_overlap is set """
+    try:
+        return create_schedule(db, schedule, allow_overlap)
+    except ScheduleConflictError as e:
+        raise _conflict(e)
+
+@router.post("/batch", response_model=BatchResult)
+def create_schedules_batch(batch: ScheduleBatchCreate, db: Session = Depends(get_routed_db)):
+    if len(batch.items) > BATCH_MAX_SIZE:
+        raise HTTPException(status_code=413, detail=f"Batch exceeds maximum size of {BATCH_MAX_SIZE}")
+    return {"results": create_schedules_bulk(db, batch.items)}
+
+@router.post("/import", response_model=ScheduleImportReport)
+def import_schedule_file(
+    file: UploadFile = File(...),
+    format: Optional[Literal["csv", "ics"]] = None,
+    db: Session = Depends(get_routed_db)
+):
+    """ Import a CSV (activity,hours,date[,planned]) or iCalendar file, streaming it in chunks """
+    if format is None:
+        format = "ics" if (file.filename or "").lower().endswith(".ics") else "csv"
+    parser = parse_ics if format == "ics" else parse_csv
+    try:
+        return import_schedules(db, parser(file.file))
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+@router.get("/date/{target_date}", response_model=List[ScheduleEntryResponse])
+def get_schedules_for_date(target_date: date, request: Request, response: Response, db: Session = Depends(get_routed_db)):
+    """ Schedules and recurring occurrences for one day; an unchanged day answers If-None-Match
+    with 304 before loading rows """
+    count, last_modified, max_id, *recurrence_stamp = get_schedules_version(db, target_date)
+    etag = weak_etag("schedules", target_date, count, last_modified, max_id, *recurrence_stamp)
+    if is_not_modified(request, etag):
+        return not_modified(etag, last_modified)
+    schedules = get_schedules_by_date(db, target_date, rows_only=FAST_SERIALIZATION, recurrence_stamp=recurrence_stamp)
+    if FAST_SERIALIZATION:
+        return set_validators(rows_response(SCHEDULE_ENTRY_FIELDS, schedules, float_columns=HOURS), etag, last_modified)
+    set_validators(response, etag, last_modified)
+    return schedules
+
+@router.get("/range/{start_date}/{end_date}", response_model=List[ScheduleEntryResponse])
+def get_schedules_in_range(start_date: date, end_date: date, db: Session = Depends(get_routed_db)):
+    if start_date > end_date:
+        raise HTTPException(status_code=400, detail="Start date must be before end date")
+    schedules = get_schedules_by_date_range(db, start_date, end_date, rows_only=FAST_SERIALIZATION)
+    return rows_response(SCHEDULE_ENTRY_FIELDS, schedules, float_columns=HOURS) if FAST_SERIALIZATION else schedules
+
+@router.get("/free", response_model=List[FreeSlot])
+def get_free_slots(
+    start_date: date,
+    end_date: date,
+    day_start: time = time(0),
+    day_end: Optional[time] = None,
+    min_minutes: int = Query(0, ge=0),
+    owner_id: Optional[int] = None,
+    db: Session = Depends(get_routed_db)
+):
+    """ Free stretches between day_start and day_end (end of day by default) on each day of the range.
+    Only entries with start and end times occupy time. """
+    if start_date > end_date:
+        raise HTTPException(status_code=400, detail="Start date must be before end date")
+    try:
+        return free_slots(db, start_date, end_date, day_start, day_end, min_minutes, owner_id)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+@router.get("/conflicts", response_model=List[ScheduleConflict])
+def get_conflicts(start_date: date, end_date: date, owner_id: Optional[int] = None, db: Session = Depends(get_routed_db)):
+    """ Overlapping pairs of timed entries per owner and day, e.g. from imports or allow_overlap """
+    if start_date > end_date:
+        raise HTTPException(status_code=400, detail="Start date must be before end date")
+    try:
+        return list_conflicts(db, start_date, end_date, owner_id)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+@router.post("/recurrences", response_model=ScheduleRecurrenceResponse)
+def create_new_recurrence(recurrence: ScheduleRecurrenceCreate, db: Session = Depends(get_routed_db)):
+    """ Store a repeating schedule once; its occurrences are expanded into date and range queries """
+    try:
+        return create_recurrence(db, recurrence)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+@router.get("/recurrences", response_model=List[ScheduleRecurrenceResponse])
+def read_recurrences(skip: int = 0, limit: int = 100, db: Session = Depends(get_routed_db)):
+    return get_recurrences(db, skip=skip, limit=limit)
+
+@router.delete("/recurrences/{recurrence_id}")
+def remove_recurrence(recurrence_id: int, db: Session = Depends(get_routed_db)):
+    if not delete_recurrence(db, recurrence_id):
+        raise HTTPException(status_code=404, detail="Recurrence not found")
+    return {"message": "Recurrence deleted"}
+
+@router.put("/recurrences/{recurrence_id}/exceptions/{exception_date}", response_model=ScheduleRecurrenceResponse)
+def skip_occurrence(recurrence_id: int, exception_date: date, db: Session = Depends(get_routed_db)):
+    """ Remove one occurrence from a rule """
+    rule = set_exception(db, recurrence_id, exception_date)
+    if rule is None:
+        raise HTTPException(status_code=404, detail="Recurrence not found")
+    return rule
 
-@router.get("/date/{target_date}", response_model=List[ScheduleResponse])
-def get_schedules_for_date(target_date: date, db: Session = Depends(get_db)):
-    return get_schedules_by_date(db, target_date)
+@router.delete("/recurrences/{recurrence_id}/exceptions/{exception_date}", response_model=ScheduleRecurrenceResponse)
+def restore_occurrence(recurrence_id: int, exception_date: date, db: Session = Depends(get_routed_db)):
+    rule = set_exception(db, recurrence_id, exception_date, skipped=False)
+    if rule is None:
+        raise HTTPException(status_code=404, detail="Recurrence not found")
+    return rule
+
+@router.get("/export/{start_date}/{end_date}")
+def export_schedules(
+    request: Request,
+    start_date: date,
+    end_date: date,
+    format: Literal["ndjson", "csv"] = "ndjson",
+    owner_id: Optional[int] = None,
+):
+    """ Stream a date range as NDJSON or CSV without materializing the result set """
+    if start_date > end_date:
+        raise HTTPException(status_code=400, detail="Start date must be before end date")
+    return StreamingResponse(
+        stream_query(export_schedules_query(start_date, end_date, owner_id), format, bind=read_bind(request)),
+        media_type=EXPORT_FORMATS[format],
+        headers={"Content-Disposition": f'attachment; filename="schedules.{format}"'},
+    )
+
+@router.get("/summary", response_model=ScheduleSummary)
+def get_schedule_summary(
+    start_date: date,
+    end_date: date,
+    group_by: Literal["activity", "day", "week", "month"] = "day",
+    owner_id: Optional[int] = None,
+    db: Session = Depends(get_routed_db)
+):
+    if start_date > end_date:
+        raise HTTPException(status_code=400, detail="Start date must be before end date")
+    return summarize_schedules(db, start_date, end_date, group_by, owner_id)
 
-@router.get("/range/{start_date}/{end_date}", response_model=List[ScheduleResponse])
-def get_schedules_in_range(start_date: date, end_date: date, db: Session = Depends(get_db)):
+@router.get("/charts/{kind}")
+def get_schedule_chart(
+    request: Request,
+    kind: Literal["daily", "activities", "weekly"],
+    start_date: date,
+    end_date: date,
+    format: Literal["json", "png", "svg"] = "json",
+    owner_id: Optional[int] = None,
+    db: Session = Depends(get_routed_db)
+):
+    """ Daily hours, activity breakdown or weekly trend as Plotly figure JSON or a static
+    image (png/svg need kaleido). Cached until a schedule or recurrence write. """
     if start_date > end_date:
         raise HTTPException(status_code=400, detail="Start date must be before end date")
-    return get_schedules_by_date_range(db, start_date, end_date)
+    stamp = chart_version(db, owner_id)
+    etag = weak_etag("chart", kind, format, owner_id, start_date, end_date, *stamp)
+    if is_not_modified(request, etag):
+        return not_modified(etag)
+    try:
+        body = render_chart(db, kind, start_date, end_date, owner_id, format, stamp)
+    except ChartFormatUnavailable as err:
+        raise HTTPException(status_code=501, detail=str(err))
+    return set_validators(Response(body, media_type=CHART_FORMATS[format]), etag)
 
 @router.delete("/{schedule_id}")
-def remove_schedule(schedule_id: int, db: Session = Depends(get_db)):
+def remove_schedule(schedule_id: int, db: Session = Depends(get_routed_db)):
     delete_schedule(db, schedule_id)
     return {"message": "Schedule deleted"}
\ No newline at end of file
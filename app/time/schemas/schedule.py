@@ -1,10 +1,24 @@
-from pydantic import BaseModel
-from datetime import date, datetime
+from pydantic import BaseModel, model_validator
+from datetime import date, datetime, time
+from typing import List, Literal, Optional
+
+def _check_slot(model):
+    """ A time slot needs both ends, with end_time after start_time """
+    if (model.start_time is None) != (model.end_time is None):
+        raise ValueError("start_time and end_time must be given together")
+    if model.start_time is not None and model.start_time >= model.end_time:
+        raise ValueError("end_time must be after start_time")
+    return model
 
 class ScheduleCreate(BaseModel):
     activity: str
     hours: float
     date: date
+    planned: bool = True
+    start_time: Optional[time] = None
+    end_time: Optional[time] = None
+
+    _slot = model_validator(mode="after")(_check_slot)
 
 class ScheduleUpdate(BaseModel):
     activity: str
@@ -16,4 +30,66 @@ class ScheduleResponse(ScheduleCreate):
     created_at: datetime
 
     class Config:
-        from_attributes = True
\ No newline at end of file
+        from_attributes = True
+
+class ScheduleEntryResponse(ScheduleResponse):
+    """ A stored schedule (recurrence_id null) or an occurrence expanded from a rule (id null) """
+    id: Optional[int] = None
+    recurrence_id: Optional[int] = None
+
+class ScheduleRecurrenceCreate(BaseModel):
+    activity: str
+    hours: float
+    planned: bool = True
+    start_time: Optional[time] = None
+    end_time: Optional[time] = None
+    frequency: Literal["daily", "weekly", "monthly"]
+    interval: int = 1
+    # 0 = Monday ... 6 = Sunday
+    weekdays: Optional[List[int]] = None
+    start_date: date
+    until: Optional[date] = None
+    exceptions: List[date] = []
+
+    _slot = model_validator(mode="after")(_check_slot)
+
+class ScheduleRecurrenceResponse(ScheduleRecurrenceCreate):
+    id: int
+    created_at: datetime
+
+    class Config:
+        from_attributes = True
+
+class FreeSlot(BaseModel):
+    date: date
+    start: datetime
+    end: datetime
+    minutes: float
+
+class ScheduleConflict(BaseModel):
+    """ Two entries on the same day whose time slots overlap """
+    date: date
+    first: ScheduleEntryResponse
+    second: ScheduleEntryResponse
+
+class ScheduleBatchCreate(BaseModel):
+    items: List[ScheduleCreate]
+
+class ScheduleSummary(BaseModel):
+    group_by: str
+    keys: List[str]
+    hours: List[float]
+    planned_hours: List[float]
+    actual_hours: List[float]
+    entries: List[int]
+
+class ImportLineError(BaseModel):
+    line: int
+    error: str
+
+class ScheduleImportReport(BaseModel):
+    imported: int
+    failed: int
+    errors: List[ImportLineError]
+    # Set when an unreadable line ended the import early; nothing after it was read
+    stopped_at_line: Optional[int] = None
\ No newline at end of file
@@ -0,0 +1,87 @@
+import base64
+import json
+import re
+from typing import Optional
+
+from sqlalchemy import and_, column, func, literal, literal_column, or_, select, table
+from sqlalchemy.orm import Session
+
+from app.todo.models.todo import Todo
+from app.todo.models.search import POSTGRES_SEARCH_VECTOR
+
+# Title matches weigh more than description matches in SQLite's bm25()
+TITLE_WEIGHT = 10.0
+DESCRIPTION_WEIGHT = 1.0
+
+todos_fts = table("todos_fts", column("rowid"))
+TODO_SEARCH_VECTOR = literal_column(POSTGRES_SEARCH_VECTOR)
+
+_TOKEN = re.compile(r"\w+", re.UNICODE)
+
+def encode_search_cursor(score: float, todo_id: int) -> str:
+    raw = json.dumps([score, todo_id])
+    return base64.urlsafe_b64encode(raw.encode("utf-8")).decode("ascii").rstrip("=")
+
+def decode_search_cursor(cursor: str) -> tuple[float, int]:
+    """ Decode a cursor produced by encode_search_cursor, raising ValueError if it is malformed """
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        score, todo_id = json.loads(base64.urlsafe_b64decode(padded.encode("ascii")))
+        return float(score), int(todo_id)
+    except (ValueError, TypeError) as err:
+        raise ValueError("Invalid cursor") from err
+
+def _terms(q: str) -> list[str]:
+    terms = _TOKEN.findall(q)
+    if not terms:
+        raise ValueError("Search query must contain at least one word")
+    return terms
+
+def _fts5_query(terms: list[str]) -> str:
+    # Quote every term so user input cannot use FTS5 operators; the last term is a
+    # prefix match so results keep up with search-as-you-type.
+    quoted = [f'"{term}"' for term in terms]
+    quoted[-1] += "*"
+    return " ".join(quoted)
+
+def _match(db: Session, q: str):
+    """ (FROM clause, WHERE clause, score expression) for the session's dialect; higher score ranks first """
+    terms = _terms(q)
+    dialect = db.get_bind().dialect.name
+    if dialect == "sqlite":
+        score = -func.bm25(literal_column("todos_fts"), TITLE_WEIGHT, DESCRIPTION_WEIGHT)
+        source = todos_fts.join(Todo.__table__, Todo.id == todos_fts.c.rowid)
+        return source, literal_column("todos_fts").op("MATCH")(_fts5_query(terms)), score
+    if dialect == "postgresql":
+        query = func.plainto_tsquery(literal_column("'english'"), " ".join(terms))
+        return Todo.__table__, TODO_SEARCH_VECTOR.op("@@")(query), func.ts_rank(TODO_SEARCH_VECTOR, query)
+    # No text index on other dialects: every term must appear in the title or description
+    clauses = [or_(Todo.title.ilike(f"%{term}%"), Todo.description.ilike(f"%{term}%")) for term in terms]
+    return Todo.__table__, and_(*clauses), literal(0.0)
+
+def search_todos(
+    db: Session,
+    q: str,
+    cursor: Optional[str] = None,
+    limit: int = 20,
+    completed: bool = None,
+    owner_id: int = None,
+) -> tuple[list[Todo], Optional[str]]:
+    """ Ranked full-text search over titles and descriptions, keyset-paginated on (score, id).
+    Raises ValueError for a query without words or a malformed cursor. """
+    source, matches, score = _match(db, q)
+    score = score.label("score")
+    stmt = select(Todo, score).select_from(source).where(matches)
+    if owner_id is not None:
+        stmt = stmt.where(Todo.owner_id == owner_id)
+    if completed is not None:
+        stmt = stmt.where(Todo.completed == completed)
+    if cursor:
+        last_score, last_id = decode_search_cursor(cursor)
+        stmt = stmt.where(or_(score < last_score, and_(score == last_score, Todo.id > last_id)))
+    rows = db.execute(stmt.order_by(score.desc(), Todo.id).limit(limit + 1)).all()
+    next_cursor = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        next_cursor = encode_search_cursor(rows[-1].score, rows[-1].Todo.id)
+    return [row.Todo for row in rows], next_cursor
@@ -1,36 +1,212 @@
+import base64
+import json
+from datetime import datetime
+from typing import Optional
+
+from sqlalchemy import Select, delete, func, insert, literal, select, tuple_, update
 from sqlalchemy.orm import Session
 from app.todo.models.todo import Todo
-from app.todo.schemas.todo import TodoCreate, TodoUpdate
+from app.todo.schemas.todo import TodoCreate, TodoUpdate, TodoBatchUpdateItem
+from shared.database.batch import bulk_insert, chunked, supports_insert_returning, supports_returning
+from shared.changes.feed import record_change
+
+def encode_cursor(todo: Todo) -> str:
+    """ Build an opaque cursor pointing just past the given todo (entity or row) """
+    raw = json.dumps([todo.created_at.isoformat(), todo.id])
+    return base64.urlsafe_b64encode(raw.encode("utf-8")).decode("ascii").rstrip("=")
+
+def decode_cursor(cursor: str) -> tuple[datetime, int]:
+    """ Decode a cursor produced by encode_cursor, raising ValueError if it is malformed """
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        created_at, todo_id = json.loads(base64.urlsafe_b64decode(padded.encode("ascii")))
+        return datetime.fromisoformat(created_at), int(todo_id)
+    except (ValueError, TypeError) as err:
+        raise ValueError("Invalid cursor") from err
+
+
+def get_todo(db: Session, todo_id: int) -> Todo:
+    return db.query(Todo).filter(Todo.id == todo_id).first()
+
+# Columns in TodoResponse field order, for the row-tuple serialization fast path
+TODO_RESPONSE_COLUMNS = (Todo.title, Todo.description, Todo.completed, Todo.id, Todo.created_at, Todo.updated_at)
 
-def create_todo(db: Session, todo: TodoCreate) -> Todo:
+# Writes return these columns straight from the statement (INSERT/UPDATE ... RETURNING)
+# instead of refreshing the entity with another SELECT after commit.
+
+def _change_payload(todo) -> dict:
+    """ TODO_RESPONSE_COLUMNS of a row or entity, as published on the change feed """
+    return {column.key: getattr(todo, column.key) for column in TODO_RESPONSE_COLUMNS}
+
+def create_todo(db: Session, todo: TodoCreate):
+    """ Insert a todo and return its TODO_RESPONSE_COLUMNS row in one round trip """
+    if supports_insert_returning(db):
+        row = db.execute(insert(Todo).values(**todo.model_dump()).returning(*TODO_RESPONSE_COLUMNS)).one()
+        record_change(db, "todos", "created", row.id, _change_payload(row))
+        db.commit()
+        return row
     db_todo = Todo(**todo.model_dump())
     db.add(db_todo)
+    db.flush()
+    record_change(db, "todos", "created", db_todo.id, _change_payload(db_todo))
     db.commit()
     db.refresh(db_todo)
     return db_todo
 
-def get_todo(db: Session, todo_id: int) -> Todo:
-    return db.query(Todo).filter(Todo.id == todo_id).first()
-
-def get_todos(db: Session, skip: int = 0, limit: int = 100, completed: bool = None) -> list[Todo]:
-    query = db.query(Todo)
+def _filtered_todos(db: Session, completed: Optional[bool], owner_id: Optional[int], rows_only: bool = False):
+    query = db.query(*TODO_RESPONSE_COLUMNS) if rows_only else db.query(Todo)
+    if owner_id is not None:
+        query = query.filter(Todo.owner_id == owner_id)
     if completed is not None:
         query = query.filter(Todo.completed == completed)
+    return query
+
+def get_todos(
+    db: Session, skip: int = 0, limit: int = 100, completed: bool = None, owner_id: int = None, rows_only: bool = False
+) -> list[Todo]:
+    """ Offset-paginated todos; rows_only returns TODO_RESPONSE_COLUMNS tuples instead of entities """
+    query = _filtered_todos(db, completed, owner_id, rows_only)
     return query.offset(skip).limit(limit).all()
 
-def update_todo(db: Session, todo_id: int, todo_update: TodoUpdate) -> Todo:
-    db_todo = db.query(Todo).filter(Todo.id == todo_id).first()
-    if db_todo:
-        for field, value in todo_update.model_dump(exclude_unset=True).items():
-            setattr(db_todo, field, value)
+def get_todos_page(
+    db: Session,
+    cursor: Optional[str] = None,
+    limit: int = 100,
+    completed: bool = None,
+    owner_id: int = None,
+    rows_only: bool = False,
+) -> tuple[list[Todo], Optional[str]]:
+    """ Keyset-paginate todos on (created_at, id), returning the page and the next cursor """
+    query = _filtered_todos(db, completed, owner_id, rows_only)
+    if cursor:
+        created_at, todo_id = decode_cursor(cursor)
+        after = tuple_(literal(created_at, Todo.created_at.type), literal(todo_id, Todo.id.type))
+        query = query.filter(tuple_(Todo.created_at, Todo.id) > after)
+    rows = query.order_by(Todo.created_at, Todo.id).limit(limit + 1).all()
+    if len(rows) > limit:
+        rows = rows[:limit]
+        return rows, encode_cursor(rows[-1])
+    return rows, None
+
+def todos_version_query(completed: bool = None, owner_id: int = None) -> Select:
+    """ (count, max(updated_at), max(id), sum(revision)) over the filtered todos: a cheap
+    collection validator. Edits move sum(revision), inserts move max(id) and deletes move the
+    count; max(updated_at) only serves as Last-Modified. """
+    stmt = select(func.count(Todo.id), func.max(Todo.updated_at), func.max(Todo.id), func.sum(Todo.revision))
+    if owner_id is not None:
+        stmt = stmt.where(Todo.owner_id == owner_id)
+    if completed is not None:
+        stmt = stmt.where(Todo.completed == completed)
+    return stmt
+
+def get_todos_version(db: Session, completed: bool = None, owner_id: int = None):
+    return db.execute(todos_version_query(completed, owner_id)).one()
+
+def export_todos_query(completed: bool = None, owner_id: int = None) -> Select:
+    """ Column-only SELECT for streaming exports, ordered along the keyset index """
+    stmt = select(
+        Todo.id, Todo.title, Todo.description, Todo.completed, Todo.created_at, Todo.updated_at
+    )
+    if owner_id is not None:
+        stmt = stmt.where(Todo.owner_id == owner_id)
+    if completed is not None:
+        stmt = stmt.where(Todo.completed == completed)
+    return stmt.order_by(Todo.created_at, Todo.id)
+
+def update_todo(db: Session, todo_id: int, todo_update: TodoUpdate):
+    """ Apply a partial update with a single UPDATE ... RETURNING; None if the todo does not exist """
+    values = todo_update.model_dump(exclude_unset=True)
+    if not values:
+        return db.execute(select(*TODO_RESPONSE_COLUMNS).where(Todo.id == todo_id)).first()
+    stmt = (
+        update(Todo).where(Todo.id == todo_id)
+        .values(**values, revision=Todo.revision + 1)
+        .execution_options(synchronize_session=False)
+    )
+    if supports_returning(db):
+        row = db.execute(stmt.returning(*TODO_RESPONSE_COLUMNS)).first()
+        if row is not None:
+            record_change(db, "todos", "updated", todo_id, _change_payload(row))
         db.commit()
-        db.refresh(db_todo)
-    return db_todo
+        return row
+    if db.execute(stmt).rowcount == 0:
+        db.rollback()
+        return None
+    row = db.execute(select(*TODO_RESPONSE_COLUMNS).where(Todo.id == todo_id)).first()
+    record_change(db, "todos", "updated", todo_id, _change_payload(row))
+    db.commit()
+    return row
 
 def delete_todo(db: Session, todo_id: int) -> bool:
-    db_todo = db.query(Todo).filter(Todo.id == todo_id).first()
-    if db_todo:
-        db.delete(db_todo)
-        db.commit()
-        return True
-    return False
\ No newline at end of file
+    """ Delete by primary key in one statement; the rowcount says whether the todo existed """
+    deleted = db.execute(
+        delete(Todo).where(Todo.id == todo_id).execution_options(synchronize_session=False)
+    ).rowcount
+    if deleted:
+        record_change(db, "todos", "deleted", todo_id)
+    db.commit()
+    return deleted > 0
+
+
+def create_todos_bulk(db: Session, todos: list[TodoCreate]) -> list[dict]:
+    """ Insert many todos in one transaction, one INSERT statement per chunk.
+    Batch writes publish ids only on the change feed; clients fetch what they need. """
+    results = []
+    for chunk in chunked(todos):
+        ids = bulk_insert(db, Todo, [todo.model_dump() for todo in chunk])
+        for todo_id in ids:
+            record_change(db, "todos", "created", todo_id)
+        results.extend(
+            {"index": index, "id": todo_id, "status": "created"}
+            for index, todo_id in enumerate(ids, start=len(results))
+        )
+    db.commit()
+    return results
+
+def update_todos_bulk(db: Session, updates: list[TodoBatchUpdateItem]) -> list[dict]:
+    """ Apply many partial updates in one transaction using bulk UPDATE by primary key """
+    results = []
+    for chunk in chunked(updates):
+        existing = set(db.scalars(select(Todo.id).where(Todo.id.in_([item.id for item in chunk]))))
+        rows, updated = [], set()
+        for item in chunk:
+            status = "updated" if item.id in existing else "not_found"
+            results.append({"index": len(results), "id": item.id, "status": status})
+            values = item.model_dump(exclude_unset=True)
+            if item.id in existing and len(values) > 1:
+                rows.append(values)
+                updated.add(item.id)
+                record_change(db, "todos", "updated", item.id)
+        if rows:
+            db.execute(update(Todo), rows)
+            # The bulk UPDATE by primary key takes plain values only; bump revisions in one more statement
+            db.execute(
+                update(Todo).where(Todo.id.in_(updated)).values(revision=Todo.revision + 1)
+                .execution_options(synchronize_session=False)
+            )
+    db.commit()
+    return results
+
+def delete_todos_bulk(db: Session, todo_ids: list[int]) -> list[dict]:
+    """ Delete many todos in one transaction, one DELETE ... IN statement per chunk.
+    A repeated id is reported as duplicate; only its first occurrence can delete. """
+    deleted = set()
+    for chunk in chunked(todo_ids):
+        stmt = delete(Todo).where(Todo.id.in_(chunk))
+        if supports_returning(db):
+            deleted.update(db.scalars(stmt.returning(Todo.id)))
+        else:
+            deleted.update(db.scalars(select(Todo.id).where(Todo.id.in_(chunk))))
+            db.execute(stmt)
+    for todo_id in sorted(deleted):
+        record_change(db, "todos", "deleted", todo_id)
+    db.commit()
+    results, seen = [], set()
+    for index, todo_id in enumerate(todo_ids):
+        if todo_id in seen:
+            status = "duplicate"
+        else:
+            status = "deleted" if todo_id in deleted else "not_found"
+            seen.add(todo_id)
+        results.append({"index": index, "id": todo_id, "status": status})
+    return results
@@ -0,0 +1,74 @@
+from typing import Optional
+
+from sqlalchemy import literal, select, tuple_
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.todo.models.todo import Todo
+from app.todo.schemas.todo import TodoCreate, TodoUpdate, TodoBatchUpdateItem
+from app.todo.crud import todo as crud_todo
+from app.todo.crud.todo import TODO_RESPONSE_COLUMNS, decode_cursor, encode_cursor
+
+async def get_todo(db: AsyncSession, todo_id: int) -> Todo:
+    return await db.get(Todo, todo_id)
+
+def _filtered_todos(completed: Optional[bool], owner_id: Optional[int], rows_only: bool = False):
+    stmt = select(*TODO_RESPONSE_COLUMNS) if rows_only else select(Todo)
+    if owner_id is not None:
+        stmt = stmt.where(Todo.owner_id == owner_id)
+    if completed is not None:
+        stmt = stmt.where(Todo.completed == completed)
+    return stmt
+
+async def _fetch(db: AsyncSession, stmt, rows_only: bool) -> list:
+    if rows_only:
+        return list((await db.execute(stmt)).all())
+    return list(await db.scalars(stmt))
+
+async def get_todos(
+    db: AsyncSession, skip: int = 0, limit: int = 100, completed: bool = None, owner_id: int = None, rows_only: bool = False
+) -> list[Todo]:
+    stmt = _filtered_todos(completed, owner_id, rows_only).offset(skip).limit(limit)
+    return await _fetch(db, stmt, rows_only)
+
+async def get_todos_page(
+    db: AsyncSession,
+    cursor: Optional[str] = None,
+    limit: int = 100,
+    completed: bool = None,
+    owner_id: int = None,
+    rows_only: bool = False,
+) -> tuple[list[Todo], Optional[str]]:
+    """ Async counterpart of crud.todo.get_todos_page """
+    stmt = _filtered_todos(completed, owner_id, rows_only)
+    if cursor:
+        created_at, todo_id = decode_cursor(cursor)
+        after = tuple_(literal(created_at, Todo.created_at.type), literal(todo_id, Todo.id.type))
+        stmt = stmt.where(tuple_(Todo.created_at, Todo.id) > after)
+    rows = await _fetch(db, stmt.order_by(Todo.created_at, Todo.id).limit(limit + 1), rows_only)
+    if len(rows) > limit:
+        rows = rows[:limit]
+        return rows, encode_cursor(rows[-1])
+    return rows, None
+
+async def get_todos_version(db: AsyncSession, completed: bool = None, owner_id: int = None):
+    return (await db.execute(crud_todo.todos_version_query(completed, owner_id))).one()
+
+# The write paths are pure statement execution, so the sync implementations run
+# unchanged on the async connection through run_sync.
+
+async def create_todo(db: AsyncSession, todo: TodoCreate):
+    return await db.run_sync(crud_todo.create_todo, todo)
+
+async def update_todo(db: AsyncSession, todo_id: int, todo_update: TodoUpdate):
+    return await db.run_sync(crud_todo.update_todo, todo_id, todo_update)
+
+async def delete_todo(db: AsyncSession, todo_id: int) -> bool:
+    return await db.run_sync(crud_todo.delete_todo, todo_id)
+
+async def create_todos_bulk(db: AsyncSession, todos: list[TodoCreate]) -> list[dict]:
+    return await db.run_sync(crud_todo.create_todos_bulk, todos)
+
+async def update_todos_bulk(db: AsyncSession, updates: list[TodoBatchUpdateItem]) -> list[dict]:
+    return await db.run_sync(crud_todo.update_todos_bulk, updates)
+
+async def delete_todos_bulk(db: AsyncSession, todo_ids: list[int]) -> list[dict]:
+    return await db.run_sync(crud_todo.delete_todos_bulk, todo_ids)
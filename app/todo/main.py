@@ -1,11 +1,22 @@
 from fastapi import FastAPI
-from app.todo.routes.todos import router as todos_router
+from shared.metrics import RequestMetricsMiddleware
+from shared.routes.internal import router as internal_router
+from shared.routes.metrics import router as metrics_router
+from shared.routes.changes import router as changes_router
+from shared.database.session import DATABASE_MODE
 
-from shared.database.session import create_tables
+if DATABASE_MODE == "async":
+    from app.todo.routes.todos_async import router as todos_router
+else:
+    from app.todo.routes.todos import router as todos_router
 
 app = FastAPI(title="Todo Service")
 
 app.include_router(todos_router)
+app.include_router(internal_router)
+app.include_router(metrics_router)
+app.include_router(changes_router)
+app.add_middleware(RequestMetricsMiddleware)
 
 @app.get("/")
 def read_root():
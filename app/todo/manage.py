@@ -0,0 +1,22 @@
+""" Maintenance commands for the todo service.
+
+    python -m app.todo.manage search-rebuild
+"""
+import argparse
+import sys
+
+from shared.database.session import get_engine
+from app.todo.models.search import rebuild_search_index
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(prog="python -m app.todo.manage")
+    parser.add_argument("command", choices=["search-rebuild"])
+    parser.parse_args(argv)
+
+    with get_engine().begin() as connection:
+        rebuild_search_index(connection)
+    print("Rebuilt todo search index")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
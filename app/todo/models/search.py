@@ -0,0 +1,47 @@
+""" Full-text index over todo titles and descriptions, maintained by the database itself.
+
+SQLite gets an external-content FTS5 table kept current by triggers, so every write path
+(ORM, bulk statements, imports) updates it in the same transaction. Postgres gets a GIN
+index on the tsvector expression that search queries repeat verbatim.
+"""
+from sqlalchemy import text
+from sqlalchemy.engine import Connection
+
+# Must match TODO_SEARCH_VECTOR in app.todo.crud.search for the GIN index to be used
+POSTGRES_SEARCH_VECTOR = "to_tsvector('english', coalesce(title, '') || ' ' || coalesce(description, ''))"
+
+SQLITE_SEARCH_DDL = (
+    "CREATE VIRTUAL TABLE IF NOT EXISTS todos_fts USING fts5("
+    "title, description, content='todos', content_rowid='id', tokenize='unicode61 remove_diacritics 2')",
+    "CREATE TRIGGER IF NOT EXISTS todos_fts_insert AFTER INSERT ON todos BEGIN "
+    "INSERT INTO todos_fts(rowid, title, description) VALUES (new.id, new.title, new.description); END",
+    "CREATE TRIGGER IF NOT EXISTS todos_fts_delete AFTER DELETE ON todos BEGIN "
+    "INSERT INTO todos_fts(todos_fts, rowid, title, description) VALUES ('delete', old.id, old.title, old.description); END",
+    "CREATE TRIGGER IF NOT EXISTS todos_fts_update AFTER UPDATE OF title, description ON todos BEGIN "
+    "INSERT INTO todos_fts(todos_fts, rowid, title, description) VALUES ('delete', old.id, old.title, old.description); "
+    "INSERT INTO todos_fts(rowid, title, description) VALUES (new.id, new.title, new.description); END",
+)
+
+POSTGRES_SEARCH_DDL = (
+    f"CREATE INDEX IF NOT EXISTS ix_todos_search ON todos USING GIN ({POSTGRES_SEARCH_VECTOR})",
+)
+
+def create_search_index(connection: Connection):
+    """ Create the dialect's text index if missing; other dialects search unindexed """
+    dialect = connection.dialect.name
+    statements = SQLITE_SEARCH_DDL if dialect == "sqlite" else POSTGRES_SEARCH_DDL if dialect == "postgresql" else ()
+    for statement in statements:
+        connection.execute(text(statement))
+
+def drop_search_index(connection: Connection):
+    # SQLite drops the triggers with the table, but the FTS5 table would outlive it
+    if connection.dialect.name == "sqlite":
+        connection.execute(text("DROP TABLE IF EXISTS todos_fts"))
+
+def rebuild_search_index(connection: Connection):
+    """ Create the index if needed and repopulate it from the todos table """
+    create_search_index(connection)
+    if connection.dialect.name == "sqlite":
+        connection.execute(text("INSERT INTO todos_fts(todos_fts) VALUES ('rebuild')"))
+    elif connection.dialect.name == "postgresql":
+        connection.execute(text("REINDEX INDEX ix_todos_search"))
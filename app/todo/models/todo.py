@@ -1,17 +1,44 @@
-from sqlalchemy import Column, Integer, String, Boolean, DateTime, ForeignKey
+from sqlalchemy import Column, Integer, String, Boolean, DateTime, ForeignKey, Index, event
+from sqlalchemy.dialects.sqlite import DATETIME as SQLITE_DATETIME
 from sqlalchemy.sql import func
 from sqlalchemy.orm import relationship
 from shared.database.base import Base
+from app.user.models.user import User  # noqa: F401  (FK and relationship target)
+from app.todo.models.search import create_search_index, drop_search_index
+
+# SQLite fills server_default=func.now() as "YYYY-MM-DD HH:MM:SS"; binding cursor
+# values in the same text format keeps keyset comparisons on created_at correct.
+_CreatedAt = DateTime().with_variant(
+    SQLITE_DATETIME(storage_format="%(year)04d-%(month)02d-%(day)02d %(hour)02d:%(minute)02d:%(second)02d"),
+    "sqlite",
+)
 
 class Todo(Base):
     __tablename__ = "todos"
+    __table_args__ = (
+        # Keyset pagination walks (created_at, id); the composite indexes let
+        # every page, however deep, resolve as a single index range scan.
+        Index("ix_todos_created_at_id", "created_at", "id"),
+        Index("ix_todos_completed_created_at_id", "completed", "created_at", "id"),
+        Index("ix_todos_owner_completed_created_at_id", "owner_id", "completed", "created_at", "id"),
+        # Never reuse ids (SQLite otherwise may), so max(id) in the collection ETag only grows
+        {"sqlite_autoincrement": True},
+    )
     
     id = Column(Integer, primary_key=True, index=True)
     title = Column(String(255), nullable=False)
     description = Column(String, nullable=True)
     completed = Column(Boolean, default=False)
     owner_id = Column(Integer, ForeignKey("users.id", name="fk_todo_owner_id"))
-    created_at = Column(DateTime, server_default=func.now())
+    created_at = Column(_CreatedAt, server_default=func.now())
     updated_at = Column(DateTime, server_default=func.now(), onupdate=func.now())
+    # Bumped by every update; updated_at has one-second precision on SQLite, so two edits
+    # within a second would otherwise leave the ETags unchanged
+    revision = Column(Integer, nullable=False, default=1)
     
-    owner = relationship("User", back_populates="todos")
\ No newline at end of file
+    owner = relationship("User", backref="todos")
+
+# The full-text index is created together with the table (init-schema); existing
+# databases get it from: python -m app.todo.manage search-rebuild
+event.listen(Todo.__table__, "after_create", lambda target, connection, **kw: create_search_index(connection))
+event.listen(Todo.__table__, "before_drop", lambda target, connection, **kw: drop_search_index(connection))
@@ -1,36 +1,141 @@
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response
+from fastapi.responses import StreamingResponse
 from sqlalchemy.orm import Session
-from typing import List
-from shared.database.session import get_db
-from app.todo.schemas.todo import TodoCreate, TodoUpdate, TodoResponse
+from typing import List, Literal, Optional, Union
+from shared.database.session import get_routed_db, read_bind
+from shared.database.batch import BATCH_MAX_SIZE, PAGE_MAX_SIZE
+from shared.fastjson import FAST_SERIALIZATION, rows_response
+from shared.conditional import is_not_modified, not_modified, set_validators, weak_etag
+from shared.export import EXPORT_FORMATS, stream_query
+from shared.schemas import BatchResult
+from app.todo.schemas.todo import (
+    TodoCreate, TodoUpdate, TodoResponse, TodoPage,
+    TodoBatchCreate, TodoBatchUpdate, TodoBatchDelete,
+)
+from app.todo.crud.todo import TODO_RESPONSE_COLUMNS
 
 router = APIRouter(prefix="/todos", tags=["todos"])
 
+TODO_FIELDS = [column.key for column in TODO_RESPONSE_COLUMNS]
+
 @router.post("/", response_model=TodoResponse)
-def create_todo(todo: TodoCreate, db: Session = Depends(get_db)):
+def create_todo(todo: TodoCreate, db: Session = Depends(get_routed_db)):
     from app.todo.crud.todo import create_todo as crud_create_todo
     return crud_create_todo(db, todo)
 
+def _check_batch_size(size: int):
+    if size > BATCH_MAX_SIZE:
+        raise HTTPException(status_code=413, detail=f"Batch exceeds maximum size of {BATCH_MAX_SIZE}")
+
+@router.post("/batch", response_model=BatchResult)
+def create_todos_batch(batch: TodoBatchCreate, db: Session = Depends(get_routed_db)):
+    from app.todo.crud.todo import create_todos_bulk
+    _check_batch_size(len(batch.items))
+    return {"results": create_todos_bulk(db, batch.items)}
+
+@router.patch("/batch", response_model=BatchResult)
+def update_todos_batch(batch: TodoBatchUpdate, db: Session = Depends(get_routed_db)):
+    from app.todo.crud.todo import update_todos_bulk
+    _check_batch_size(len(batch.items))
+    return {"results": update_todos_bulk(db, batch.items)}
+
+@router.delete("/batch", response_model=BatchResult)
+def delete_todos_batch(batch: TodoBatchDelete, db: Session = Depends(get_routed_db)):
+    from app.todo.crud.todo import delete_todos_bulk
+    _check_batch_size(len(batch.ids))
+    return {"results": delete_todos_bulk(db, batch.ids)}
+
+@router.get("/export")
+def export_todos(
+    request: Request,
+    format: Literal["ndjson", "csv"] = "ndjson",
+    completed: bool = None,
+    owner_id: Optional[int] = None,
+):
+    """ Stream todos as NDJSON or CSV without materializing the result set """
+    from app.todo.crud.todo import export_todos_query
+    return StreamingResponse(
+        stream_query(export_todos_query(completed, owner_id), format, bind=read_bind(request)),
+        media_type=EXPORT_FORMATS[format],
+        headers={"Content-Disposition": f'attachment; filename="todos.{format}"'},
+    )
+
+@router.get("/search", response_model=TodoPage)
+def search_todos(
+    q: str,
+    limit: int = Query(20, ge=1, le=PAGE_MAX_SIZE),
+    completed: bool = None,
+    owner_id: Optional[int] = None,
+    cursor: Optional[str] = None,
+    db: Session = Depends(get_routed_db)
+):
+    """ Ranked full-text search over titles and descriptions; follow `next_cursor` for more """
+    from app.todo.crud.search import search_todos as crud_search_todos
+    try:
+        items, next_cursor = crud_search_todos(
+            db, q, cursor=cursor, limit=limit, completed=completed, owner_id=owner_id
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    return {"items": items, "next_cursor": next_cursor}
+
 @router.get("/{todo_id}", response_model=TodoResponse)
-def get_todo(todo_id: int, db: Session = Depends(get_db)):
+def get_todo(todo_id: int, request: Request, response: Response, db: Session = Depends(get_routed_db)):
+    """ Fetch one todo; the validators come from the row itself, so a 304 skips serialization """
     from app.todo.crud.todo import get_todo as crud_get_todo
     db_todo = crud_get_todo(db, todo_id)
     if not db_todo:
         raise HTTPException(status_code=404, detail="Todo not found")
+    etag = weak_etag("todo", db_todo.id, db_todo.revision, db_todo.updated_at)
+    if is_not_modified(request, etag, db_todo.updated_at):
+        return not_modified(etag, db_todo.updated_at)
+    set_validators(response, etag, db_todo.updated_at)
     return db_todo
 
-@router.get("/", response_model=List[TodoResponse])
+@router.get("/", response_model=Union[TodoPage, List[TodoResponse]])
 def get_todos(
-    skip: int = 0, 
-    limit: int = 100, 
+    request: Request,
+    response: Response,
+    skip: int = Query(0, ge=0),
+    limit: int = Query(100, ge=1, le=PAGE_MAX_SIZE),
     completed: bool = None, 
-    db: Session = Depends(get_db)
+    owner_id: Optional[int] = None,
+    cursor: Optional[str] = None,
+    db: Session = Depends(get_routed_db)
 ):
+    """ List todos; pass `cursor` (empty for the first page) to switch to keyset pagination.
+    Unchanged collections answer If-None-Match with 304 before any row is loaded. Last-Modified
+    is informational here: a delete does not move max(updated_at), so only the ETag is trusted. """
+    from app.todo.crud.todo import get_todos_version
+    count, last_modified, max_id, revisions = get_todos_version(db, completed=completed, owner_id=owner_id)
+    etag = weak_etag("todos", completed, owner_id, count, max_id, revisions)
+    if is_not_modified(request, etag):
+        return not_modified(etag, last_modified)
+    if cursor is not None:
+        from app.todo.crud.todo import get_todos_page as crud_get_todos_page
+        try:
+            items, next_cursor = crud_get_todos_page(
+                db, cursor=cursor, limit=limit, completed=completed, owner_id=owner_id,
+                rows_only=FAST_SERIALIZATION,
+            )
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=str(e))
+        if FAST_SERIALIZATION:
+            page = rows_response(TODO_FIELDS, items, wrap=lambda content: {"items": content, "next_cursor": next_cursor})
+            return set_validators(page, etag, last_modified)
+        set_validators(response, etag, last_modified)
+        return {"items": items, "next_cursor": next_cursor}
     from app.todo.crud.todo import get_todos as crud_get_todos
-    return crud_get_todos(db, skip=skip, limit=limit, completed=completed)
+    todos = crud_get_todos(
+        db, skip=skip, limit=limit, completed=completed, owner_id=owner_id, rows_only=FAST_SERIALIZATION
+    )
+    if FAST_SERIALIZATION:
+        return set_validators(rows_response(TODO_FIELDS, todos), etag, last_modified)
+    set_validators(response, etag, last_modified)
+    return todos
 
 @router.put("/{todo_id}", response_model=TodoResponse)
-def update_todo(todo_id: int, todo_update: TodoUpdate, db: Session = Depends(get_db)):
+def update_todo(todo_id: int, todo_update: TodoUpdate, db: Session = Depends(get_routed_db)):
     from app.todo.crud.todo import update_todo as crud_update_todo
     db_todo = crud_update_todo(db, todo_id, todo_update)
     if not db_todo:
@@ -38,7 +143,7 @@ def update_todo(todo_id: int, todo_update: TodoUpdate, db: Session = Depends(get
     return db_todo
 
 @router.delete("/{todo_id}")
-def delete_todo(todo_id: int, db: Session = Depends(get_db)):
+def delete_todo(todo_id: int, db: Session = Depends(get_routed_db)):
     from app.todo.crud.todo import delete_todo as crud_delete_todo
     success = crud_delete_todo(db, todo_id)
     if not success:
@@ -0,0 +1,141 @@
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response
+from fastapi.responses import StreamingResponse
+from sqlalchemy.ext.asyncio import AsyncSession
+from typing import List, Literal, Optional, Union
+from shared.database.async_session import get_routed_async_db, read_bind
+from shared.database.batch import BATCH_MAX_SIZE, PAGE_MAX_SIZE
+from shared.fastjson import FAST_SERIALIZATION, rows_response
+from shared.conditional import is_not_modified, not_modified, set_validators, weak_etag
+from shared.export import EXPORT_FORMATS, astream_query
+from shared.schemas import BatchResult
+from app.todo.schemas.todo import (
+    TodoCreate, TodoUpdate, TodoResponse, TodoPage,
+    TodoBatchCreate, TodoBatchUpdate, TodoBatchDelete,
+)
+from app.todo.crud import todo_async as crud_todo
+from app.todo.crud import search as crud_search
+from app.todo.crud.todo import export_todos_query, TODO_RESPONSE_COLUMNS
+
+router = APIRouter(prefix="/todos", tags=["todos"])
+
+TODO_FIELDS = [column.key for column in TODO_RESPONSE_COLUMNS]
+
+@router.post("/", response_model=TodoResponse)
+async def create_todo(todo: TodoCreate, db: AsyncSession = Depends(get_routed_async_db)):
+    return await crud_todo.create_todo(db, todo)
+
+def _check_batch_size(size: int):
+    if size > BATCH_MAX_SIZE:
+        raise HTTPException(status_code=413, detail=f"Batch exceeds maximum size of {BATCH_MAX_SIZE}")
+
+@router.post("/batch", response_model=BatchResult)
+async def create_todos_batch(batch: TodoBatchCreate, db: AsyncSession = Depends(get_routed_async_db)):
+    _check_batch_size(len(batch.items))
+    return {"results": await crud_todo.create_todos_bulk(db, batch.items)}
+
+@router.patch("/batch", response_model=BatchResult)
+async def update_todos_batch(batch: TodoBatchUpdate, db: AsyncSession = Depends(get_routed_async_db)):
+    _check_batch_size(len(batch.items))
+    return {"results": await crud_todo.update_todos_bulk(db, batch.items)}
+
+@router.delete("/batch", response_model=BatchResult)
+async def delete_todos_batch(batch: TodoBatchDelete, db: AsyncSession = Depends(get_routed_async_db)):
+    _check_batch_size(len(batch.ids))
+    return {"results": await crud_todo.delete_todos_bulk(db, batch.ids)}
+
+@router.get("/export")
+async def export_todos(
+    request: Request,
+    format: Literal["ndjson", "csv"] = "ndjson",
+    completed: bool = None,
+    owner_id: Optional[int] = None,
+):
+    """ Stream todos as NDJSON or CSV without materializing the result set """
+    return StreamingResponse(
+        astream_query(export_todos_query(completed, owner_id), format, bind=await read_bind(request)),
+        media_type=EXPORT_FORMATS[format],
+        headers={"Content-Disposition": f'attachment; filename="todos.{format}"'},
+    )
+
+@router.get("/search", response_model=TodoPage)
+async def search_todos(
+    q: str,
+    limit: int = Query(20, ge=1, le=PAGE_MAX_SIZE),
+    completed: bool = None,
+    owner_id: Optional[int] = None,
+    cursor: Optional[str] = None,
+    db: AsyncSession = Depends(get_routed_async_db)
+):
+    """ Ranked full-text search over titles and descriptions; follow `next_cursor` for more """
+    try:
+        items, next_cursor = await db.run_sync(
+            crud_search.search_todos, q, cursor=cursor, limit=limit, completed=completed, owner_id=owner_id
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    return {"items": items, "next_cursor": next_cursor}
+
+@router.get("/{todo_id}", response_model=TodoResponse)
+async def get_todo(todo_id: int, request: Request, response: Response, db: AsyncSession = Depends(get_routed_async_db)):
+    """ Fetch one todo; the validators come from the row itself, so a 304 skips serialization """
+    db_todo = await crud_todo.get_todo(db, todo_id)
+    if not db_todo:
+        raise HTTPException(status_code=404, detail="Todo not found")
+    etag = weak_etag("todo", db_todo.id, db_todo.revision, db_todo.updated_at)
+    if is_not_modified(request, etag, db_todo.updated_at):
+        return not_modified(etag, db_todo.updated_at)
+    set_validators(response, etag, db_todo.updated_at)
+    return db_todo
+
+@router.get("/", response_model=Union[TodoPage, List[TodoResponse]])
+async def get_todos(
+    request: Request,
+    response: Response,
+    skip: int = Query(0, ge=0),
+    limit: int = Query(100, ge=1, le=PAGE_MAX_SIZE),
+    completed: bool = None, 
+    owner_id: Optional[int] = None,
+    cursor: Optional[str] = None,
+    db: AsyncSession = Depends(get_routed_async_db)
+):
+    """ List todos; pass `cursor` (empty for the first page) to switch to keyset pagination.
+    Unchanged collections answer If-None-Match with 304 before any row is loaded. Last-Modified
+    is informational here: a delete does not move max(updated_at), so only the ETag is trusted. """
+    count, last_modified, max_id, revisions = await crud_todo.get_todos_version(db, completed=completed, owner_id=owner_id)
+    etag = weak_etag("todos", completed, owner_id, count, max_id, revisions)
+    if is_not_modified(request, etag):
+        return not_modified(etag, last_modified)
+    if cursor is not None:
+        try:
+            items, next_cursor = await crud_todo.get_todos_page(
+                db, cursor=cursor, limit=limit, completed=completed, owner_id=owner_id,
+                rows_only=FAST_SERIALIZATION,
+            )
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=str(e))
+        if FAST_SERIALIZATION:
+            page = rows_response(TODO_FIELDS, items, wrap=lambda content: {"items": content, "next_cursor": next_cursor})
+            return set_validators(page, etag, last_modified)
+        set_validators(response, etag, last_modified)
+        return {"items": items, "next_cursor": next_cursor}
+    todos = await crud_todo.get_todos(
+        db, skip=skip, limit=limit, completed=completed, owner_id=owner_id, rows_only=FAST_SERIALIZATION
+    )
+    if FAST_SERIALIZATION:
+        return set_validators(rows_response(TODO_FIELDS, todos), etag, last_modified)
+    set_validators(response, etag, last_modified)
+    return todos
+
+@router.put("/{todo_id}", response_model=TodoResponse)
+async def update_todo(todo_id: int, todo_update: TodoUpdate, db: AsyncSession = Depends(get_routed_async_db)):
+    db_todo = await crud_todo.update_todo(db, todo_id, todo_update)
+    if not db_todo:
+        raise HTTPException(status_code=404, detail="Todo not found")
+    return db_todo
+
+@router.delete("/{todo_id}")
+async def delete_todo(todo_id: int, db: AsyncSession = Depends(get_routed_async_db)):
+    success = await crud_todo.delete_todo(db, todo_id)
+    if not success:
+        raise HTTPException(status_code=404, detail="Todo not found")
+    return {"message": "Todo deleted successfully"}
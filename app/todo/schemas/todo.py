@@ -1,6 +1,6 @@
-from pydantic import BaseModel
+from pydantic import BaseModel, field_validator
 from datetime import datetime
-from typing import Optional
+from typing import List, Optional
 
 class TodoBase(BaseModel):
     title: str
@@ -15,10 +15,35 @@ class TodoUpdate(BaseModel):
     description: Optional[str] = None
     completed: Optional[bool] = None
 
+    @field_validator("title", "completed")
+    @classmethod
+    def _not_null(cls, value, info):
+        # Omitting a field leaves it unchanged; an explicit null would store NULL in a column
+        # the responses require (title is NOT NULL, completed is a bool)
+        if value is None:
+            raise ValueError(f"{info.field_name} cannot be null")
+        return value
+
 class TodoResponse(TodoBase):
     id: int
     created_at: datetime
     updated_at: datetime
 
     class Config:
-        from_attributes = True
\ No newline at end of file
+        from_attributes = True
+
+class TodoPage(BaseModel):
+    items: List[TodoResponse]
+    next_cursor: Optional[str] = None
+
+class TodoBatchUpdateItem(TodoUpdate):
+    id: int
+
+class TodoBatchCreate(BaseModel):
+    items: List[TodoCreate]
+
+class TodoBatchUpdate(BaseModel):
+    items: List[TodoBatchUpdateItem]
+
+class TodoBatchDelete(BaseModel):
+    ids: List[int]
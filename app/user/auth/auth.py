@@ -1,3 +1,4 @@
+import logging
 import os
 import bcrypt
 from datetime import datetime, timedelta, UTC
@@ -9,17 +10,22 @@ from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
 from dotenv import load_dotenv
 from sqlalchemy.orm import Session
 
+from app.user.auth.cache import token_cache, token_digest
+from app.user.auth.revocation import revocations
+
 load_dotenv()
 
 SECRET_KEY = os.getenv("JWT_SECRET_KEY", "your_secret_key_here")
 ALGORITHM = os.getenv("JWT_ALGORITHM", "HS256")
 ACCESS_TOKEN_EXPIRE_MINUTES = int(os.getenv("JWT_ACCESS_TOKEN_EXPIRE_MINUTES", "30"))
+REFRESH_TOKEN_EXPIRE_DAYS = int(os.getenv("JWT_REFRESH_TOKEN_EXPIRE_DAYS", "7"))
+BCRYPT_ROUNDS = int(os.getenv("BCRYPT_ROUNDS", "12"))
 
 # Initialize security scheme
 security = HTTPBearer()
 
-print(f"SECRET_KEY loaded: {'Yes' if SECRET_KEY != 'your_secret_key_here' else 'No'}")
-print(f"ALGORITHM: {ALGORITHM}, EXPIRE_MINUTES: {ACCESS_TOKEN_EXPIRE_MINUTES}")
+if SECRET_KEY == "your_secret_key_here":
+    logging.getLogger(__name__).warning("JWT_SECRET_KEY is not set; using the insecure default")
 
 def create_access_token(data: dict, expires_delta: timedelta | None = None) -> str:
     """Create a JWT token with expiration and additional security claims"""
@@ -39,7 +45,11 @@ def create_access_token(data: dict, expires_delta: timedelta | None = None) -> s
     return encoded_jwt
 
 def verify_access_token(token: str) -> Optional[Dict[str, Any]]:
-    """Decode and verify JWT token with proper error handling"""
+    """Decode and verify JWT token with proper error handling, reusing cached payloads"""
+    key = token_digest(token)
+    cached = token_cache.get(key)
+    if cached is not None:
+        return cached
     try:
         payload = jwt.decode(
             token, 
@@ -50,6 +60,7 @@ def verify_access_token(token: str) -> Optional[Dict[str, Any]]:
                 "verify_iat": True,  # Verify issued at time
             }
         )
+        token_cache.set(key, payload, expires_at=payload.get("exp"))
         return payload
     except JWTError as e:
         print(f"Token verification error: {e}")
@@ -80,6 +91,10 @@ def get_current_user_payload(credentials: HTTPAuthorizationCredentials = Depends
     
     if token_type != "access":
         raise credentials_exception
+
+    # Tokens issued through login or refresh carry their refresh family
+    if revocations.is_revoked(payload.get("fam")):
+        raise credentials_exception
     
     return payload
 
@@ -110,9 +125,9 @@ def _truncate_password_bytes(password: str) -> bytes:
     return pw_bytes
 
 def get_password_hash(password: str) -> str:
-    """Generate bcrypt hash for password"""
+    """Generate bcrypt hash for password (runs inline; services go through auth.hashing)"""
     pw_bytes = _truncate_password_bytes(password)
-    hashed = bcrypt.hashpw(pw_bytes, bcrypt.gensalt(rounds=12))  # Increased rounds for security
+    hashed = bcrypt.hashpw(pw_bytes, bcrypt.gensalt(rounds=BCRYPT_ROUNDS))
     return hashed.decode("utf-8")
 
 def verify_password(plain_password: str, hashed_password: str) -> bool:
@@ -124,11 +139,10 @@ def verify_password(plain_password: str, hashed_password: str) -> bool:
         print(f"Password verification error: {e}")
         return False
 
-# Optional: Add refresh token functionality
 def create_refresh_token(data: dict, expires_delta: timedelta | None = None) -> str:
     """Create a refresh token with longer expiration"""
     to_encode = data.copy()
-    expire = datetime.now(UTC) + (expires_delta or timedelta(days=7))  # 7 days for refresh token
+    expire = datetime.now(UTC) + (expires_delta or timedelta(days=REFRESH_TOKEN_EXPIRE_DAYS))
     
     to_encode.update({
         "exp": expire,
@@ -137,4 +151,14 @@ def create_refresh_token(data: dict, expires_delta: timedelta | None = None) ->
     })
     
     encoded_jwt = jwt.encode(to_encode, SECRET_KEY, algorithm=ALGORITHM)
-    return encoded_jwt
\ No newline at end of file
+    return encoded_jwt
+
+def verify_refresh_token(token: str) -> Optional[Dict[str, Any]]:
+    """Decode a refresh token; None unless it is valid, unexpired and of type refresh"""
+    try:
+        payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
+    except JWTError:
+        return None
+    if payload.get("type") != "refresh" or not payload.get("jti") or not payload.get("fam"):
+        return None
+    return payload
@@ -0,0 +1,24 @@
+import hashlib
+import os
+
+from dotenv import load_dotenv
+
+from shared.cache import TTLCache
+
+load_dotenv()
+
+AUTH_CACHE_ENABLED = os.getenv("AUTH_CACHE_ENABLED", "true").lower() in ("1", "true", "yes")
+AUTH_CACHE_SIZE = int(os.getenv("AUTH_CACHE_SIZE", "10000"))
+# User records change rarely and are invalidated on writes; the TTL bounds staleness across workers
+USER_CACHE_TTL = float(os.getenv("USER_CACHE_TTL", "60"))
+
+# Decoded access-token payloads keyed by token digest, each expiring at the token's exp
+token_cache = TTLCache(maxsize=AUTH_CACHE_SIZE, enabled=AUTH_CACHE_ENABLED)
+# UserResponse snapshots keyed by username
+user_cache = TTLCache(maxsize=AUTH_CACHE_SIZE, ttl=USER_CACHE_TTL, enabled=AUTH_CACHE_ENABLED)
+
+def token_digest(token: str) -> str:
+    return hashlib.sha256(token.encode("utf-8")).hexdigest()
+
+def cache_stats() -> dict:
+    return {"tokens": token_cache.stats(), "users": user_cache.stats()}
@@ -0,0 +1,136 @@
+import asyncio
+import os
+import threading
+import time
+from concurrent.futures import Future, ProcessPoolExecutor
+from typing import Any, Callable, Dict, Optional
+
+from dotenv import load_dotenv
+
+from app.user.auth.auth import get_password_hash, verify_password
+
+load_dotenv()
+
+# Worker processes dedicated to bcrypt; 0 hashes inline in the calling thread
+HASH_WORKERS = int(os.getenv("HASH_WORKERS", str(min(4, os.cpu_count() or 1))))
+# Hash/verify jobs allowed in flight (running plus queued) before callers get a 503
+HASH_QUEUE_DEPTH = int(os.getenv("HASH_QUEUE_DEPTH", str(max(1, HASH_WORKERS) * 4)))
+# Seconds suggested to clients through Retry-After when the queue is full
+HASH_RETRY_AFTER = int(os.getenv("HASH_RETRY_AFTER", "1"))
+
+class HashingBusyError(Exception):
+    """ Raised when the hashing queue is full and the request should be retried later """
+
+    def __init__(self, retry_after: int = HASH_RETRY_AFTER):
+        super().__init__("Password hashing capacity exhausted")
+        self.retry_after = retry_after
+
+def _timed(fn: Callable, *args) -> tuple[Any, float]:
+    """ Run fn in the worker and report how long the hash itself took """
+    started = time.perf_counter()
+    result = fn(*args)
+    return result, time.perf_counter() - started
+
+class HashingMetrics:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.completed = 0
+        self.rejected = 0
+        self.in_flight = 0
+        self.queue_wait_total = 0.0
+        self.queue_wait_max = 0.0
+        self.hash_time_total = 0.0
+        self.hash_time_max = 0.0
+
+    def enter(self):
+        with self._lock:
+            self.in_flight += 1
+
+    def leave(self):
+        with self._lock:
+            self.in_flight -= 1
+
+    def reject(self):
+        with self._lock:
+            self.rejected += 1
+
+    def observe(self, queue_wait: float, hash_time: float):
+        with self._lock:
+            self.completed += 1
+            self.queue_wait_total += queue_wait
+            self.queue_wait_max = max(self.queue_wait_max, queue_wait)
+            self.hash_time_total += hash_time
+            self.hash_time_max = max(self.hash_time_max, hash_time)
+
+    def snapshot(self) -> Dict[str, Any]:
+        with self._lock:
+            completed = self.completed or 1
+            return {
+                "workers": HASH_WORKERS,
+                "queue_depth": HASH_QUEUE_DEPTH,
+                "in_flight": self.in_flight,
+                "completed": self.completed,
+                "rejected": self.rejected,
+                "queue_wait_seconds_avg": self.queue_wait_total / completed,
+                "queue_wait_seconds_max": self.queue_wait_max,
+                "hash_seconds_avg": self.hash_time_total / completed,
+                "hash_seconds_max": self.hash_time_max,
+            }
+
+metrics = HashingMetrics()
+
+_slots = threading.BoundedSemaphore(HASH_QUEUE_DEPTH)
+_executor: Optional[ProcessPoolExecutor] = None
+_executor_lock = threading.Lock()
+
+def _get_executor() -> ProcessPoolExecutor:
+    global _executor
+    if _executor is None:
+        with _executor_lock:
+            if _executor is None:
+                _executor = ProcessPoolExecutor(max_workers=HASH_WORKERS)
+    return _executor
+
+def _acquire_slot():
+    if not _slots.acquire(blocking=False):
+        metrics.reject()
+        raise HashingBusyError()
+    metrics.enter()
+
+def _release_slot(submitted: float, future: Future):
+    metrics.leave()
+    _slots.release()
+    if not future.cancelled() and future.exception() is None:
+        _, hash_time = future.result()
+        metrics.observe(time.perf_counter() - submitted - hash_time, hash_time)
+
+def _submit(fn: Callable, *args) -> Future:
+    """ Queue fn on the hashing pool, failing fast with HashingBusyError when full """
+    _acquire_slot()
+    submitted = time.perf_counter()
+    if HASH_WORKERS > 0:
+        future = _get_executor().submit(_timed, fn, *args)
+    else:
+        future = Future()
+        try:
+            future.set_result(_timed(fn, *args))
+        except Exception as err:
+            future.set_exception(err)
+    future.add_done_callback(lambda done: _release_slot(submitted, done))
+    return future
+
+def hash_password(password: str) -> str:
+    """ Hash a password on the worker pool, blocking the calling thread until done """
+    return _submit(get_password_hash, password).result()[0]
+
+def check_password(password: str, hashed_password: str) -> bool:
+    """ Verify a password on the worker pool, blocking the calling thread until done """
+    return _submit(verify_password, password, hashed_password).result()[0]
+
+async def hash_password_async(password: str) -> str:
+    """ Hash a password on the worker pool without holding the event loop """
+    return (await asyncio.wrap_future(_submit(get_password_hash, password)))[0]
+
+async def check_password_async(password: str, hashed_password: str) -> bool:
+    """ Verify a password on the worker pool without holding the event loop """
+    return (await asyncio.wrap_future(_submit(verify_password, password, hashed_password)))[0]
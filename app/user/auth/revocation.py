@@ -0,0 +1,160 @@
+""" Revocation checks without a database query per request.
+
+Revoked token families are persisted in revoked_tokens. Each process keeps a Bloom filter
+of them and adds rows newer than the last id it saw at most every
+REVOCATION_RELOAD_SECONDS. The reload re-reads a small window of recent ids, because
+concurrent transactions can commit ids out of order. A token whose family misses the
+filter is accepted straight away, which is almost every request. A hit is confirmed
+against the table, and the answer is cached for one reload interval. Every
+REVOCATION_REBUILD_SECONDS the filter is rebuilt from the unexpired rows only, which drops
+expired entries and sizes the filter for the current row count.
+
+A revocation made by another process is seen at the next reload, so within
+REVOCATION_RELOAD_SECONDS.
+"""
+import logging
+import os
+import threading
+import time
+from datetime import datetime, timezone
+from typing import Callable, Optional
+
+from dotenv import load_dotenv
+from sqlalchemy import func, select
+from sqlalchemy.orm import Session
+
+from app.user.models.token import RevokedToken
+from shared.bloom import BloomFilter
+from shared.cache import TTLCache
+from shared.database.session import SessionLocal
+
+load_dotenv()
+
+logger = logging.getLogger(__name__)
+
+REVOCATION_CHECK_ENABLED = os.getenv("REVOCATION_CHECK_ENABLED", "true").lower() in ("1", "true", "yes")
+REVOCATION_RELOAD_SECONDS = float(os.getenv("REVOCATION_RELOAD_SECONDS", "5"))
+REVOCATION_REBUILD_SECONDS = float(os.getenv("REVOCATION_REBUILD_SECONDS", "3600"))
+# Ids below the last one seen that every reload reads again, for late commits
+REVOCATION_RELOAD_OVERLAP = int(os.getenv("REVOCATION_RELOAD_OVERLAP", "256"))
+REVOCATION_BLOOM_CAPACITY = int(os.getenv("REVOCATION_BLOOM_CAPACITY", "100000"))
+REVOCATION_BLOOM_ERROR_RATE = float(os.getenv("REVOCATION_BLOOM_ERROR_RATE", "0.001"))
+
+def _now() -> datetime:
+    return datetime.now(timezone.utc).replace(tzinfo=None)
+
+class RevocationList:
+    """ Bloom filter of revoked token families in front of the revoked_tokens table """
+
+    def __init__(
+        self,
+        enabled: bool = REVOCATION_CHECK_ENABLED,
+        capacity: int = REVOCATION_BLOOM_CAPACITY,
+        error_rate: float = REVOCATION_BLOOM_ERROR_RATE,
+        reload_seconds: float = REVOCATION_RELOAD_SECONDS,
+        rebuild_seconds: float = REVOCATION_REBUILD_SECONDS,
+        session_factory: Callable[[], Session] = SessionLocal,
+    ):
+        self.enabled = enabled
+        self.capacity = capacity
+        self.error_rate = error_rate
+        self.reload_seconds = reload_seconds
+        self.rebuild_seconds = rebuild_seconds
+        self.session_factory = session_factory
+        self._filter = BloomFilter(capacity, error_rate)
+        self._last_id = 0
+        self._next_reload = 0.0
+        self._next_rebuild = 0.0
+        self._lock = threading.Lock()
+        # Confirmed answers for ids that hit the filter, kept for one reload interval
+        self._confirmed = TTLCache(maxsize=10000, ttl=reload_seconds)
+        self.checks = 0
+        self.filter_hits = 0
+        self.false_positives = 0
+        self.reloads = 0
+        self.rebuilds = 0
+
+    def is_revoked(self, token_id: Optional[str]) -> bool:
+        if not self.enabled or token_id is None:
+            return False
+        self._maybe_reload()
+        self.checks += 1
+        if token_id not in self._filter:
+            return False
+        self.filter_hits += 1
+        revoked = self._confirmed.get(token_id)
+        if revoked is None:
+            with self.session_factory() as db:
+                revoked = db.scalar(select(RevokedToken.id).where(
+                    RevokedToken.token_id == token_id, RevokedToken.expires_at > _now()
+                )) is not None
+            if not revoked:
+                self.false_positives += 1
+            self._confirmed.set(token_id, revoked)
+        return revoked
+
+    def add(self, token_id: str):
+        """ Make a revocation visible in this process before the next reload """
+        with self._lock:
+            self._filter.add(token_id)
+        self._confirmed.invalidate(token_id)
+
+    def _maybe_reload(self):
+        now = time.monotonic()
+        if now < self._next_reload or not self._lock.acquire(blocking=False):
+            return
+        try:
+            with self.session_factory() as db:
+                self._reload(db, rebuild=now >= self._next_rebuild)
+        except Exception:
+            # Keep serving from the filter we have; the next interval retries
+            logger.exception("Reloading the token revocation list failed")
+        finally:
+            self._next_reload = now + self.reload_seconds
+            self._lock.release()
+
+    def reload(self, db: Session, rebuild: bool = False):
+        """ Load revocations added since the last reload, or rebuild the filter from scratch """
+        with self._lock:
+            self._reload(db, rebuild)
+
+    def _reload(self, db: Session, rebuild: bool):
+        if rebuild:
+            last_id = db.scalar(select(func.max(RevokedToken.id))) or 0
+            token_ids = list(db.scalars(select(RevokedToken.token_id).where(
+                RevokedToken.id <= last_id, RevokedToken.expires_at > _now()
+            )))
+            rebuilt = BloomFilter(max(self.capacity, 2 * len(token_ids)), self.error_rate)
+            for token_id in token_ids:
+                rebuilt.add(token_id)
+            self._filter, self._last_id = rebuilt, last_id
+            self._next_rebuild = time.monotonic() + self.rebuild_seconds
+            self.rebuilds += 1
+            return
+        rows = db.execute(
+            select(RevokedToken.id, RevokedToken.token_id)
+            .where(RevokedToken.id > self._last_id - REVOCATION_RELOAD_OVERLAP)
+            .order_by(RevokedToken.id)
+        ).all()
+        for _, token_id in rows:
+            self._filter.add(token_id)
+        if rows:
+            self._last_id = max(self._last_id, rows[-1].id)
+        if self._filter.count > self._filter.capacity:
+            # Past capacity the false-positive rate climbs: resize on the next reload
+            self._next_rebuild = 0.0
+        self.reloads += 1
+
+    def stats(self) -> dict:
+        return {
+            "enabled": self.enabled,
+            "last_id": self._last_id,
+            "checks": self.checks,
+            "filter_hits": self.filter_hits,
+            "false_positives": self.false_positives,
+            "reloads": self.reloads,
+            "rebuilds": self.rebuilds,
+            "filter": self._filter.stats(),
+        }
+
+revocations = RevocationList()
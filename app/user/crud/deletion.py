@@ -0,0 +1,173 @@
+""" Queued user deletion: deactivate now, purge the user's rows in bounded batches later.
+
+delete_user only deactivates the user and queues a UserDeletion. A purge worker
+(app.user.purge) claims the job under a lease and removes owned rows one batch per
+transaction, committing the progress counters together with each batch's DELETE. A crash
+loses at most that one transaction, and whoever takes the expired lease resumes the job.
+"""
+import os
+from datetime import datetime, timedelta, timezone
+from typing import Optional
+
+from dotenv import load_dotenv
+from sqlalchemy import column, delete, func, insert, or_, select, table, update
+from sqlalchemy.orm import Session
+
+from app.user.models.user import User
+from app.user.models.deletion import UserDeletion
+from app.user.auth.cache import user_cache
+from app.user.auth.revocation import revocations
+from app.user.crud.token import revoke_user_tokens
+from shared.changes.feed import record_change
+from shared.database.batch import supports_returning
+
+load_dotenv()
+
+# Owned rows removed per purge transaction
+USER_PURGE_BATCH_SIZE = int(os.getenv("USER_PURGE_BATCH_SIZE", "500"))
+# A worker that stops renewing its lease for this long loses the job to another worker
+USER_PURGE_LEASE_SECONDS = int(os.getenv("USER_PURGE_LEASE_SECONDS", "60"))
+
+# Tables owned by the other services, referenced without importing their models
+TODOS = table("todos", column("id"), column("owner_id"))
+SCHEDULES = table("schedules", column("id"), column("owner_id"))
+RECURRENCES = table("schedule_recurrences", column("id"), column("owner_id"))
+RECURRENCE_EXCEPTIONS = table("schedule_recurrence_exceptions", column("recurrence_id"))
+ROLLUP = table("schedule_daily_rollup", column("owner_id"))
+DATA_VERSIONS = table("schedule_data_versions", column("owner_id"), column("version"))
+
+UNFINISHED = ("pending", "running")
+
+def _now() -> datetime:
+    return datetime.now(timezone.utc).replace(tzinfo=None)
+
+def request_deletion(db: Session, user_id: int) -> Optional[UserDeletion]:
+    """ Deactivate the user, revoke its sessions and queue its deletion in one transaction;
+    asking again returns the unfinished job. None if the user does not exist. """
+    stmt = update(User).where(User.id == user_id).values(is_active=False).execution_options(synchronize_session=False)
+    if supports_returning(db):
+        username = db.execute(stmt.returning(User.username)).scalar()
+    elif db.execute(stmt).rowcount:
+        username = db.scalar(select(User.username).where(User.id == user_id))
+    else:
+        username = None
+    if username is None:
+        db.rollback()
+        return None
+    job = db.get(UserDeletion, user_id)
+    if job is None:
+        job = UserDeletion(user_id=user_id, username=username, status="pending", todos_deleted=0, schedules_deleted=0, recurrences_deleted=0)
+        db.add(job)
+    elif job.status not in UNFINISHED:
+        # A finished job left by an earlier user with the same id (a database that reuses
+        # ids): start over for this one rather than report the old purge as done
+        job.username, job.status, job.requested_at, job.finished_at = username, "pending", _now(), None
+        job.todos_total = job.schedules_total = job.lease_owner = job.lease_until = None
+        job.todos_deleted = job.schedules_deleted = job.recurrences_deleted = 0
+    families = revoke_user_tokens(db, user_id)
+    db.commit()
+    user_cache.invalidate(username)
+    for family_id in families:
+        revocations.add(family_id)
+    db.refresh(job)
+    return job
+
+def _lease_free(now: datetime):
+    return or_(UserDeletion.lease_until.is_(None), UserDeletion.lease_until < now)
+
+def claim_deletion(db: Session, worker: str) -> Optional[UserDeletion]:
+    """ Take the oldest unfinished job whose lease is free or expired; None if there is none.
+    The claim is a conditional UPDATE, so two workers never hold the same job. """
+    now = _now()
+    candidates = list(db.scalars(
+        select(UserDeletion.user_id)
+        .where(UserDeletion.status.in_(UNFINISHED), _lease_free(now))
+        .order_by(UserDeletion.requested_at, UserDeletion.user_id)
+        .limit(10)
+    ))
+    for user_id in candidates:
+        claimed = db.execute(
+            update(UserDeletion)
+            .where(UserDeletion.user_id == user_id, UserDeletion.status.in_(UNFINISHED), _lease_free(now))
+            .values(status="running", lease_owner=worker, lease_until=now + timedelta(seconds=USER_PURGE_LEASE_SECONDS))
+            .execution_options(synchronize_session=False)
+        ).rowcount
+        if claimed:
+            db.commit()
+            return db.get(UserDeletion, user_id)
+    db.rollback()
+    return None
+
+def _drop_rollup(db: Session, user_id: int):
+    """ Remove the user's rollup rows and bump its data version so cached charts recompute """
+    if db.execute(delete(ROLLUP).where(ROLLUP.c.owner_id == user_id)).rowcount == 0:
+        return
+    bumped = db.execute(
+        update(DATA_VERSIONS).where(DATA_VERSIONS.c.owner_id == user_id).values(version=DATA_VERSIONS.c.version + 1)
+    ).rowcount
+    if not bumped:
+        db.execute(insert(DATA_VERSIONS).values(owner_id=user_id, version=1))
+
+def _delete_batch(db: Session, owned, user_id: int, limit: int) -> int:
+    """ Set-based DELETE of at most limit rows owned by user_id """
+    if db.get_bind().dialect.name == "mysql":
+        stmt = delete(owned).where(owned.c.owner_id == user_id).with_dialect_options(mysql_limit=limit)
+    else:
+        # PostgreSQL and SQLite have no DELETE ... LIMIT; bound it through the primary key instead
+        stmt = delete(owned).where(owned.c.id.in_(select(owned.c.id).where(owned.c.owner_id == user_id).limit(limit)))
+    return db.execute(stmt).rowcount
+
+def _record_progress(db: Session, job: UserDeletion, worker: str, **values) -> bool:
+    """ Add to the job's counters and renew the lease, only while worker still holds it """
+    values.update(lease_until=_now() + timedelta(seconds=USER_PURGE_LEASE_SECONDS))
+    return db.execute(
+        update(UserDeletion)
+        .where(UserDeletion.user_id == job.user_id, UserDeletion.lease_owner == worker)
+        .values(**values)
+        .execution_options(synchronize_session=False)
+    ).rowcount == 1
+
+def purge_step(db: Session, job: UserDeletion, worker: str, batch_size: int = USER_PURGE_BATCH_SIZE) -> bool:
+    """ Run the next step of a claimed job in its own transaction. Returns False once the job
+    is done, or when the lease was lost to another worker. """
+    user_id = job.user_id
+    if job.todos_total is None:
+        # First step: size the job, then drop the few recurrence rules and the rollup rows
+        # so the user's hours leave the summaries right away
+        totals = {
+            "todos_total": db.scalar(select(func.count()).select_from(TODOS).where(TODOS.c.owner_id == user_id)),
+            "schedules_total": db.scalar(select(func.count()).select_from(SCHEDULES).where(SCHEDULES.c.owner_id == user_id)),
+        }
+        rules = select(RECURRENCES.c.id).where(RECURRENCES.c.owner_id == user_id)
+        db.execute(delete(RECURRENCE_EXCEPTIONS).where(RECURRENCE_EXCEPTIONS.c.recurrence_id.in_(rules)))
+        recurrences = db.execute(delete(RECURRENCES).where(RECURRENCES.c.owner_id == user_id)).rowcount
+        _drop_rollup(db, user_id)
+        if not _record_progress(db, job, worker, recurrences_deleted=UserDeletion.recurrences_deleted + recurrences, **totals):
+            db.rollback()
+            return False
+        if recurrences:
+            record_change(db, "recurrences", "purged", None, {"owner_id": user_id, "count": recurrences})
+        db.commit()
+        db.refresh(job)
+        return True
+
+    for owned, topic, counter in ((SCHEDULES, "schedules", "schedules_deleted"), (TODOS, "todos", "todos_deleted")):
+        deleted = _delete_batch(db, owned, user_id, batch_size)
+        if not deleted:
+            continue
+        if not _record_progress(db, job, worker, **{counter: getattr(UserDeletion, counter) + deleted}):
+            db.rollback()
+            return False
+        record_change(db, topic, "purged", None, {"owner_id": user_id, "count": deleted})
+        db.commit()
+        return True
+
+    # Nothing owned is left: rollup rows rebuilt meanwhile go too, then the user itself
+    _drop_rollup(db, user_id)
+    db.execute(delete(User).where(User.id == user_id).execution_options(synchronize_session=False))
+    if not _record_progress(db, job, worker, status="done", finished_at=_now(), lease_owner=None):
+        db.rollback()
+        return False
+    db.commit()
+    user_cache.invalidate(job.username)
+    return False
@@ -0,0 +1,139 @@
+""" Refresh tokens with rotation and reuse detection.
+
+Login opens a token family. Every refresh spends the presented token with a conditional
+UPDATE and issues its successor in the same family, so a refresh token works exactly once.
+If a spent token is presented again, either the legitimate client or a thief holds a copy.
+The whole family is then revoked: its refresh tokens are marked revoked, and the family id
+goes to revoked_tokens, which the access-token check reads (app.user.auth.revocation).
+"""
+from datetime import datetime, timedelta, timezone
+from typing import Optional
+from uuid import uuid4
+
+from sqlalchemy import delete, func, insert, select, update
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+
+from app.user.models.user import User
+from app.user.models.token import RefreshToken, RevokedToken
+from app.user.auth.auth import (
+    ACCESS_TOKEN_EXPIRE_MINUTES, REFRESH_TOKEN_EXPIRE_DAYS, create_access_token, create_refresh_token, verify_refresh_token,
+)
+from app.user.auth.revocation import revocations
+
+def _now() -> datetime:
+    return datetime.now(timezone.utc).replace(tzinfo=None)
+
+def _issue(db: Session, user_id: int, username: str, family_id: Optional[str] = None, jti: Optional[str] = None) -> dict:
+    """ Add a refresh token to the session (a new family unless given) and mint the token pair """
+    jti = jti or uuid4().hex
+    family_id = family_id or jti
+    lifetime = timedelta(days=REFRESH_TOKEN_EXPIRE_DAYS)
+    db.add(RefreshToken(jti=jti, family_id=family_id, user_id=user_id, username=username, expires_at=_now() + lifetime))
+    return {
+        "access_token": create_access_token({"sub": username, "fam": family_id}),
+        "refresh_token": create_refresh_token({"sub": username, "fam": family_id, "jti": jti}, expires_delta=lifetime),
+        "token_type": "bearer",
+    }
+
+def issue_tokens(db: Session, user_id: int, username: str) -> dict:
+    """ Access and refresh token for a fresh login """
+    tokens = _issue(db, user_id, username)
+    db.commit()
+    return tokens
+
+def _revoke_family(db: Session, family_id: str):
+    """ Revoke every refresh token of the family and list the family as revoked until the
+    last token it could have produced expires """
+    now = _now()
+    last_expiry = db.scalar(select(func.max(RefreshToken.expires_at)).where(RefreshToken.family_id == family_id))
+    db.execute(
+        update(RefreshToken)
+        .where(RefreshToken.family_id == family_id, RefreshToken.revoked_at.is_(None))
+        .values(revoked_at=now)
+    )
+    expires_at = max(last_expiry or now, now + timedelta(minutes=ACCESS_TOKEN_EXPIRE_MINUTES))
+    # Concurrent revocations of one family (reuse detected twice, double logout) must not
+    # collide on the unique token_id: the first insert wins and the rest are no-ops
+    row = {"token_id": family_id, "expires_at": expires_at}
+    dialect = db.get_bind().dialect.name
+    if dialect in ("postgresql", "sqlite"):
+        if dialect == "postgresql":
+            from sqlalchemy.dialects.postgresql import insert as dialect_insert
+        else:
+            from sqlalchemy.dialects.sqlite import insert as dialect_insert
+        db.execute(dialect_insert(RevokedToken).values(**row).on_conflict_do_nothing(index_elements=["token_id"]))
+        return
+    try:
+        with db.begin_nested():
+            db.execute(insert(RevokedToken).values(**row))
+    except IntegrityError:
+        pass
+
+def rotate_refresh_token(db: Session, token: str) -> dict:
+    """ Spend a refresh token and return a new access and refresh token.
+    Raises ValueError for an invalid token, and revokes the family when a spent token is reused. """
+    payload = verify_refresh_token(token)
+    if payload is None:
+        raise ValueError("Invalid refresh token")
+    jti, family_id = payload["jti"], payload["fam"]
+    successor_jti = uuid4().hex
+    spent = db.execute(
+        update(RefreshToken)
+        .where(RefreshToken.jti == jti, RefreshToken.used_at.is_(None), RefreshToken.revoked_at.is_(None))
+        .values(used_at=_now(), replaced_by=successor_jti)
+        .execution_options(synchronize_session=False)
+    ).rowcount
+    if not spent:
+        db.rollback()
+        reused = db.scalar(select(RefreshToken.jti).where(
+            RefreshToken.jti == jti, RefreshToken.used_at.is_not(None), RefreshToken.revoked_at.is_(None)
+        ))
+        if reused is None:
+            raise ValueError("Invalid refresh token")
+        _revoke_family(db, family_id)
+        db.commit()
+        revocations.add(family_id)
+        raise ValueError("Refresh token reuse detected; the session has been revoked")
+    # The account is found by the id stored with the token, never by the username in it
+    user = db.execute(
+        select(User.id, User.username, User.is_active)
+        .join(RefreshToken, RefreshToken.user_id == User.id)
+        .where(RefreshToken.jti == jti)
+    ).first()
+    if user is None or not user.is_active:
+        db.rollback()
+        raise ValueError("User is not active")
+    successor = _issue(db, user.id, user.username, family_id, successor_jti)
+    db.commit()
+    return successor
+
+def revoke_user_tokens(db: Session, user_id: int) -> list:
+    """ Revoke every live refresh family of a user inside the caller's transaction; the
+    caller adds the returned family ids to the revocation filter once it has committed """
+    families = list(db.scalars(
+        select(RefreshToken.family_id)
+        .where(RefreshToken.user_id == user_id, RefreshToken.revoked_at.is_(None))
+        .distinct()
+    ))
+    for family_id in families:
+        _revoke_family(db, family_id)
+    return families
+
+def revoke_refresh_token(db: Session, token: str) -> bool:
+    """ Log out: revoke the family of a refresh token. False if the token is not ours. """
+    payload = verify_refresh_token(token)
+    if payload is None or db.get(RefreshToken, payload["jti"]) is None:
+        return False
+    _revoke_family(db, payload["fam"])
+    db.commit()
+    revocations.add(payload["fam"])
+    return True
+
+def prune_tokens(db: Session) -> dict:
+    """ Delete refresh tokens and revocations whose tokens have all expired """
+    now = _now()
+    refresh = db.execute(delete(RefreshToken).where(RefreshToken.expires_at < now)).rowcount
+    revoked = db.execute(delete(RevokedToken).where(RevokedToken.expires_at < now)).rowcount
+    db.commit()
+    return {"refresh_tokens": refresh, "revoked_tokens": revoked}
@@ -1,16 +1,31 @@
+from sqlalchemy import exists, select, update
 from sqlalchemy.orm import Session
 from sqlalchemy.exc import IntegrityError
-from passlib.context import CryptContext
 
 from app.user.models.user import User
-from app.user.schemas.user import UserCreate
-
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+from app.user.models.deletion import UserDeletion
+from app.user.schemas.user import UserCreate, UserResponse
+from app.user.auth.cache import user_cache
+from app.user.auth.hashing import hash_password, check_password
+from app.user.crud.deletion import UNFINISHED, request_deletion
+from shared.database.batch import supports_returning
 
 def get_user_by_username(db: Session, username: str) -> User:
     """ Retrieve a user from the database by username """
     return db.query(User).filter(User.username == username).first()
 
+def get_cached_user(db: Session, username: str) -> UserResponse:
+    """ Return a snapshot of the user, served from the user cache when possible """
+    cached = user_cache.get(username)
+    if cached is not None:
+        return cached
+    user = get_user_by_username(db, username)
+    if not user:
+        return None
+    snapshot = UserResponse.model_validate(user, from_attributes=True)
+    user_cache.set(username, snapshot)
+    return snapshot
+
 def get_user_by_email(db: Session, email: str) -> User:
     """ Retrieve a user from the database by email """
     return db.query(User).filter(User.email == email).first()
@@ -21,7 +36,7 @@ def get_user_by_id(db: Session, user_id: int) -> User:
 
 def create_user(db: Session, user: UserCreate) -> User:
     """ Create a new user in the database with a hashed password and verification token """
-    hashed_password = pwd_context.hash(user.password)
+    hashed_password = hash_password(user.password)
     db_user = User(
         username=user.username,
         email=user.email,
@@ -42,37 +57,51 @@ def authenticate_user(db: Session, username: str, password: str) -> User:
     user = get_user_by_username(db, username)
     if not user:
         return None
-    if not pwd_context.verify(password, user.hashed_password):
+    if not check_password(password, user.hashed_password):
         return None
     if not user.is_active:
         return None
     return user
 
-def delete_user(db: Session, user_id: int) -> bool:
-    """ Delete a user from the database by ID """
-    user = db.query(User).filter(User.id == user_id).first()
-    if not user:
-        return False
-    db.delete(user)
-    db.commit()
-    return True
+def delete_user(db: Session, user_id: int) -> UserDeletion:
+    """ Deactivate a user and queue the purge of everything it owns (app.user.purge);
+    the user row itself goes last. None if the user does not exist. """
+    return request_deletion(db, user_id)
 
-def deactivate_user(db: Session, user_id: int) -> User:
-    """ Deactivate a user by ID """
-    user = db.query(User).filter(User.id == user_id).first()
+def get_deletion(db: Session, user_id: int) -> UserDeletion:
+    """ Progress of a queued user deletion """
+    return db.get(UserDeletion, user_id)
+
+# Columns a user may be shown as; never hashed_password
+USER_PUBLIC_COLUMNS = (User.id, User.username, User.email, User.is_active)
+
+def _set_active(db: Session, user_id: int, is_active: bool) -> UserResponse:
+    """ Flip is_active with one UPDATE ... RETURNING and return the user's public fields, or None.
+    Raises ValueError when activating a user whose deletion is queued or running. """
+    stmt = update(User).where(User.id == user_id).values(is_active=is_active).execution_options(synchronize_session=False)
+    if is_active:
+        stmt = stmt.where(~exists().where(UserDeletion.user_id == user_id, UserDeletion.status.in_(UNFINISHED)))
+    if supports_returning(db):
+        user = db.execute(stmt.returning(*USER_PUBLIC_COLUMNS)).first()
+        db.commit()
+    elif db.execute(stmt).rowcount == 0:
+        db.rollback()
+        user = None
+    else:
+        db.commit()
+        user = db.execute(select(*USER_PUBLIC_COLUMNS).where(User.id == user_id)).first()
     if not user:
+        job = db.get(UserDeletion, user_id) if is_active else None
+        if job is not None and job.status in UNFINISHED:
+            raise ValueError("User is scheduled for deletion")
         return None
-    user.is_active = False
-    db.commit()
-    db.refresh(user)
-    return user
+    user_cache.invalidate(user.username)
+    return UserResponse.model_validate(user, from_attributes=True)
 
-def activate_user(db: Session, user_id: int) -> User:
+def deactivate_user(db: Session, user_id: int) -> UserResponse:
+    """ Deactivate a user by ID """
+    return _set_active(db, user_id, False)
+
+def activate_user(db: Session, user_id: int) -> UserResponse:
     """ Activate a user by ID """
-    user = db.query(User).filter(User.id == user_id).first()
-    if not user:
-        return None
-    user.is_active = True
-    db.commit()
-    db.refresh(user)
-    return user
+    return _set_active(db, user_id, True)
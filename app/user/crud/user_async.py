@@ -0,0 +1,95 @@
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.exc import IntegrityError
+
+from app.user.models.user import User
+from app.user.models.deletion import UserDeletion
+from app.user.schemas.user import UserCreate, UserResponse
+from app.user.auth.cache import user_cache
+from app.user.auth.hashing import hash_password_async, check_password_async
+from app.user.crud import user as crud_user
+from app.user.crud import token as crud_token
+
+async def get_user_by_username(db: AsyncSession, username: str) -> User:
+    """ Retrieve a user from the database by username """
+    return await db.scalar(select(User).where(User.username == username))
+
+async def get_cached_user(db: AsyncSession, username: str) -> UserResponse:
+    """ Return a snapshot of the user, served from the user cache when possible """
+    cached = user_cache.get(username)
+    if cached is not None:
+        return cached
+    user = await get_user_by_username(db, username)
+    if not user:
+        return None
+    snapshot = UserResponse.model_validate(user, from_attributes=True)
+    user_cache.set(username, snapshot)
+    return snapshot
+
+async def get_user_by_email(db: AsyncSession, email: str) -> User:
+    """ Retrieve a user from the database by email """
+    return await db.scalar(select(User).where(User.email == email))
+
+async def get_user_by_id(db: AsyncSession, user_id: int) -> User:
+    """ Retrieve a user from the database by ID """
+    return await db.get(User, user_id)
+
+async def create_user(db: AsyncSession, user: UserCreate) -> User:
+    """ Create a new user, hashing the password on the worker pool """
+    hashed_password = await hash_password_async(user.password)
+    db_user = User(
+        username=user.username,
+        email=user.email,
+        hashed_password=hashed_password,
+    )
+    db.add(db_user)
+    try:
+        await db.commit()
+        await db.refresh(db_user)
+    except IntegrityError as err:
+        await db.rollback()
+        raise ValueError("Username or email already exists") from err
+    else:
+        return db_user
+
+async def authenticate_user(db: AsyncSession, username: str, password: str) -> User:
+    """ Authenticate a user by username and password """
+    user = await get_user_by_username(db, username)
+    if not user:
+        return None
+    if not await check_password_async(password, user.hashed_password):
+        return None
+    if not user.is_active:
+        return None
+    return user
+
+# The write paths below are pure statement execution, so the sync implementations
+# run unchanged on the async connection through run_sync.
+
+async def delete_user(db: AsyncSession, user_id: int) -> UserDeletion:
+    """ Deactivate a user and queue the purge of everything it owns """
+    return await db.run_sync(crud_user.delete_user, user_id)
+
+async def get_deletion(db: AsyncSession, user_id: int) -> UserDeletion:
+    """ Progress of a queued user deletion """
+    return await db.get(UserDeletion, user_id)
+
+async def deactivate_user(db: AsyncSession, user_id: int) -> UserResponse:
+    """ Deactivate a user by ID """
+    return await db.run_sync(crud_user.deactivate_user, user_id)
+
+async def activate_user(db: AsyncSession, user_id: int) -> UserResponse:
+    """ Activate a user by ID """
+    return await db.run_sync(crud_user.activate_user, user_id)
+
+async def issue_tokens(db: AsyncSession, user_id: int, username: str) -> dict:
+    """ Access and refresh token for a fresh login """
+    return await db.run_sync(crud_token.issue_tokens, user_id, username)
+
+async def rotate_refresh_token(db: AsyncSession, token: str) -> dict:
+    """ Spend a refresh token and return its successor with a new access token """
+    return await db.run_sync(crud_token.rotate_refresh_token, token)
+
+async def revoke_refresh_token(db: AsyncSession, token: str) -> bool:
+    """ Revoke the session a refresh token belongs to """
+    return await db.run_sync(crud_token.revoke_refresh_token, token)
@@ -1,10 +1,24 @@
 from fastapi import FastAPI
-from app.user.routes.users import router as users_router
+from shared.metrics import RequestMetricsMiddleware
+from shared.routes.internal import router as internal_router
+from shared.routes.metrics import router as metrics_router
+from app.user.routes.internal import router as user_internal_router
+from app.user.purge import purge_lifespan
+from shared.database.session import DATABASE_MODE
 
-app = FastAPI(title="User Service")
+if DATABASE_MODE == "async":
+    from app.user.routes.users_async import router as users_router
+else:
+    from app.user.routes.users import router as users_router
 
-# Tables are created in session.py now
+app = FastAPI(title="User Service", lifespan=purge_lifespan)
+
+# Tables are created explicitly: python -m shared.database.manage init-schema
 app.include_router(users_router, prefix="/users", tags=["users"])
+app.include_router(internal_router)
+app.include_router(metrics_router)
+app.add_middleware(RequestMetricsMiddleware)
+app.include_router(user_internal_router)
 
 @app.get("/")
 def read_root():
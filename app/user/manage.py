@@ -0,0 +1,35 @@
+""" Maintenance commands for the user service.
+
+    python -m app.user.manage purge-deleted
+    python -m app.user.manage prune-tokens
+
+purge-deleted runs the deletion purge in the foreground until no job is left, for
+deployments that set USER_PURGE_IN_PROCESS=false and purge from a separate process.
+prune-tokens deletes refresh tokens and revocations that have expired; run it from cron.
+"""
+import argparse
+import sys
+
+from app.user.purge import purge_worker
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(prog="python -m app.user.manage")
+    parser.add_argument("command", choices=["purge-deleted", "prune-tokens"])
+    args = parser.parse_args(argv)
+
+    if args.command == "prune-tokens":
+        from app.user.crud.token import prune_tokens
+        from shared.database.session import SessionLocal
+
+        with SessionLocal() as db:
+            pruned = prune_tokens(db)
+        print(f"Pruned {pruned['refresh_tokens']} refresh tokens and {pruned['revoked_tokens']} revocations")
+        return 0
+
+    finished = purge_worker.run_pending()
+    stats = purge_worker.stats()
+    print(f"Purged {finished} deleted users in {stats['batches']} batches")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,28 @@
+from sqlalchemy import Column, Integer, String, DateTime, Index
+from sqlalchemy.sql import func
+from shared.database.base import Base
+
+class UserDeletion(Base):
+    """ A queued user deletion and its purge progress. The user row is removed last, so
+    user_id carries no foreign key; finished jobs are kept as a record of the purge. """
+    __tablename__ = "user_deletions"
+    __table_args__ = (
+        # Workers look for unfinished jobs whose lease has expired
+        Index("ix_user_deletions_status_lease_until", "status", "lease_until"),
+    )
+
+    user_id = Column(Integer, primary_key=True, autoincrement=False)
+    username = Column(String(50), nullable=False)
+    # pending -> running -> done
+    status = Column(String(16), nullable=False, default="pending")
+    todos_total = Column(Integer, nullable=True)
+    schedules_total = Column(Integer, nullable=True)
+    todos_deleted = Column(Integer, nullable=False, default=0)
+    schedules_deleted = Column(Integer, nullable=False, default=0)
+    recurrences_deleted = Column(Integer, nullable=False, default=0)
+    # Worker holding the job and until when; an expired lease lets another worker resume it
+    lease_owner = Column(String(128), nullable=True)
+    lease_until = Column(DateTime, nullable=True)
+    requested_at = Column(DateTime, server_default=func.now())
+    updated_at = Column(DateTime, server_default=func.now(), onupdate=func.now())
+    finished_at = Column(DateTime, nullable=True)
@@ -0,0 +1,32 @@
+from sqlalchemy import Column, Integer, String, DateTime
+from sqlalchemy.sql import func
+from shared.database.base import Base
+
+class RefreshToken(Base):
+    """ One issued refresh token. Each refresh spends the token and issues its successor in
+    the same family; presenting a spent token again revokes the whole family. """
+    __tablename__ = "refresh_tokens"
+
+    jti = Column(String(32), primary_key=True)
+    # Every token descending from one login shares the family id of the first
+    family_id = Column(String(32), index=True, nullable=False)
+    # The owning account by id: a username can be registered again after its user is deleted
+    user_id = Column(Integer, index=True, nullable=False)
+    username = Column(String(50), nullable=False)
+    expires_at = Column(DateTime, nullable=False)
+    issued_at = Column(DateTime, server_default=func.now())
+    # Set together when the token is spent; replaced_by is the successor's jti
+    used_at = Column(DateTime, nullable=True)
+    replaced_by = Column(String(32), nullable=True)
+    revoked_at = Column(DateTime, nullable=True)
+
+class RevokedToken(Base):
+    """ Revoked token families, loaded incrementally by id into the in-memory revocation
+    filter; a row is only needed until the family's last token expires. """
+    __tablename__ = "revoked_tokens"
+    __table_args__ = {"sqlite_autoincrement": True}
+
+    id = Column(Integer, primary_key=True)
+    token_id = Column(String(32), unique=True, nullable=False)
+    expires_at = Column(DateTime, nullable=False, index=True)
+    revoked_at = Column(DateTime, server_default=func.now())
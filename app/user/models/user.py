@@ -1,11 +1,13 @@
 from sqlalchemy import Column, Integer, String, DateTime, Boolean
 from sqlalchemy.sql import func
-from sqlalchemy.orm import relationship
 from shared.database.base import Base
 
 class User(Base):
     __tablename__ = "users"
-    
+    # Never reuse ids (SQLite otherwise may): rows in other services, deletion jobs and
+    # refresh tokens refer to users by id
+    __table_args__ = {"sqlite_autoincrement": True}
+
     id = Column(Integer, primary_key=True, index=True)
     username = Column(String(50), unique=True, index=True, nullable=False)
     email = Column(String(100), unique=True, index=True, nullable=False)
@@ -13,6 +15,6 @@ class User(Base):
     is_active = Column(Boolean, default=True)
     created_at = Column(DateTime, server_default=func.now())
     updated_at = Column(DateTime, server_default=func.now(), onupdate=func.now())
-    
-    todos = relationship("Todo", back_populates="owner")
-    schedules = relationship("Schedule", back_populates="owner")
+
+    # User.todos / User.schedules are added as backrefs by the todo and time models,
+    # so each service only maps the tables it actually uses.
@@ -0,0 +1,138 @@
+""" Background purge of deleted users' todos, schedules and recurrence rules.
+
+Each API process runs one PurgeWorker thread (USER_PURGE_IN_PROCESS) started from the app
+lifespan; alternatively run it on its own with `python -m app.user.manage purge-deleted`.
+Jobs are claimed under a lease, so any number of workers can run side by side.
+
+Throttling: after a batch that took t seconds the worker sleeps t * (1 - d) / d, where d is
+USER_PURGE_DUTY_CYCLE, and at least USER_PURGE_MIN_PAUSE_MS. Purging therefore holds write
+locks for at most a fraction d of the time and live writes queue behind one short batch
+instead of one long transaction.
+"""
+import logging
+import os
+import socket
+import threading
+import time
+from contextlib import asynccontextmanager
+from typing import Callable, Optional
+
+from dotenv import load_dotenv
+
+from app.user.crud.deletion import USER_PURGE_BATCH_SIZE, claim_deletion, purge_step
+from shared.database.session import SessionLocal
+
+load_dotenv()
+
+logger = logging.getLogger(__name__)
+
+USER_PURGE_IN_PROCESS = os.getenv("USER_PURGE_IN_PROCESS", "true").lower() in ("1", "true", "yes")
+# Share of wall time the purge may spend inside batches
+USER_PURGE_DUTY_CYCLE = float(os.getenv("USER_PURGE_DUTY_CYCLE", "0.25"))
+USER_PURGE_MIN_PAUSE_MS = float(os.getenv("USER_PURGE_MIN_PAUSE_MS", "20"))
+# How often an idle worker looks for jobs left behind by a crashed worker
+USER_PURGE_POLL_SECONDS = float(os.getenv("USER_PURGE_POLL_SECONDS", "30"))
+
+class PurgeWorker:
+    """ Claims queued user deletions and purges them batch by batch """
+
+    def __init__(
+        self,
+        session_factory: Callable = SessionLocal,
+        batch_size: int = USER_PURGE_BATCH_SIZE,
+        duty_cycle: float = USER_PURGE_DUTY_CYCLE,
+        min_pause: float = USER_PURGE_MIN_PAUSE_MS / 1000,
+    ):
+        self.session_factory = session_factory
+        self.batch_size = batch_size
+        self.duty_cycle = min(max(duty_cycle, 0.01), 1.0)
+        self.min_pause = min_pause
+        self.name = f"{socket.gethostname()}:{os.getpid()}:{id(self):x}"
+        self._wake = threading.Event()
+        self._stopped = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._lock = threading.Lock()
+        self.current: Optional[int] = None
+        self.jobs_finished = 0
+        self.batches = 0
+        self.batch_seconds = 0.0
+        self.throttled_seconds = 0.0
+
+    def start(self):
+        with self._lock:
+            if self._thread is None or not self._thread.is_alive():
+                self._stopped.clear()
+                self._thread = threading.Thread(target=self._run, name="user-purge", daemon=True)
+                self._thread.start()
+
+    def stop(self):
+        self._stopped.set()
+        self._wake.set()
+
+    def wake(self):
+        """ Look for work now rather than at the next poll """
+        self._wake.set()
+
+    def _run(self):
+        while not self._stopped.is_set():
+            try:
+                self.run_pending()
+            except Exception:
+                logger.exception("User purge failed; retrying in %ss", USER_PURGE_POLL_SECONDS)
+            self._wake.wait(USER_PURGE_POLL_SECONDS)
+            self._wake.clear()
+
+    def run_pending(self) -> int:
+        """ Purge claimable jobs until none is left (or the worker stops); returns jobs finished """
+        finished = 0
+        db = self.session_factory()
+        try:
+            while not self._stopped.is_set():
+                job = claim_deletion(db, self.name)
+                if job is None:
+                    return finished
+                self.current = job.user_id
+                if self._purge(db, job):
+                    finished += 1
+                    self.jobs_finished += 1
+                self.current = None
+            return finished
+        finally:
+            self.current = None
+            db.close()
+
+    def _purge(self, db, job) -> bool:
+        """ Step through one job; True when it finished here, False when stopped or the lease was lost """
+        while not self._stopped.is_set():
+            started = time.perf_counter()
+            more = purge_step(db, job, self.name, self.batch_size)
+            elapsed = time.perf_counter() - started
+            self.batches += 1
+            self.batch_seconds += elapsed
+            if not more:
+                return job.status == "done"
+            pause = max(self.min_pause, elapsed * (1 - self.duty_cycle) / self.duty_cycle)
+            self.throttled_seconds += pause
+            self._stopped.wait(pause)
+        return False
+
+    def stats(self) -> dict:
+        return {
+            "worker": self.name,
+            "running": self._thread is not None and self._thread.is_alive(),
+            "current_user_id": self.current,
+            "jobs_finished": self.jobs_finished,
+            "batches": self.batches,
+            "batch_seconds": self.batch_seconds,
+            "throttled_seconds": self.throttled_seconds,
+        }
+
+purge_worker = PurgeWorker()
+
+@asynccontextmanager
+async def purge_lifespan(app):
+    """ FastAPI lifespan running the in-process purge worker, which also resumes unfinished jobs """
+    if USER_PURGE_IN_PROCESS:
+        purge_worker.start()
+    yield
+    purge_worker.stop()
@@ -0,0 +1,24 @@
+from fastapi import APIRouter
+
+from app.user.auth.hashing import metrics as hashing_metrics
+from app.user.auth.cache import cache_stats
+from app.user.auth.revocation import revocations
+from app.user.purge import purge_worker
+
+router = APIRouter(prefix="/internal", tags=["internal"])
+
+@router.get("/hashing")
+def hashing_stats():
+    return hashing_metrics.snapshot()
+
+@router.get("/auth-cache")
+def auth_cache_stats():
+    return cache_stats()
+
+@router.get("/user-purge")
+def user_purge_stats():
+    return purge_worker.stats()
+
+@router.get("/revocations")
+def revocation_stats():
+    return revocations.stats()
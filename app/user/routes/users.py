@@ -1,14 +1,23 @@
 from fastapi import APIRouter, Depends, HTTPException, status
 from sqlalchemy.orm import Session
-from datetime import timedelta
 
 from shared.database.session import get_db
-from app.user.schemas.user import UserCreate, UserResponse, Token, UserLogin
-from app.user.auth.auth import create_access_token, get_current_user_username
+from app.user.schemas.user import UserCreate, UserResponse, UserDeletionResponse, UserStatusResponse, Token, TokenRefreshRequest, UserLogin
+from app.user.auth.auth import get_current_user_username
+from app.user.auth.hashing import HashingBusyError
+from app.user.purge import purge_worker
 from app.user.crud import user as crud_user
+from app.user.crud import token as crud_token
 
 router = APIRouter()
 
+def _busy(err: HashingBusyError) -> HTTPException:
+    return HTTPException(
+        status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+        detail="Server busy, please retry",
+        headers={"Retry-After": str(err.retry_after)},
+    )
+
 @router.post("/register", response_model=UserResponse)
 def register_user(user: UserCreate, db: Session = Depends(get_db)):
     """ Register a new user """
@@ -34,11 +43,16 @@ def register_user(user: UserCreate, db: Session = Depends(get_db)):
             status_code=status.HTTP_400_BAD_REQUEST,
             detail=str(e)
         )
+    except HashingBusyError as e:
+        raise _busy(e)
 
 @router.post("/login", response_model=Token)
 def login_user(form_data: UserLogin, db: Session = Depends(get_db)):
-    """ Login user and return access token """
-    user = crud_user.authenticate_user(db, form_data.username, form_data.password)
+    """ Login user and return an access token with a refresh token """
+    try:
+        user = crud_user.authenticate_user(db, form_data.username, form_data.password)
+    except HashingBusyError as e:
+        raise _busy(e)
     if not user:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
@@ -46,18 +60,35 @@ def login_user(form_data: UserLogin, db: Session = Depends(get_db)):
             headers={"WWW-Authenticate": "Bearer"},
         )
     
-    access_token_expires = timedelta(minutes=30)
-    access_token = create_access_token(
-        data={"sub": user.username},
-        expires_delta=access_token_expires
-    )
-    
-    return {"access_token": access_token, "token_type": "bearer"}
+    return crud_token.issue_tokens(db, user.id, user.username)
+
+@router.post("/token/refresh", response_model=Token)
+def refresh_access_token(body: TokenRefreshRequest, db: Session = Depends(get_db)):
+    """ Trade a refresh token for a new access and refresh token; each refresh token works once """
+    try:
+        return crud_token.rotate_refresh_token(db, body.refresh_token)
+    except ValueError as e:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail=str(e),
+            headers={"WWW-Authenticate": "Bearer"},
+        )
+
+@router.post("/token/revoke")
+def revoke_refresh_token(body: TokenRefreshRequest, db: Session = Depends(get_db)):
+    """ Log out: revoke the refresh token and every access token of its session """
+    if not crud_token.revoke_refresh_token(db, body.refresh_token):
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Invalid refresh token",
+            headers={"WWW-Authenticate": "Bearer"},
+        )
+    return {"message": "Session revoked"}
 
 @router.get("/me", response_model=UserResponse)
 def read_users_me(current_username: str = Depends(get_current_user_username), db: Session = Depends(get_db)):
     """ Get current user info """
-    user = crud_user.get_user_by_username(db, current_username)
+    user = crud_user.get_cached_user(db, current_username)
     if not user or not user.is_active:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
@@ -65,18 +96,30 @@ def read_users_me(current_username: str = Depends(get_current_user_username), db
         )
     return user
 
-@router.delete("/{user_id}")
+@router.delete("/{user_id}", status_code=status.HTTP_202_ACCEPTED)
 def delete_user_endpoint(user_id: int, current_username: str = Depends(get_current_user_username), db: Session = Depends(get_db)):
-    """ Delete a user by ID (only admin or self) """
-    success = crud_user.delete_user(db, user_id)
-    if not success:
+    """ Deactivate a user now and purge their data in the background (only admin or self) """
+    deletion = crud_user.delete_user(db, user_id)
+    if not deletion:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="User not found"
         )
-    return {"message": "User deleted successfully"}
+    purge_worker.wake()
+    return {"message": "User deletion scheduled", "deletion": UserDeletionResponse.model_validate(deletion, from_attributes=True)}
+
+@router.get("/{user_id}/deletion", response_model=UserDeletionResponse)
+def read_user_deletion(user_id: int, current_username: str = Depends(get_current_user_username), db: Session = Depends(get_db)):
+    """ Progress of a queued user deletion """
+    deletion = crud_user.get_deletion(db, user_id)
+    if not deletion:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="No deletion for this user"
+        )
+    return deletion
 
-@router.put("/{user_id}/deactivate")
+@router.put("/{user_id}/deactivate", response_model=UserStatusResponse)
 def deactivate_user_endpoint(user_id: int, current_username: str = Depends(get_current_user_username), db: Session = Depends(get_db)):
     """ Deactivate a user by ID """
     user = crud_user.deactivate_user(db, user_id)
@@ -87,10 +130,16 @@ def deactivate_user_endpoint(user_id: int, current_username: str = Depends(get_c
         )
     return {"message": "User deactivated successfully", "user": user}
 
-@router.put("/{user_id}/activate")
+@router.put("/{user_id}/activate", response_model=UserStatusResponse)
 def activate_user_endpoint(user_id: int, current_username: str = Depends(get_current_user_username), db: Session = Depends(get_db)):
     """ Activate a user by ID """
-    user = crud_user.activate_user(db, user_id)
+    try:
+        user = crud_user.activate_user(db, user_id)
+    except ValueError as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=str(e)
+        )
     if not user:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
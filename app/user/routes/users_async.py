@@ -0,0 +1,147 @@
+from fastapi import APIRouter, Depends, HTTPException, status
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from shared.database.async_session import get_async_db
+from app.user.schemas.user import UserCreate, UserResponse, UserDeletionResponse, UserStatusResponse, Token, TokenRefreshRequest, UserLogin
+from app.user.auth.auth import get_current_user_username
+from app.user.auth.hashing import HashingBusyError
+from app.user.purge import purge_worker
+from app.user.crud import user_async as crud_user
+
+router = APIRouter()
+
+def _busy(err: HashingBusyError) -> HTTPException:
+    return HTTPException(
+        status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+        detail="Server busy, please retry",
+        headers={"Retry-After": str(err.retry_after)},
+    )
+
+@router.post("/register", response_model=UserResponse)
+async def register_user(user: UserCreate, db: AsyncSession = Depends(get_async_db)):
+    """ Register a new user """
+    user_exist = await crud_user.get_user_by_username(db, user.username)
+    if user_exist:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Username already registered"
+        )
+    
+    email_exist = await crud_user.get_user_by_email(db, user.email)
+    if email_exist:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Email already registered"
+        )
+    
+    try:
+        db_user = await crud_user.create_user(db, user)
+        return db_user
+    except ValueError as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=str(e)
+        )
+    except HashingBusyError as e:
+        raise _busy(e)
+
+@router.post("/login", response_model=Token)
+async def login_user(form_data: UserLogin, db: AsyncSession = Depends(get_async_db)):
+    """ Login user and return an access token with a refresh token """
+    try:
+        user = await crud_user.authenticate_user(db, form_data.username, form_data.password)
+    except HashingBusyError as e:
+        raise _busy(e)
+    if not user:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Incorrect username or password",
+            headers={"WWW-Authenticate": "Bearer"},
+        )
+    
+    return await crud_user.issue_tokens(db, user.id, user.username)
+
+@router.post("/token/refresh", response_model=Token)
+async def refresh_access_token(body: TokenRefreshRequest, db: AsyncSession = Depends(get_async_db)):
+    """ Trade a refresh token for a new access and refresh token; each refresh token works once """
+    try:
+        return await crud_user.rotate_refresh_token(db, body.refresh_token)
+    except ValueError as e:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail=str(e),
+            headers={"WWW-Authenticate": "Bearer"},
+        )
+
+@router.post("/token/revoke")
+async def revoke_refresh_token(body: TokenRefreshRequest, db: AsyncSession = Depends(get_async_db)):
+    """ Log out: revoke the refresh token and every access token of its session """
+    if not await crud_user.revoke_refresh_token(db, body.refresh_token):
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Invalid refresh token",
+            headers={"WWW-Authenticate": "Bearer"},
+        )
+    return {"message": "Session revoked"}
+
+@router.get("/me", response_model=UserResponse)
+async def read_users_me(current_username: str = Depends(get_current_user_username), db: AsyncSession = Depends(get_async_db)):
+    """ Get current user info """
+    user = await crud_user.get_cached_user(db, current_username)
+    if not user or not user.is_active:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="User is not active"
+        )
+    return user
+
+@router.delete("/{user_id}", status_code=status.HTTP_202_ACCEPTED)
+async def delete_user_endpoint(user_id: int, current_username: str = Depends(get_current_user_username), db: AsyncSession = Depends(get_async_db)):
+    """ Deactivate a user now and purge their data in the background (only admin or self) """
+    deletion = await crud_user.delete_user(db, user_id)
+    if not deletion:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="User not found"
+        )
+    purge_worker.wake()
+    return {"message": "User deletion scheduled", "deletion": UserDeletionResponse.model_validate(deletion, from_attributes=True)}
+
+@router.get("/{user_id}/deletion", response_model=UserDeletionResponse)
+async def read_user_deletion(user_id: int, current_username: str = Depends(get_current_user_username), db: AsyncSession = Depends(get_async_db)):
+    """ Progress of a queued user deletion """
+    deletion = await crud_user.get_deletion(db, user_id)
+    if not deletion:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="No deletion for this user"
+        )
+    return deletion
+
+@router.put("/{user_id}/deactivate", response_model=UserStatusResponse)
+async def deactivate_user_endpoint(user_id: int, current_username: str = Depends(get_current_user_username), db: AsyncSession = Depends(get_async_db)):
+    """ Deactivate a user by ID """
+    user = await crud_user.deactivate_user(db, user_id)
+    if not user:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="User not found"
+        )
+    return {"message": "User deactivated successfully", "user": user}
+
+@router.put("/{user_id}/activate", response_model=UserStatusResponse)
+async def activate_user_endpoint(user_id: int, current_username: str = Depends(get_current_user_username), db: AsyncSession = Depends(get_async_db)):
+    """ Activate a user by ID """
+    try:
+        user = await crud_user.activate_user(db, user_id)
+    except ValueError as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=str(e)
+        )
+    if not user:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="User not found"
+        )
+    return {"message": "User activated successfully", "user": user}
\ No newline at end of file
@@ -1,3 +1,6 @@
+from datetime import datetime
+from typing import Optional
+
 from pydantic import BaseModel, EmailStr
 
 class UserBase(BaseModel):
@@ -21,9 +24,32 @@ class UserLogin(BaseModel):
 class UserResponse(UserOut):
     pass
 
+class UserStatusResponse(BaseModel):
+    message: str
+    user: UserResponse
+
+class UserDeletionResponse(BaseModel):
+    user_id: int
+    username: str
+    status: str
+    todos_total: Optional[int] = None
+    schedules_total: Optional[int] = None
+    todos_deleted: int
+    schedules_deleted: int
+    recurrences_deleted: int
+    requested_at: Optional[datetime] = None
+    finished_at: Optional[datetime] = None
+
+    class Config:
+        orm_mode = True
+
 class Token(BaseModel):
     access_token: str
     token_type: str
+    refresh_token: Optional[str] = None
+
+class TokenRefreshRequest(BaseModel):
+    refresh_token: str
 
 class PasswordResetRequest(BaseModel):
     email: EmailStr
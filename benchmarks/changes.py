@@ -0,0 +1,129 @@
+""" Change notification: clients polling the todo list against the /changes/stream feed.
+
+    python -m benchmarks.changes [--clients 50] [--writes 100] [--rate 20] [--poll-interval 1.0]
+
+A uvicorn server runs on a fresh SQLite file while --writes todos are created at --rate per
+second. "polling" clients re-request GET /todos/ every --poll-interval with If-None-Match
+(so unchanged lists cost a 304); "streaming" clients hold one /changes/stream connection
+each. Latency is from sending the create request to the client first seeing the todo.
+"""
+import argparse
+import asyncio
+import json
+import os
+import socket
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+import httpx
+
+def _free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+def _summary(latencies, requests, received_bytes, elapsed):
+    latencies = sorted(latencies)
+    return {
+        "seen": len(latencies),
+        "latency_ms_p50": statistics.median(latencies) * 1000 if latencies else None,
+        "latency_ms_p99": latencies[int(len(latencies) * 0.99) - 1] * 1000 if latencies else None,
+        "requests": requests,
+        "requests_per_s": requests / elapsed,
+        "bytes_received": received_bytes,
+    }
+
+async def _write(client, count, rate, created):
+    for i in range(count):
+        created[f"todo {i}"] = time.perf_counter()
+        await client.post("/todos/", json={"title": f"todo {i}"})
+        await asyncio.sleep(1 / rate)
+
+async def _poll(client, interval, expected, created, seen, stats, done):
+    etag = None
+    while not done.is_set():
+        response = await client.get("/todos/", params={"limit": expected}, headers={"If-None-Match": etag} if etag else {})
+        stats["requests"] += 1
+        stats["bytes"] += len(response.content)
+        if response.status_code == 200:
+            etag = response.headers.get("etag")
+            now = time.perf_counter()
+            for todo in response.json():
+                if todo["title"] not in seen:
+                    seen[todo["title"]] = now - created[todo["title"]]
+            if len(seen) >= expected:
+                return
+        await asyncio.sleep(interval)
+
+async def _stream(client, expected, created, seen, stats, ready):
+    async with client.stream("GET", "/changes/stream", params={"topics": "todos"}) as response:
+        stats["requests"] += 1
+        ready.release()
+        async for line in response.aiter_lines():
+            stats["bytes"] += len(line) + 1
+            if line.startswith("data: "):
+                title = json.loads(line[6:])["data"]["title"]
+                seen[title] = time.perf_counter() - created[title]
+                if len(seen) >= expected:
+                    return
+
+async def _run(base, mode, args):
+    created, per_client = {}, [dict() for _ in range(args.clients)]
+    stats = {"requests": 0, "bytes": 0}
+    limits = httpx.Limits(max_connections=args.clients + 10)
+    async with httpx.AsyncClient(base_url=base, timeout=60, limits=limits) as client:
+        done = asyncio.Event()
+        ready = asyncio.Semaphore(0)
+        if mode == "streaming":
+            readers = [asyncio.create_task(_stream(client, args.writes, created, seen, stats, ready)) for seen in per_client]
+            for _ in readers:
+                await ready.acquire()
+        else:
+            readers = [
+                asyncio.create_task(_poll(client, args.poll_interval, args.writes, created, seen, stats, done))
+                for seen in per_client
+            ]
+        started = time.perf_counter()
+        await _write(client, args.writes, args.rate, created)
+        await asyncio.wait_for(asyncio.gather(*readers), timeout=args.writes / args.rate + 30)
+        done.set()
+        elapsed = time.perf_counter() - started
+    latencies = [latency for seen in per_client for latency in seen.values()]
+    return _summary(latencies, stats["requests"], stats["bytes"], elapsed)
+
+def main():
+    parser = argparse.ArgumentParser(prog="python -m benchmarks.changes")
+    parser.add_argument("--clients", type=int, default=50)
+    parser.add_argument("--writes", type=int, default=100)
+    parser.add_argument("--rate", type=float, default=20.0, help="writes per second")
+    parser.add_argument("--poll-interval", type=float, default=1.0)
+    args = parser.parse_args()
+
+    results = {}
+    for mode in ("polling", "streaming"):
+        with tempfile.TemporaryDirectory() as tmp:
+            env = dict(os.environ, DATABASE_URL=f"sqlite:///{tmp}/changes.db", METRICS_ENABLED="false")
+            subprocess.run([sys.executable, "-m", "shared.database.manage", "init-schema"], env=env, check=True, capture_output=True)
+            port = _free_port()
+            server = subprocess.Popen(
+                [sys.executable, "-m", "uvicorn", "app.main:app", "--port", str(port), "--log-level", "warning"], env=env,
+            )
+            base = f"http://127.0.0.1:{port}"
+            try:
+                for _ in range(100):
+                    try:
+                        httpx.get(base + "/health")
+                        break
+                    except httpx.HTTPError:
+                        time.sleep(0.1)
+                results[mode] = asyncio.run(_run(base, mode, args))
+            finally:
+                server.terminate()
+                server.wait()
+    print(json.dumps(results, indent=2))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,95 @@
+""" Server-side charts: what clients fetch today against a rendered, cached figure.
+
+    python -m benchmarks.charts [--rows 50000] [--repeat 20]
+
+Each variant gets a fresh SQLite file holding --rows schedules spread over 2026 and a
+dozen activities. "raw_range" is the current client path: download every entry of the
+year from /schedules/range and aggregate it client-side. "chart_uncached" renders
+/schedules/charts/{kind} with the chart cache disabled; "chart_cached" serves the same
+charts from the cache. import_seconds and plotly_loaded_at_import show that plotly and
+pandas stay out of service startup; first_chart_ms includes importing them.
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import textwrap
+
+PROBE = textwrap.dedent("""
+    import json, statistics, sys, time
+    from datetime import date, timedelta
+    started = time.perf_counter()
+    from app.time.main import app
+    import_seconds = time.perf_counter() - started
+    plotly_loaded = "plotly" in sys.modules or "pandas" in sys.modules
+    from sqlalchemy import insert
+    from fastapi.testclient import TestClient
+    from shared.database.session import SessionLocal, create_tables
+    from app.time.models.schedule import Schedule
+    from app.time.crud.rollup import rebuild_rollup
+
+    variant, rows, repeat = sys.argv[1], int(sys.argv[2]), int(sys.argv[3])
+    create_tables()
+    db = SessionLocal()
+    for start in range(0, rows, 10000):
+        db.execute(insert(Schedule), [
+            {"activity": f"activity {i % 12}", "hours": 0.5 + (i % 4) * 0.5, "planned": i % 3 != 0,
+             "date": date(2026, 1, 1) + timedelta(days=i % 365)}
+            for i in range(start, min(rows, start + 10000))
+        ])
+    db.commit()
+    rebuild_rollup(db)
+    db.close()
+    client = TestClient(app)
+    query = "start_date=2026-01-01&end_date=2026-12-31"
+
+    def timed(paths):
+        samples, size = [], 0
+        for _ in range(repeat):
+            for path in paths:
+                started = time.perf_counter()
+                response = client.get(path)
+                samples.append((time.perf_counter() - started) * 1000)
+                assert response.status_code == 200, response.text
+                size = max(size, len(response.content))
+        return statistics.median(samples), max(samples), size
+
+    result = {"import_seconds": import_seconds, "plotly_loaded_at_import": plotly_loaded}
+    if variant == "raw_range":
+        p50, worst, size = timed(["/schedules/range/2026-01-01/2026-12-31"])
+    else:
+        started = time.perf_counter()
+        client.get(f"/schedules/charts/daily?{query}")
+        result["first_chart_ms"] = (time.perf_counter() - started) * 1000
+        p50, worst, size = timed([f"/schedules/charts/{kind}?{query}" for kind in ("daily", "activities", "weekly")])
+    result.update({"request_ms_p50": p50, "request_ms_max": worst, "max_response_bytes": size})
+    print(json.dumps(result))
+""")
+
+VARIANTS = (
+    ("raw_range", {}),
+    ("chart_uncached", {"CHART_CACHE_ENABLED": "false"}),
+    ("chart_cached", {"CHART_CACHE_ENABLED": "true"}),
+)
+
+def main():
+    parser = argparse.ArgumentParser(prog="python -m benchmarks.charts")
+    parser.add_argument("--rows", type=int, default=50000)
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+
+    results = {}
+    for name, extra_env in VARIANTS:
+        with tempfile.TemporaryDirectory() as tmp:
+            env = dict(os.environ, DATABASE_URL=f"sqlite:///{tmp}/charts.db", METRICS_ENABLED="false", **extra_env)
+            probe = subprocess.run(
+                [sys.executable, "-c", PROBE, name, str(args.rows), str(args.repeat)],
+                env=env, capture_output=True, text=True, check=True,
+            )
+            results[name] = json.loads(probe.stdout.strip().splitlines()[-1])
+    print(json.dumps(results, indent=2))
+
+if __name__ == "__main__":
+    main()
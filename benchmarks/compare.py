@@ -0,0 +1,78 @@
+""" Flag per-endpoint regressions between two benchmarks.load result files.
+
+    python -m benchmarks.compare baseline.json current.json [--threshold 0.10] [--latency p95_ms]
+
+An endpoint regresses when its latency grows or its throughput drops by more than the
+threshold, or when it returns errors the baseline did not. Exits 1 on any regression so
+it can gate CI; mismatched run settings are reported because they make numbers incomparable.
+"""
+import argparse
+import json
+import sys
+
+# Settings that must match for two runs to be comparable
+COMPARABLE_META = ("mode", "workers", "requests", "concurrency", "dataset", "database", "database_mode", "fast_serialization")
+
+def _change(baseline: float, current: float) -> float:
+    return (current - baseline) / baseline if baseline else 0.0
+
+def compare(baseline: dict, current: dict, threshold: float = 0.10, latency: str = "p95_ms") -> dict:
+    endpoints = {}
+    regressions = []
+    for name, base in baseline["endpoints"].items():
+        run = current["endpoints"].get(name)
+        if run is None:
+            continue
+        latency_change = _change(base[latency], run[latency])
+        throughput_change = _change(base["throughput_rps"], run["throughput_rps"])
+        reasons = []
+        if latency_change > threshold:
+            reasons.append(f"{latency} +{latency_change:.0%}")
+        if throughput_change < -threshold:
+            reasons.append(f"throughput {throughput_change:.0%}")
+        if run["errors"] > base["errors"]:
+            reasons.append(f"errors {base['errors']} -> {run['errors']}")
+        endpoints[name] = {
+            f"baseline_{latency}": base[latency],
+            f"current_{latency}": run[latency],
+            "latency_change": latency_change,
+            "baseline_throughput_rps": base["throughput_rps"],
+            "current_throughput_rps": run["throughput_rps"],
+            "throughput_change": throughput_change,
+            "regressed": bool(reasons),
+        }
+        if reasons:
+            regressions.append({"endpoint": name, "reasons": reasons})
+    return {
+        "threshold": threshold,
+        "latency_metric": latency,
+        "mismatched_meta": {
+            key: {"baseline": baseline["meta"].get(key), "current": current["meta"].get(key)}
+            for key in COMPARABLE_META
+            if baseline["meta"].get(key) != current["meta"].get(key)
+        },
+        "missing_endpoints": sorted(set(baseline["endpoints"]) - set(current["endpoints"])),
+        "endpoints": endpoints,
+        "regressions": regressions,
+    }
+
+def main() -> int:
+    parser = argparse.ArgumentParser(prog="python -m benchmarks.compare")
+    parser.add_argument("baseline")
+    parser.add_argument("current")
+    parser.add_argument("--threshold", type=float, default=0.10, help="allowed relative change, e.g. 0.10 for 10%%")
+    parser.add_argument("--latency", choices=["p50_ms", "p95_ms", "p99_ms", "mean_ms"], default="p95_ms")
+    args = parser.parse_args()
+
+    with open(args.baseline) as handle:
+        baseline = json.load(handle)
+    with open(args.current) as handle:
+        current = json.load(handle)
+    report = compare(baseline, current, args.threshold, args.latency)
+    print(json.dumps(report, indent=2))
+    for regression in report["regressions"]:
+        print(f"REGRESSION {regression['endpoint']}: {', '.join(regression['reasons'])}", file=sys.stderr)
+    return 1 if report["regressions"] else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,112 @@
+""" Three-process layout versus the single-process composite app (app.main).
+
+    python -m benchmarks.composite [--requests 2000] [--concurrency 16] [--database-url ...]
+
+Starts uvicorn for each layout, drives the same request mix through both and reports
+total RSS, database connections opened (from /internal/pool) and latency percentiles.
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import httpx
+
+LAYOUTS = {
+    "three-process": {"user": ("app.user.main:app", 8101), "todo": ("app.todo.main:app", 8102), "time": ("app.time.main:app", 8103)},
+    "composite": {"user": ("app.main:app", 8100), "todo": ("app.main:app", 8100), "time": ("app.main:app", 8100)},
+}
+
+# (service, path) pairs cycled through by the load generator
+REQUEST_MIX = [
+    ("user", "/health"),
+    ("todo", "/todos/?limit=20"),
+    ("todo", "/todos/1"),
+    ("time", "/schedules/date/2026-01-01"),
+    ("time", "/schedules/summary?start_date=2026-01-01&end_date=2026-12-31"),
+]
+
+def rss_kib(pid: int) -> int:
+    with open(f"/proc/{pid}/status") as status:
+        for line in status:
+            if line.startswith("VmRSS:"):
+                return int(line.split()[1])
+    return 0
+
+def start(layout: dict, env: dict) -> dict:
+    processes = {}
+    for target, port in {target_port for target_port in layout.values()}:
+        processes[port] = subprocess.Popen(
+            [sys.executable, "-m", "uvicorn", target, "--port", str(port), "--log-level", "warning"],
+            env=env,
+        )
+    for port in processes:
+        for _ in range(100):
+            try:
+                httpx.get(f"http://127.0.0.1:{port}/", timeout=1)
+                break
+            except httpx.TransportError:
+                time.sleep(0.1)
+    return processes
+
+def percentile(samples: list, q: float) -> float:
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(q * len(ordered)))]
+
+def run_layout(name: str, layout: dict, env: dict, requests: int, concurrency: int) -> dict:
+    processes = start(layout, env)
+    try:
+        client = httpx.Client(timeout=30)
+        client.post(f"http://127.0.0.1:{layout['todo'][1]}/todos/", json={"title": "bench"})
+
+        def call(i: int) -> float:
+            service, path = REQUEST_MIX[i % len(REQUEST_MIX)]
+            started = time.perf_counter()
+            client.get(f"http://127.0.0.1:{layout[service][1]}{path}")
+            return time.perf_counter() - started
+
+        with ThreadPoolExecutor(concurrency) as pool:
+            latencies = list(pool.map(call, range(requests)))
+
+        connections = 0
+        for port in processes:
+            for engine in client.get(f"http://127.0.0.1:{port}/internal/pool").json().values():
+                connections += engine["connects"]
+        return {
+            "layout": name,
+            "processes": len(processes),
+            "rss_kib_total": sum(rss_kib(process.pid) for process in processes.values()),
+            "db_connections_opened": connections,
+            "latency_ms_p50": percentile(latencies, 0.50) * 1000,
+            "latency_ms_p95": percentile(latencies, 0.95) * 1000,
+            "latency_ms_mean": statistics.mean(latencies) * 1000,
+        }
+    finally:
+        for process in processes.values():
+            process.terminate()
+            process.wait()
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--requests", type=int, default=2000)
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--database-url", default=None)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        env = dict(os.environ)
+        env["DATABASE_URL"] = args.database_url or f"sqlite:///{tmp}/composite.db"
+        subprocess.run([sys.executable, "-m", "shared.database.manage", "init-schema"], env=env, check=True, capture_output=True)
+        results = [
+            run_layout(name, layout, env, args.requests, args.concurrency)
+            for name, layout in LAYOUTS.items()
+        ]
+    print(json.dumps(results, indent=2))
+
+if __name__ == "__main__":
+    main()
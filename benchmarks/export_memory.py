@@ -0,0 +1,95 @@
+""" Peak RSS of the streaming schedule export versus the list endpoint, per row count.
+
+    python -m benchmarks.export_memory --rows 10000 100000 500000
+
+Each measurement runs in a fresh interpreter so ru_maxrss reflects a single request.
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+from datetime import date, timedelta
+
+def seed(url: str, rows: int):
+    os.environ["DATABASE_URL"] = url
+    from sqlalchemy import insert
+    from shared.database.session import SessionLocal, create_tables
+    from app.time.models.schedule import Schedule
+
+    create_tables()
+    start = date(2020, 1, 1)
+    db = SessionLocal()
+    batch = []
+    for i in range(rows):
+        batch.append({"activity": f"activity-{i % 20}", "hours": 1.5, "date": start + timedelta(days=i % 1500)})
+        if len(batch) == 10000:
+            db.execute(insert(Schedule), batch)
+            batch.clear()
+    if batch:
+        db.execute(insert(Schedule), batch)
+    db.commit()
+    db.close()
+
+def measure(url: str, mode: str) -> dict:
+    """ Executed in the child: drive one request through the ASGI app, discarding the body
+    as it arrives, and report RSS growth in KiB """
+    import asyncio
+    import resource
+
+    os.environ["DATABASE_URL"] = url
+    from app.time.main import app
+
+    path = "/schedules/export/2020-01-01/2030-01-01" if mode == "export" else "/schedules/range/2020-01-01/2030-01-01"
+    received = 0
+    requested = False
+
+    async def receive():
+        nonlocal requested
+        if not requested:
+            requested = True
+            return {"type": "http.request", "body": b"", "more_body": False}
+        # The client never disconnects; block until the response task cancels us
+        await asyncio.Event().wait()
+
+    async def send(message):
+        nonlocal received
+        if message["type"] == "http.response.body":
+            received += len(message.get("body", b""))
+
+    scope = {
+        "type": "http", "asgi": {"version": "3.0"}, "http_version": "1.1", "method": "GET",
+        "scheme": "http", "path": path, "raw_path": path.encode(), "query_string": b"",
+        "root_path": "", "headers": [], "client": ("bench", 0), "server": ("bench", 80),
+    }
+    baseline = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    asyncio.run(app(scope, receive, send))
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return {"mode": mode, "bytes": received, "rss_growth_kib": peak - baseline}
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--rows", type=int, nargs="+", default=[10000, 100000])
+    parser.add_argument("--child", nargs=2, metavar=("URL", "MODE"), help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        print(json.dumps(measure(*args.child)))
+        return
+
+    results = []
+    for rows in args.rows:
+        with tempfile.TemporaryDirectory() as tmp:
+            url = f"sqlite:///{tmp}/bench.db"
+            subprocess.run([sys.executable, "-c", f"from benchmarks.export_memory import seed; seed({url!r}, {rows})"], check=True)
+            for mode in ("range", "export"):
+                out = subprocess.run(
+                    [sys.executable, "-m", "benchmarks.export_memory", "--child", url, mode],
+                    check=True, capture_output=True, text=True,
+                ).stdout.strip().splitlines()[-1]
+                results.append({"rows": rows, **json.loads(out)})
+    print(json.dumps(results, indent=2))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,327 @@
+""" Per-endpoint throughput and latency for every user, todo and schedule route. The
+/internal diagnostics, /metrics and the /changes/stream event stream are left out.
+
+    python -m benchmarks.load [--mode inprocess|uvicorn] [--workers 4] [--requests 200]
+        [--concurrency 8] [--users 50] [--todos 5000] [--schedules 5000]
+        [--database-url ...] [--only todos.list,schedules.range] [--output results.json]
+
+Seeds a fresh dataset (benchmarks.seed; a temporary SQLite file unless --database-url
+is given), then drives the composite app (app.main) one endpoint at a time, either
+in-process through httpx's ASGI transport or against `uvicorn --workers N`. Reads run
+first on the untouched dataset, then writes, then deletes, which consume rows the
+write phase created. Results are JSON; benchmarks.compare checks them against a baseline.
+"""
+import argparse
+import asyncio
+import json
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime, timezone
+from typing import Any, Callable, Dict, List, NamedTuple, Optional
+
+import httpx
+
+BATCH_SIZE = 10
+IMPORT_ROWS = 20
+UVICORN_PORT = 8200
+
+class Endpoint(NamedTuple):
+    name: str
+    method: str
+    build: Callable[[dict, int], dict]
+    # Receives the JSON body of each successful response, e.g. to record created ids
+    collect: Optional[Callable[[dict, Any], None]] = None
+
+def _auth(ctx: dict) -> dict:
+    return {"Authorization": f"Bearer {ctx['token']}"}
+
+def _pop(ctx: dict, pool: str, count: int = 1) -> list:
+    if len(ctx[pool]) < count:
+        raise SystemExit(f"No {pool} left to use; include the endpoints that create them in the run")
+    ids = ctx[pool][-count:]
+    del ctx[pool][-count:]
+    return ids
+
+def _import_csv(i: int) -> bytes:
+    lines = ["activity,hours,date,planned"]
+    lines += [f"import{i},1.5,2026-02-{(row % 28) + 1:02d},true" for row in range(IMPORT_ROWS)]
+    return ("\n".join(lines) + "\n").encode("utf-8")
+
+def _created(pool: str):
+    def collect(ctx: dict, body: Any):
+        ctx[pool].append(body["id"])
+    return collect
+
+def _refresh_token(ctx: dict, body: Any):
+    ctx["refresh_tokens"].append(body["refresh_token"])
+
+def _deleted_user(ctx: dict, body: Any):
+    ctx["deleted_users"].append(body["deletion"]["user_id"])
+
+def _created_batch(pool: str):
+    def collect(ctx: dict, body: Any):
+        ctx[pool].extend(result["id"] for result in body["results"] if result["id"] is not None)
+    return collect
+
+ENDPOINTS = [
+    # Reads over the seeded dataset
+    Endpoint("users.me", "GET", lambda ctx, i: {"url": "/users/me", "headers": _auth(ctx)}),
+    Endpoint("todos.get", "GET", lambda ctx, i: {"url": f"/todos/{ctx['todo_ids'][i % len(ctx['todo_ids'])]}"}),
+    Endpoint("todos.list", "GET", lambda ctx, i: {"url": "/todos/", "params": {"limit": 50}}),
+    Endpoint("todos.list_cursor", "GET", lambda ctx, i: {"url": "/todos/", "params": {"limit": 50, "cursor": ""}}),
+    Endpoint("todos.export", "GET", lambda ctx, i: {"url": "/todos/export", "params": {"completed": "true"}}),
+    Endpoint("todos.search", "GET", lambda ctx, i: {"url": "/todos/search", "params": {"q": "todo", "limit": 20}}),
+    Endpoint("schedules.date", "GET", lambda ctx, i: {"url": f"/schedules/date/2026-01-{(i % 28) + 1:02d}"}),
+    Endpoint("schedules.range", "GET", lambda ctx, i: {"url": "/schedules/range/2026-01-01/2026-01-07"}),
+    Endpoint("schedules.summary", "GET", lambda ctx, i: {
+        "url": "/schedules/summary", "params": {"start_date": "2026-01-01", "end_date": "2026-03-31", "group_by": "week"},
+    }),
+    Endpoint("schedules.export", "GET", lambda ctx, i: {"url": "/schedules/export/2026-01-01/2026-01-31"}),
+    Endpoint("schedules.free", "GET", lambda ctx, i: {
+        "url": "/schedules/free", "params": {"start_date": "2026-01-01", "end_date": "2026-01-07", "day_start": "08:00", "day_end": "18:00"},
+    }),
+    Endpoint("schedules.conflicts", "GET", lambda ctx, i: {
+        "url": "/schedules/conflicts", "params": {"start_date": "2026-01-01", "end_date": "2026-01-31"},
+    }),
+    Endpoint("schedules.chart", "GET", lambda ctx, i: {
+        "url": f"/schedules/charts/{('daily', 'activities', 'weekly')[i % 3]}",
+        "params": {"start_date": "2026-01-01", "end_date": "2026-03-31"},
+    }),
+    # Writes; created ids feed the delete phase
+    Endpoint("users.login", "POST", lambda ctx, i: {
+        "url": "/users/login", "json": {"username": ctx["username"], "password": ctx["password"]},
+    }),
+    # Each refresh spends the token it sends and puts the successor back in the pool
+    Endpoint("users.token_refresh", "POST", lambda ctx, i: {
+        "url": "/users/token/refresh", "json": {"refresh_token": _pop(ctx, "refresh_tokens")[0]},
+    }, _refresh_token),
+    Endpoint("users.register", "POST", lambda ctx, i: {
+        "url": "/users/register",
+        "json": {"username": f"{ctx['tag']}u{i}", "email": f"{ctx['tag']}u{i}@example.com", "password": ctx["password"]},
+    }, _created("created_users")),
+    Endpoint("todos.create", "POST", lambda ctx, i: {"url": "/todos/", "json": {"title": f"created {i}"}}, _created("created_todos")),
+    Endpoint("todos.batch_create", "POST", lambda ctx, i: {
+        "url": "/todos/batch", "json": {"items": [{"title": f"batch {i}.{n}"} for n in range(BATCH_SIZE)]},
+    }, _created_batch("created_todos")),
+    Endpoint("todos.update", "PUT", lambda ctx, i: {
+        "url": f"/todos/{ctx['todo_ids'][i % len(ctx['todo_ids'])]}", "json": {"completed": i % 2 == 0},
+    }),
+    Endpoint("todos.batch_update", "PATCH", lambda ctx, i: {
+        "url": "/todos/batch",
+        "json": {"items": [{"id": ctx["todo_ids"][(i * BATCH_SIZE + n) % len(ctx["todo_ids"])], "completed": True} for n in range(BATCH_SIZE)]},
+    }),
+    Endpoint("schedules.create", "POST", lambda ctx, i: {
+        "url": "/schedules/", "json": {"activity": "created", "hours": 1.0, "date": "2026-02-01"},
+    }, _created("created_schedules")),
+    Endpoint("schedules.batch_create", "POST", lambda ctx, i: {
+        "url": "/schedules/batch",
+        "json": {"items": [{"activity": "batch", "hours": 0.5, "date": "2026-02-02"} for _ in range(BATCH_SIZE)]},
+    }, _created_batch("created_schedules")),
+    Endpoint("schedules.recurrence_create", "POST", lambda ctx, i: {
+        "url": "/schedules/recurrences",
+        "json": {"activity": "standup", "hours": 0.25, "frequency": "weekly", "weekdays": [0, 2, 4], "start_date": "2026-01-05"},
+    }, _created("created_recurrences")),
+    Endpoint("schedules.recurrences", "GET", lambda ctx, i: {"url": "/schedules/recurrences"}),
+    Endpoint("schedules.recurrence_skip", "PUT", lambda ctx, i: {
+        "url": f"/schedules/recurrences/{ctx['created_recurrences'][i % len(ctx['created_recurrences'])]}/exceptions/2026-01-{(i % 28) + 1:02d}",
+    }),
+    Endpoint("schedules.recurrence_restore", "DELETE", lambda ctx, i: {
+        "url": f"/schedules/recurrences/{ctx['created_recurrences'][i % len(ctx['created_recurrences'])]}/exceptions/2026-01-{(i % 28) + 1:02d}",
+    }),
+    Endpoint("schedules.import", "POST", lambda ctx, i: {
+        "url": "/schedules/import", "files": {"file": (f"import{i}.csv", _import_csv(i), "text/csv")},
+    }),
+    Endpoint("users.deactivate", "PUT", lambda ctx, i: {
+        "url": f"/users/{ctx['created_users'][i % len(ctx['created_users'])]}/deactivate", "headers": _auth(ctx),
+    }),
+    Endpoint("users.activate", "PUT", lambda ctx, i: {
+        "url": f"/users/{ctx['created_users'][i % len(ctx['created_users'])]}/activate", "headers": _auth(ctx),
+    }),
+    # Deletes consume what the write phase created, leaving the seeded rows intact
+    Endpoint("todos.delete", "DELETE", lambda ctx, i: {"url": f"/todos/{_pop(ctx, 'created_todos')[0]}"}),
+    Endpoint("todos.batch_delete", "DELETE", lambda ctx, i: {
+        "url": "/todos/batch", "json": {"ids": _pop(ctx, "created_todos", BATCH_SIZE)},
+    }),
+    Endpoint("schedules.delete", "DELETE", lambda ctx, i: {"url": f"/schedules/{_pop(ctx, 'created_schedules')[0]}"}),
+    Endpoint("schedules.recurrence_delete", "DELETE", lambda ctx, i: {
+        "url": f"/schedules/recurrences/{_pop(ctx, 'created_recurrences')[0]}",
+    }),
+    Endpoint("users.token_revoke", "POST", lambda ctx, i: {
+        "url": "/users/token/revoke", "json": {"refresh_token": _pop(ctx, "refresh_tokens")[0]},
+    }),
+    Endpoint("users.delete", "DELETE", lambda ctx, i: {
+        "url": f"/users/{_pop(ctx, 'created_users')[0]}", "headers": _auth(ctx),
+    }, _deleted_user),
+    Endpoint("users.deletion", "GET", lambda ctx, i: {
+        "url": f"/users/{ctx['deleted_users'][i % len(ctx['deleted_users'])]}/deletion", "headers": _auth(ctx),
+    }),
+]
+
+def percentile(samples: List[float], q: float) -> float:
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(q * len(ordered)))]
+
+async def run_endpoint(client: httpx.AsyncClient, endpoint: Endpoint, ctx: dict, calls: int, warmup: int, concurrency: int) -> dict:
+    semaphore = asyncio.Semaphore(concurrency)
+    latencies: List[float] = []
+    statuses: Dict[str, int] = {}
+
+    async def call(i: int, measured: bool):
+        async with semaphore:
+            kwargs = endpoint.build(ctx, i)
+            started = time.perf_counter()
+            response = await client.request(endpoint.method, **kwargs)
+            elapsed = time.perf_counter() - started
+        if response.is_success and endpoint.collect is not None:
+            endpoint.collect(ctx, response.json())
+        if measured:
+            latencies.append(elapsed)
+            statuses[str(response.status_code)] = statuses.get(str(response.status_code), 0) + 1
+
+    await asyncio.gather(*(call(i, False) for i in range(warmup)))
+    started = time.perf_counter()
+    await asyncio.gather(*(call(warmup + i, True) for i in range(calls)))
+    wall = time.perf_counter() - started
+    return {
+        "requests": calls,
+        "errors": sum(count for status, count in statuses.items() if not status.startswith("2")),
+        "statuses": statuses,
+        "throughput_rps": calls / wall if wall else 0.0,
+        "p50_ms": percentile(latencies, 0.50) * 1000,
+        "p95_ms": percentile(latencies, 0.95) * 1000,
+        "p99_ms": percentile(latencies, 0.99) * 1000,
+        "mean_ms": sum(latencies) / len(latencies) * 1000,
+    }
+
+async def run_all(client: httpx.AsyncClient, endpoints: List[Endpoint], ctx: dict, args) -> dict:
+    login = await client.post("/users/login", json={"username": ctx["username"], "password": ctx["password"]})
+    login.raise_for_status()
+    ctx["token"] = login.json()["access_token"]
+    results = {}
+    for endpoint in endpoints:
+        results[endpoint.name] = await run_endpoint(client, endpoint, ctx, args.requests, args.warmup, args.concurrency)
+        print(f"{endpoint.name}: {results[endpoint.name]['throughput_rps']:.0f} req/s", file=sys.stderr)
+    return results
+
+def _start_uvicorn(env: dict, workers: int) -> subprocess.Popen:
+    process = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "app.main:app", "--port", str(UVICORN_PORT),
+         "--workers", str(workers), "--log-level", "warning"],
+        env=env,
+    )
+    for _ in range(300):
+        try:
+            if httpx.get(f"http://127.0.0.1:{UVICORN_PORT}/health", timeout=1).is_success:
+                return process
+        except httpx.TransportError:
+            time.sleep(0.1)
+    process.terminate()
+    raise SystemExit("uvicorn did not become ready")
+
+def _issue_refresh_tokens(user: dict, count: int) -> List[str]:
+    """ Refresh tokens for the refresh and revoke endpoints, issued directly rather than
+    through logins, which can be turned away with 503 while the hashing pool is busy """
+    from app.user.crud.token import issue_tokens
+    from shared.database.session import SessionLocal
+
+    with SessionLocal() as db:
+        return [issue_tokens(db, user["id"], user["username"])["refresh_token"] for _ in range(count)]
+
+def _git_commit() -> Optional[str]:
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+def main():
+    parser = argparse.ArgumentParser(prog="python -m benchmarks.load")
+    parser.add_argument("--mode", choices=["inprocess", "uvicorn"], default="inprocess")
+    parser.add_argument("--workers", type=int, default=4, help="uvicorn worker processes (uvicorn mode)")
+    parser.add_argument("--requests", type=int, default=200, help="measured requests per endpoint")
+    parser.add_argument("--warmup", type=int, default=10, help="unmeasured requests per endpoint")
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--users", type=int, default=50)
+    parser.add_argument("--todos", type=int, default=5000)
+    parser.add_argument("--schedules", type=int, default=5000)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--database-url", default=None, help="defaults to a temporary SQLite file; the database is reset")
+    parser.add_argument("--only", default=None, help="comma-separated endpoint names")
+    parser.add_argument("--output", default=None, help="write results here as well as to stdout")
+    args = parser.parse_args()
+
+    endpoints = ENDPOINTS
+    if args.only:
+        wanted = set(args.only.split(","))
+        unknown = wanted - {endpoint.name for endpoint in ENDPOINTS}
+        if unknown:
+            raise SystemExit(f"Unknown endpoints: {', '.join(sorted(unknown))}")
+        endpoints = [endpoint for endpoint in ENDPOINTS if endpoint.name in wanted]
+
+    with tempfile.TemporaryDirectory() as tmp:
+        os.environ["DATABASE_URL"] = args.database_url or f"sqlite:///{tmp}/load.db"
+        from benchmarks.seed import SEED_PASSWORD, seed
+
+        dataset = seed(args.users, args.todos, args.schedules, args.seed, reset=True)
+        if not dataset["users"] or not dataset["todo_ids"]:
+            raise SystemExit("The load run needs at least one seeded user and todo")
+        ctx = {
+            "tag": f"r{int(time.time())}",
+            "username": dataset["users"][0]["username"],
+            "password": SEED_PASSWORD,
+            "todo_ids": dataset["todo_ids"],
+            "created_users": [],
+            "created_todos": [],
+            "created_schedules": [],
+            "created_recurrences": [],
+            "refresh_tokens": _issue_refresh_tokens(dataset["users"][0], args.warmup + args.requests),
+            "deleted_users": [],
+        }
+
+        if args.mode == "uvicorn":
+            process = _start_uvicorn(dict(os.environ), args.workers)
+            try:
+                async def drive():
+                    async with httpx.AsyncClient(base_url=f"http://127.0.0.1:{UVICORN_PORT}", timeout=60) as client:
+                        return await run_all(client, endpoints, ctx, args)
+                results = asyncio.run(drive())
+            finally:
+                process.terminate()
+                process.wait()
+        else:
+            from app.main import app
+
+            async def drive():
+                transport = httpx.ASGITransport(app=app)
+                async with httpx.AsyncClient(transport=transport, base_url="http://bench", timeout=60) as client:
+                    return await run_all(client, endpoints, ctx, args)
+            results = asyncio.run(drive())
+
+    report = {
+        "meta": {
+            "mode": args.mode,
+            "workers": args.workers if args.mode == "uvicorn" else 1,
+            "requests": args.requests,
+            "warmup": args.warmup,
+            "concurrency": args.concurrency,
+            "dataset": {"users": args.users, "todos": args.todos, "schedules": args.schedules, "seed": args.seed},
+            "database": (args.database_url or "sqlite").split(":", 1)[0],
+            "database_mode": os.getenv("DATABASE_MODE", "sync"),
+            "fast_serialization": os.getenv("FAST_SERIALIZATION", "false"),
+            "commit": _git_commit(),
+            "python": platform.python_version(),
+            "recorded_at": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        },
+        "endpoints": results,
+    }
+    output = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, "w") as handle:
+            handle.write(output + "\n")
+    print(output)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,105 @@
+""" Deleting a user with a large history: one transaction against the background purge.
+
+    python -m benchmarks.purge [--rows 200000] [--batch-size 500] [--duty-cycle 0.25]
+
+Each variant gets a fresh SQLite file with one user owning --rows todos and --rows
+schedules, while a second thread keeps creating todos as live traffic. "single_transaction"
+detaches every owned row and deletes the user in one transaction (the previous
+delete_user); "background" calls delete_user (deactivate and queue) and lets PurgeWorker
+remove the rows in batches. Live write latency is measured over the whole deletion.
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import textwrap
+
+PROBE = textwrap.dedent("""
+    import json, statistics, sys, threading, time
+    from datetime import date, timedelta
+    from sqlalchemy import column, delete, insert, table, update
+    from shared.database.session import SessionLocal, create_tables
+    from app.user.models.user import User
+    from app.todo.models.todo import Todo
+    from app.todo.schemas.todo import TodoCreate
+    from app.todo.crud.todo import create_todo
+    from app.time.models.schedule import Schedule
+    from app.user.crud.user import delete_user
+    from app.user.purge import PurgeWorker
+
+    variant, rows, batch_size, duty_cycle = sys.argv[1], int(sys.argv[2]), int(sys.argv[3]), float(sys.argv[4])
+    create_tables()
+    db = SessionLocal()
+    db.add(User(username="heavy", email="heavy@example.com", hashed_password="x"))
+    db.commit()
+    for start in range(0, rows, 10000):
+        count = min(10000, rows - start)
+        db.execute(insert(Todo), [{"title": f"todo {start + i}", "owner_id": 1} for i in range(count)])
+        db.execute(insert(Schedule), [
+            {"activity": "work", "hours": 1.0, "date": date(2020, 1, 1) + timedelta(days=(start + i) % 2000), "owner_id": 1}
+            for i in range(count)
+        ])
+    db.commit()
+
+    latencies, stop = [], threading.Event()
+    def live_writes():
+        session = SessionLocal()
+        while not stop.is_set():
+            started = time.perf_counter()
+            create_todo(session, TodoCreate(title="live"))
+            latencies.append((time.perf_counter() - started) * 1000)
+            time.sleep(0.005)
+        session.close()
+    writer = threading.Thread(target=live_writes)
+    writer.start()
+    time.sleep(0.5)
+
+    started = time.perf_counter()
+    if variant == "single_transaction":
+        for name in ("todos", "schedules"):
+            owned = table(name, column("owner_id"))
+            db.execute(update(owned).where(owned.c.owner_id == 1).values(owner_id=None))
+        db.execute(delete(User).where(User.id == 1))
+        db.commit()
+        request_ms = (time.perf_counter() - started) * 1000
+    else:
+        delete_user(db, 1)
+        request_ms = (time.perf_counter() - started) * 1000
+        worker = PurgeWorker(batch_size=batch_size, duty_cycle=duty_cycle)
+        worker.run_pending()
+    total_s = time.perf_counter() - started
+    time.sleep(0.2)
+    stop.set()
+    writer.join()
+    latencies.sort()
+    print(json.dumps({
+        "rows_owned": 2 * rows, "delete_request_ms": request_ms, "until_gone_s": total_s,
+        "live_writes": len(latencies),
+        "live_write_ms_p50": statistics.median(latencies),
+        "live_write_ms_p99": latencies[int(len(latencies) * 0.99) - 1],
+        "live_write_ms_max": latencies[-1],
+    }))
+""")
+
+def main():
+    parser = argparse.ArgumentParser(prog="python -m benchmarks.purge")
+    parser.add_argument("--rows", type=int, default=200000, help="todos and schedules owned by the deleted user, each")
+    parser.add_argument("--batch-size", type=int, default=500)
+    parser.add_argument("--duty-cycle", type=float, default=0.25)
+    args = parser.parse_args()
+
+    results = {}
+    for variant in ("single_transaction", "background"):
+        with tempfile.TemporaryDirectory() as tmp:
+            env = dict(os.environ, DATABASE_URL=f"sqlite:///{tmp}/purge.db", METRICS_ENABLED="false", CHANGES_ENABLED="false")
+            probe = subprocess.run(
+                [sys.executable, "-c", PROBE, variant, str(args.rows), str(args.batch_size), str(args.duty_cycle)],
+                env=env, capture_output=True, text=True, check=True,
+            )
+            results[variant] = json.loads(probe.stdout.strip().splitlines()[-1])
+    print(json.dumps(results, indent=2))
+
+if __name__ == "__main__":
+    main()
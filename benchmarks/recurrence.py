@@ -0,0 +1,119 @@
+""" Recurring schedules: one row per occurrence against rules expanded at query time.
+
+    python -m benchmarks.recurrence [--rules 50] [--repeat 50]
+
+Each variant gets a fresh SQLite file holding the same calendar: --rules repeating
+activities (weekday standups, weekly reviews, monthly reports) over 2026, plus one
+stored schedule per day. "rows" stores every occurrence as a Schedule; "rules" stores
+the rules, once with the occurrence cache disabled and once with it warm.
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import textwrap
+
+PROBE = textwrap.dedent("""
+    import json, os, statistics, sys, time
+    from datetime import date, timedelta
+    from types import SimpleNamespace
+    from sqlalchemy import func, insert, select, text
+    from fastapi.testclient import TestClient
+    from shared.database.session import SessionLocal, create_tables, get_engine
+    from app.time.models.schedule import Schedule
+    from app.time.models.recurrence import ScheduleRecurrence
+    from app.time.crud.recurrence import occurrence_dates
+    from app.time.crud.rollup import rebuild_rollup
+    from app.time.main import app
+
+    variant, count, repeat = sys.argv[1], int(sys.argv[2]), int(sys.argv[3])
+    year_start, year_end = date(2026, 1, 1), date(2026, 12, 31)
+    rules = []
+    for i in range(count):
+        kind = i % 3
+        rules.append({
+            "activity": f"recurring {i}",
+            "hours": 0.25 + kind * 0.5,
+            "frequency": ("daily", "weekly", "monthly")[kind],
+            "weekdays": [0, 1, 2, 3, 4] if kind == 0 else None,
+            "start_date": (year_start + timedelta(days=i % 28)).isoformat(),
+            "until": year_end.isoformat(),
+        })
+
+    create_tables()
+    client = TestClient(app)
+    db = SessionLocal()
+    db.execute(insert(Schedule), [
+        {"activity": "one-off", "hours": 1.0, "date": year_start + timedelta(days=day)} for day in range(365)
+    ])
+    if variant == "rows":
+        rows = []
+        for rule in rules:
+            shape = SimpleNamespace(
+                frequency=rule["frequency"], interval=1, exceptions=[], until=year_end,
+                start_date=date.fromisoformat(rule["start_date"]),
+                weekday_mask=sum(1 << day for day in rule["weekdays"]) if rule["weekdays"] else None,
+            )
+            rows.extend(
+                {"activity": rule["activity"], "hours": rule["hours"], "date": day}
+                for day in occurrence_dates(shape, year_start, year_end)
+            )
+        for start in range(0, len(rows), 5000):
+            db.execute(insert(Schedule), rows[start:start + 5000])
+        db.commit()
+        rebuild_rollup(db)
+    else:
+        db.commit()
+        for rule in rules:
+            client.post("/schedules/recurrences", json=rule)
+    stored = db.scalar(select(func.count(Schedule.id))) + db.scalar(select(func.count(ScheduleRecurrence.id)))
+    db.close()
+    with get_engine().connect() as conn:
+        conn.exec_driver_sql("VACUUM")
+    size = os.path.getsize(get_engine().url.database)
+
+    def timed(path):
+        samples = []
+        for _ in range(repeat):
+            started = time.perf_counter()
+            response = client.get(path)
+            samples.append((time.perf_counter() - started) * 1000)
+        return statistics.median(samples), len(response.json())
+
+    month_ms, month_entries = timed("/schedules/range/2026-03-01/2026-03-31")
+    year_ms, year_entries = timed("/schedules/range/2026-01-01/2026-12-31")
+    day_ms, day_entries = timed("/schedules/date/2026-03-10")
+    print(json.dumps({
+        "rows_stored": stored, "db_bytes": size,
+        "month_ms_p50": month_ms, "year_ms_p50": year_ms, "day_ms_p50": day_ms,
+        "entries": {"month": month_entries, "year": year_entries, "day": day_entries},
+    }))
+""")
+
+VARIANTS = (
+    ("rows", {}),
+    ("rules", {"RECURRENCE_CACHE_ENABLED": "false"}),
+    ("rules_cached", {"RECURRENCE_CACHE_ENABLED": "true"}),
+)
+
+def main():
+    parser = argparse.ArgumentParser(prog="python -m benchmarks.recurrence")
+    parser.add_argument("--rules", type=int, default=50)
+    parser.add_argument("--repeat", type=int, default=50)
+    args = parser.parse_args()
+
+    results = {}
+    for name, extra_env in VARIANTS:
+        with tempfile.TemporaryDirectory() as tmp:
+            env = dict(os.environ, DATABASE_URL=f"sqlite:///{tmp}/recurrence.db", METRICS_ENABLED="false", **extra_env)
+            probe = subprocess.run(
+                [sys.executable, "-c", PROBE, name.split("_")[0], str(args.rules), str(args.repeat)],
+                env=env, capture_output=True, text=True, check=True,
+            )
+            results[name] = json.loads(probe.stdout.strip().splitlines()[-1])
+    print(json.dumps(results, indent=2))
+
+if __name__ == "__main__":
+    main()
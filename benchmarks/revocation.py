@@ -0,0 +1,102 @@
+""" Auth overhead per request with the token revocation check on and off.
+
+    python -m benchmarks.revocation [--revoked 100000] [--repeat 2000]
+
+Each variant gets a fresh SQLite file with --revoked families already in revoked_tokens,
+so the filter holds a realistic load. dependency_us times get_current_user_payload alone
+and me_ms times a whole GET /users/me with the user cache warm. queries_per_request
+counts statements sent to the database during the /me loop. login_ms (bcrypt) and
+refresh_ms compare how a client gets its next access token without and with refresh tokens.
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import textwrap
+
+PROBE = textwrap.dedent("""
+    import json, statistics, sys, time
+    from datetime import datetime, timedelta
+    from sqlalchemy import event, insert
+    from fastapi.security import HTTPAuthorizationCredentials
+    from fastapi.testclient import TestClient
+    from shared.database.session import SessionLocal, create_tables, get_engine
+    from app.user.models.token import RevokedToken
+    from app.user.auth.auth import get_current_user_payload
+    from app.user.main import app
+
+    revoked, repeat = int(sys.argv[1]), int(sys.argv[2])
+    create_tables()
+    db = SessionLocal()
+    expires = datetime.utcnow() + timedelta(days=7)
+    for start in range(0, revoked, 10000):
+        db.execute(insert(RevokedToken), [
+            {"token_id": f"family{i:026d}", "expires_at": expires} for i in range(start, min(revoked, start + 10000))
+        ])
+    db.commit()
+    db.close()
+
+    client = TestClient(app)
+    client.post("/users/register", json={"username": "bench", "email": "bench@example.com", "password": "secret"})
+    login_ms = []
+    for _ in range(5):
+        started = time.perf_counter()
+        tokens = client.post("/users/login", json={"username": "bench", "password": "secret"}).json()
+        login_ms.append((time.perf_counter() - started) * 1000)
+    refresh_ms = []
+    for _ in range(50):
+        started = time.perf_counter()
+        tokens = client.post("/users/token/refresh", json={"refresh_token": tokens["refresh_token"]}).json()
+        refresh_ms.append((time.perf_counter() - started) * 1000)
+    headers = {"Authorization": f"Bearer {tokens['access_token']}"}
+    assert client.get("/users/me", headers=headers).status_code == 200
+
+    credentials = HTTPAuthorizationCredentials(scheme="Bearer", credentials=tokens["access_token"])
+    samples = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        get_current_user_payload(credentials)
+        samples.append((time.perf_counter() - started) * 1e6)
+
+    statements = []
+    event.listen(get_engine(), "before_cursor_execute", lambda *args: statements.append(1))
+    me_ms = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        client.get("/users/me", headers=headers)
+        me_ms.append((time.perf_counter() - started) * 1000)
+    print(json.dumps({
+        "dependency_us_p50": statistics.median(samples),
+        "me_ms_p50": statistics.median(me_ms),
+        "queries_per_request": len(statements) / repeat,
+        "login_ms_p50": statistics.median(login_ms),
+        "refresh_ms_p50": statistics.median(refresh_ms),
+    }))
+""")
+
+VARIANTS = (
+    ("check_off", {"REVOCATION_CHECK_ENABLED": "false"}),
+    ("check_on", {"REVOCATION_CHECK_ENABLED": "true"}),
+)
+
+def main():
+    parser = argparse.ArgumentParser(prog="python -m benchmarks.revocation")
+    parser.add_argument("--revoked", type=int, default=100000)
+    parser.add_argument("--repeat", type=int, default=2000)
+    args = parser.parse_args()
+
+    results = {}
+    for name, extra_env in VARIANTS:
+        with tempfile.TemporaryDirectory() as tmp:
+            env = dict(os.environ, DATABASE_URL=f"sqlite:///{tmp}/revocation.db", METRICS_ENABLED="false", **extra_env)
+            probe = subprocess.run(
+                [sys.executable, "-c", PROBE, str(args.revoked), str(args.repeat)],
+                env=env, capture_output=True, text=True, check=True,
+            )
+            results[name] = json.loads(probe.stdout.strip().splitlines()[-1])
+    print(json.dumps(results, indent=2))
+
+if __name__ == "__main__":
+    main()
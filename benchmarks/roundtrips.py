@@ -0,0 +1,91 @@
+""" Database round trips and latency per write endpoint.
+
+    python -m benchmarks.roundtrips [--repeat 50] [--mode sync|async]
+
+Runs against a fresh SQLite file through the combined app. A round trip is one executed
+statement or one COMMIT; authentication and request parsing are identical for every
+endpoint, so the counts isolate what each CRUD function sends to the database.
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import textwrap
+
+PROBE = textwrap.dedent("""
+    import json, statistics, sys, time
+    from datetime import date
+    from sqlalchemy import event, insert
+    from sqlalchemy.engine import Engine
+    from fastapi.testclient import TestClient
+    from shared.database.session import create_tables, get_engine
+    from app.user.auth.auth import create_access_token
+    from app.user.models.user import User
+    from app.main import app
+
+    repeat = int(sys.argv[1])
+    create_tables()
+    with get_engine().begin() as conn:
+        conn.execute(insert(User), [
+            {"username": f"rt{i}", "email": f"rt{i}@example.com", "hashed_password": "x"}
+            for i in range(repeat + 1)
+        ])
+    headers = {"Authorization": f"Bearer {create_access_token({'sub': 'rt0'})}"}
+
+    counts = {"statements": 0, "commits": 0}
+    event.listen(Engine, "after_cursor_execute", lambda *args: counts.__setitem__("statements", counts["statements"] + 1))
+    event.listen(Engine, "commit", lambda conn: counts.__setitem__("commits", counts["commits"] + 1))
+
+    client = TestClient(app)
+    results = {}
+    def measure(name, call):
+        counts.update(statements=0, commits=0)
+        started = time.perf_counter()
+        response = call()
+        elapsed = (time.perf_counter() - started) * 1000
+        assert response.status_code == 200, (name, response.status_code, response.text)
+        entry = results.setdefault(name, {"round_trips": set(), "samples": []})
+        entry["round_trips"].add(counts["statements"] + counts["commits"])
+        entry["samples"].append(elapsed)
+        return response.json()
+
+    for i in range(1, repeat + 1):
+        todo = measure("POST /todos/", lambda: client.post("/todos/", json={"title": f"t{i}"}))
+        measure("PUT /todos/{todo_id}", lambda: client.put(f"/todos/{todo['id']}", json={"completed": True}))
+        measure("DELETE /todos/{todo_id}", lambda: client.delete(f"/todos/{todo['id']}"))
+        entry = measure("POST /schedules/", lambda: client.post(
+            "/schedules/", json={"activity": "work", "hours": 1.5, "date": str(date(2026, 1, 1 + i % 28))}))
+        measure("DELETE /schedules/{schedule_id}", lambda: client.delete(f"/schedules/{entry['id']}"))
+        measure("PUT /users/{user_id}/deactivate", lambda: client.put(f"/users/{i + 1}/deactivate", headers=headers))
+        measure("PUT /users/{user_id}/activate", lambda: client.put(f"/users/{i + 1}/activate", headers=headers))
+        measure("DELETE /users/{user_id}", lambda: client.delete(f"/users/{i + 1}", headers=headers))
+
+    print(json.dumps({
+        name: {"round_trips": sorted(entry["round_trips"]), "p50_ms": statistics.median(entry["samples"])}
+        for name, entry in results.items()
+    }))
+""")
+
+def main():
+    parser = argparse.ArgumentParser(prog="python -m benchmarks.roundtrips")
+    parser.add_argument("--repeat", type=int, default=50)
+    parser.add_argument("--mode", choices=["sync", "async"], default="sync")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        env = dict(
+            os.environ,
+            DATABASE_URL=f"sqlite:///{tmp}/roundtrips.db",
+            DATABASE_MODE=args.mode,
+            METRICS_ENABLED="false",
+        )
+        probe = subprocess.run(
+            [sys.executable, "-c", PROBE, str(args.repeat)],
+            env=env, capture_output=True, text=True, check=True,
+        )
+    print(json.dumps(json.loads(probe.stdout.strip().splitlines()[-1]), indent=2))
+
+if __name__ == "__main__":
+    main()
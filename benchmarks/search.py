@@ -0,0 +1,80 @@
+""" Todo search latency as one owner's todo count grows, against the paged-scan alternative.
+
+    python -m benchmarks.search [--counts 1000 10000 50000] [--repeat 50]
+
+Each count gets a fresh SQLite file. "search" is GET /todos/search for a term matching
+about 1% of rows; "scan" pages through GET /todos/?owner_id= the way clients did before.
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import textwrap
+
+WORDS = ("report", "invoice", "garden", "meeting", "groceries", "dentist", "taxes", "laundry", "email", "budget")
+
+PROBE = textwrap.dedent("""
+    import json, random, statistics, sys, time
+    from sqlalchemy import insert
+    from fastapi.testclient import TestClient
+    from shared.database.session import SessionLocal, create_tables
+    from app.todo.models.todo import Todo
+    from app.todo.main import app
+
+    count, repeat, words = int(sys.argv[1]), int(sys.argv[2]), sys.argv[3].split(",")
+    create_tables()
+    rng = random.Random(7)
+    db = SessionLocal()
+    rows = [
+        {"title": " ".join(rng.choice(words) for _ in range(3)) + (" passport" if i % 100 == 0 else ""),
+         "description": " ".join(rng.choice(words) for _ in range(8)), "owner_id": 1}
+        for i in range(count)
+    ]
+    for start in range(0, count, 5000):
+        db.execute(insert(Todo), rows[start:start + 5000])
+    db.commit()
+    db.close()
+
+    client = TestClient(app)
+    def timed(fn):
+        samples = []
+        for _ in range(repeat):
+            started = time.perf_counter()
+            fn()
+            samples.append((time.perf_counter() - started) * 1000)
+        return statistics.median(samples)
+
+    def scan():
+        skip = 0
+        while True:
+            page = client.get("/todos/", params={"owner_id": 1, "skip": skip, "limit": 100}).json()
+            if len(page) < 100:
+                return
+            skip += 100
+
+    search_ms = timed(lambda: client.get("/todos/search", params={"q": "passport", "owner_id": 1, "limit": 20}))
+    scan_ms = timed(scan) if count <= 10000 else None
+    print(json.dumps({"todos": count, "search_ms_p50": search_ms, "scan_ms_p50": scan_ms}))
+""")
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--counts", type=int, nargs="+", default=[1000, 10000, 50000])
+    parser.add_argument("--repeat", type=int, default=50)
+    args = parser.parse_args()
+
+    results = []
+    for count in args.counts:
+        with tempfile.TemporaryDirectory() as tmp:
+            env = dict(os.environ, DATABASE_URL=f"sqlite:///{tmp}/search.db")
+            probe = subprocess.run(
+                [sys.executable, "-c", PROBE, str(count), str(args.repeat), ",".join(WORDS)],
+                env=env, capture_output=True, text=True, check=True,
+            )
+            results.append(json.loads(probe.stdout.strip().splitlines()[-1]))
+    print(json.dumps(results, indent=2))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,102 @@
+""" Deterministic benchmark dataset: users, todos and schedules from a fixed RNG seed.
+
+    python -m benchmarks.seed [--users 50] [--todos 5000] [--schedules 5000] [--seed 42] [--reset]
+
+Writes to DATABASE_URL (SQLite or Postgres). The same counts and seed always produce
+the same rows, so results from different commits are comparable.
+"""
+import argparse
+import json
+import random
+from datetime import date, timedelta
+
+SEED_PASSWORD = "bench-password"
+SEED_START = date(2026, 1, 1)
+SEED_DAYS = 90
+SEED_ACTIVITIES = ("work", "study", "exercise", "reading", "meetings", "commute", "chores", "rest")
+SEED_CHUNK_SIZE = 5000
+
+def _chunks(rows: list):
+    for start in range(0, len(rows), SEED_CHUNK_SIZE):
+        yield rows[start:start + SEED_CHUNK_SIZE]
+
+def seed(users: int = 50, todos: int = 5000, schedules: int = 5000, rng_seed: int = 42, reset: bool = False) -> dict:
+    """ Create the schema and bulk-insert the dataset, returning the ids the load runner needs """
+    from sqlalchemy import func, insert, select
+    from shared.database.base import Base
+    from shared.database.session import SessionLocal, create_tables, get_engine, import_models
+    from app.user.auth.hashing import hash_password
+    from app.user.models.user import User
+    from app.todo.models.todo import Todo
+    from app.time.models.schedule import Schedule
+    from app.time.crud.rollup import rebuild_rollup
+
+    if reset:
+        import_models()
+        Base.metadata.drop_all(bind=get_engine())
+    create_tables()
+
+    rng = random.Random(rng_seed)
+    db = SessionLocal()
+    try:
+        if db.scalar(select(func.count(User.id))):
+            raise SystemExit("Database already holds users; pass --reset to rebuild the benchmark dataset")
+        # One bcrypt hash shared by every seeded user; hashing per row would dominate seeding
+        hashed = hash_password(SEED_PASSWORD)
+        if users:
+            db.execute(insert(User), [
+                {"username": f"bench{i}", "email": f"bench{i}@example.com", "hashed_password": hashed}
+                for i in range(users)
+            ])
+        user_ids = list(db.scalars(select(User.id).order_by(User.id)))
+
+        todo_rows = [
+            {
+                "title": f"Todo {i}",
+                "description": None if i % 4 == 0 else "x" * rng.randrange(10, 120),
+                "completed": rng.random() < 0.3,
+                "owner_id": rng.choice(user_ids) if user_ids else None,
+            }
+            for i in range(todos)
+        ]
+        for chunk in _chunks(todo_rows):
+            db.execute(insert(Todo), chunk)
+
+        schedule_rows = [
+            {
+                "activity": rng.choice(SEED_ACTIVITIES),
+                "hours": round(rng.uniform(0.25, 4.0), 2),
+                "date": SEED_START + timedelta(days=rng.randrange(SEED_DAYS)),
+                "planned": rng.random() < 0.7,
+                "owner_id": rng.choice(user_ids) if user_ids else None,
+            }
+            for _ in range(schedules)
+        ]
+        for chunk in _chunks(schedule_rows):
+            db.execute(insert(Schedule), chunk)
+        db.commit()
+        rebuild_rollup(db)
+
+        return {
+            "users": [
+                {"id": user_id, "username": f"bench{i}"} for i, user_id in enumerate(user_ids)
+            ],
+            "todo_ids": list(db.scalars(select(Todo.id).order_by(Todo.id))),
+            "schedule_ids": list(db.scalars(select(Schedule.id).order_by(Schedule.id))),
+        }
+    finally:
+        db.close()
+
+def main():
+    parser = argparse.ArgumentParser(prog="python -m benchmarks.seed")
+    parser.add_argument("--users", type=int, default=50)
+    parser.add_argument("--todos", type=int, default=5000)
+    parser.add_argument("--schedules", type=int, default=5000)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--reset", action="store_true", help="drop and recreate every table first")
+    args = parser.parse_args()
+    dataset = seed(args.users, args.todos, args.schedules, args.seed, args.reset)
+    print(json.dumps({key: len(value) for key, value in dataset.items()}))
+
+if __name__ == "__main__":
+    main()
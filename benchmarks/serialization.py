@@ -0,0 +1,61 @@
+""" Throughput of GET /todos/ with the default response_model path versus FAST_SERIALIZATION.
+
+    python -m benchmarks.serialization [--rows 10 100 500] [--iterations 200]
+
+Both paths run in one process against the same SQLite data, and their bodies are
+compared byte for byte before timing.
+"""
+import argparse
+import json
+import os
+import tempfile
+import time
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--rows", type=int, nargs="+", default=[10, 100, 500])
+    parser.add_argument("--iterations", type=int, default=200)
+    args = parser.parse_args()
+
+    tmp = tempfile.mkdtemp()
+    os.environ["DATABASE_URL"] = f"sqlite:///{tmp}/serialization.db"
+    from sqlalchemy import insert
+    from fastapi.testclient import TestClient
+    from shared.database.session import SessionLocal, create_tables
+    from app.todo.main import app
+    from app.todo.models.todo import Todo
+    from app.todo.routes import todos as todo_routes
+
+    create_tables()
+    db = SessionLocal()
+    db.execute(insert(Todo), [
+        {"title": f"todo {i}", "description": "x" * (i % 40) or None, "completed": i % 3 == 0}
+        for i in range(max(args.rows))
+    ])
+    db.commit()
+    db.close()
+
+    client = TestClient(app)
+    results = []
+    for rows in args.rows:
+        path = f"/todos/?limit={rows}"
+        timings = {}
+        bodies = {}
+        for fast in (False, True):
+            todo_routes.FAST_SERIALIZATION = fast
+            bodies[fast] = client.get(path).content
+            started = time.perf_counter()
+            for _ in range(args.iterations):
+                client.get(path)
+            timings[fast] = time.perf_counter() - started
+        results.append({
+            "rows": rows,
+            "identical": bodies[False] == bodies[True],
+            "default_rows_per_second": rows * args.iterations / timings[False],
+            "fast_rows_per_second": rows * args.iterations / timings[True],
+            "speedup": timings[False] / timings[True],
+        })
+    print(json.dumps(results, indent=2))
+
+if __name__ == "__main__":
+    main()
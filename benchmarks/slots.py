@@ -0,0 +1,111 @@
+""" Free-time and double-booking queries over a month as entries per day grow.
+
+    python -m benchmarks.slots [--per-day 10 100 1000] [--repeat 20]
+
+Each density gets a fresh SQLite file with one month of timed schedules. "free_endpoint"
+is GET /schedules/free; "range_fetch" is what a client computing free time itself has to
+download first. "sweep" and "pairwise" count double-bookings over the same per-day
+intervals with overlapping_pairs and with an all-pairs comparison.
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import textwrap
+
+PROBE = textwrap.dedent("""
+    import json, random, statistics, sys, time as clock
+    from datetime import date, time, timedelta
+    from sqlalchemy import insert
+    from fastapi.testclient import TestClient
+    from shared.database.session import SessionLocal, create_tables
+    from app.time.models.schedule import Schedule
+    from app.time.crud.slots import overlapping_pairs, seconds, timed_entries
+    from app.time.main import app
+
+    per_day, repeat = int(sys.argv[1]), int(sys.argv[2])
+    first = date(2026, 3, 1)
+    create_tables()
+    rng = random.Random(11)
+    rows = []
+    for offset in range(31):
+        for _ in range(per_day):
+            start = rng.randrange(6 * 60, 21 * 60)
+            length = rng.choice((15, 30, 45, 60, 90))
+            rows.append({
+                "activity": "meeting", "hours": length / 60, "date": first + timedelta(days=offset),
+                "start_time": time(start // 60, start % 60),
+                "end_time": time(min(start + length, 23 * 60 + 59) // 60, min(start + length, 23 * 60 + 59) % 60),
+            })
+    db = SessionLocal()
+    for start in range(0, len(rows), 5000):
+        db.execute(insert(Schedule), rows[start:start + 5000])
+    db.commit()
+    db.close()
+
+    client = TestClient(app)
+    month = {"start_date": "2026-03-01", "end_date": "2026-03-31"}
+    def timed(fn):
+        samples = []
+        for _ in range(repeat):
+            started = clock.perf_counter()
+            result = fn()
+            samples.append((clock.perf_counter() - started) * 1000)
+        return statistics.median(samples), result
+
+    def day_intervals():
+        db = SessionLocal()
+        try:
+            return [
+                [(seconds(entry.start_time), seconds(entry.end_time), entry.id) for entry in entries]
+                for entries in timed_entries(db, first, first + timedelta(days=30)).values()
+            ]
+        finally:
+            db.close()
+
+    def sweep(days):
+        return sum(1 for intervals in days for _ in overlapping_pairs(intervals))
+
+    def pairwise(days):
+        pairs = 0
+        for intervals in days:
+            for i, (a_start, a_end, _) in enumerate(intervals):
+                for b_start, b_end, _ in intervals[i + 1:]:
+                    if a_start < b_end and b_start < a_end:
+                        pairs += 1
+        return pairs
+
+    free_ms, free = timed(lambda: client.get("/schedules/free", params={**month, "day_start": "09:00", "day_end": "17:00"}).json())
+    fetch_ms, _ = timed(lambda: client.get("/schedules/range/2026-03-01/2026-03-31").json())
+    days = day_intervals()
+    sweep_ms, swept = timed(lambda: sweep(days))
+    pairwise_ms, pairs = timed(lambda: pairwise(days))
+    assert swept == pairs, (swept, pairs)
+    print(json.dumps({
+        "entries": len(rows), "per_day": per_day, "free_slots": len(free), "conflict_pairs": pairs,
+        "free_endpoint_ms_p50": free_ms, "range_fetch_ms_p50": fetch_ms,
+        "sweep_ms_p50": sweep_ms, "pairwise_ms_p50": pairwise_ms,
+    }))
+""")
+
+def main():
+    parser = argparse.ArgumentParser(prog="python -m benchmarks.slots")
+    parser.add_argument("--per-day", type=int, nargs="+", default=[10, 100, 1000])
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+
+    results = []
+    for per_day in args.per_day:
+        with tempfile.TemporaryDirectory() as tmp:
+            env = dict(os.environ, DATABASE_URL=f"sqlite:///{tmp}/slots.db", METRICS_ENABLED="false")
+            probe = subprocess.run(
+                [sys.executable, "-c", PROBE, str(per_day), str(args.repeat)],
+                env=env, capture_output=True, text=True, check=True,
+            )
+            results.append(json.loads(probe.stdout.strip().splitlines()[-1]))
+    print(json.dumps(results, indent=2))
+
+if __name__ == "__main__":
+    main()
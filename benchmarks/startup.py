@@ -0,0 +1,74 @@
+""" Cold-start cost per service: module import time and first-request latency.
+
+    python -m benchmarks.startup [--repeat 5] [--database-url sqlite:///...]
+
+Every sample runs in a fresh interpreter, mirroring a new worker under autoscaling.
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+
+SERVICES = {
+    "user": ("app.user.main", "/health"),
+    "todo": ("app.todo.main", "/todos/?limit=1"),
+    "time": ("app.time.main", "/schedules/date/2026-01-01"),
+}
+
+def sample(module: str, path: str) -> dict:
+    """ Executed in the child: time the import and the first request """
+    import importlib
+    import time
+
+    started = time.perf_counter()
+    app = importlib.import_module(module).app
+    imported = time.perf_counter()
+
+    from fastapi.testclient import TestClient
+
+    client = TestClient(app)
+    before = time.perf_counter()
+    status = client.get(path).status_code
+    return {
+        "import_seconds": imported - started,
+        "first_request_seconds": time.perf_counter() - before,
+        "status": status,
+    }
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--database-url", default=None)
+    parser.add_argument("--child", nargs=2, metavar=("MODULE", "PATH"), help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        print(json.dumps(sample(*args.child)))
+        return
+
+    with tempfile.TemporaryDirectory() as tmp:
+        env = dict(os.environ)
+        env["DATABASE_URL"] = args.database_url or f"sqlite:///{tmp}/startup.db"
+        subprocess.run([sys.executable, "-m", "shared.database.manage", "init-schema"], env=env, check=True, capture_output=True)
+
+        report = {}
+        for service, (module, path) in SERVICES.items():
+            runs = []
+            for _ in range(args.repeat):
+                out = subprocess.run(
+                    [sys.executable, "-m", "benchmarks.startup", "--child", module, path],
+                    env=env, check=True, capture_output=True, text=True,
+                ).stdout.strip().splitlines()[-1]
+                runs.append(json.loads(out))
+            report[service] = {
+                "import_seconds_median": statistics.median(run["import_seconds"] for run in runs),
+                "first_request_seconds_median": statistics.median(run["first_request_seconds"] for run in runs),
+                "statuses": sorted({run["status"] for run in runs}),
+            }
+    print(json.dumps(report, indent=2))
+
+if __name__ == "__main__":
+    main()
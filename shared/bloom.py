@@ -0,0 +1,48 @@
+import hashlib
+import math
+
+class BloomFilter:
+    """ Fixed-size Bloom filter over strings: never a false negative, and false positives at
+    about error_rate while it holds at most capacity items. Membership costs k bit probes
+    whatever the number of items. """
+
+    def __init__(self, capacity: int, error_rate: float = 0.001):
+        self.capacity = max(1, capacity)
+        self.error_rate = error_rate
+        # Optimal m = -n ln p / (ln 2)^2 bits and k = m / n ln 2 probes
+        self.size = max(8, math.ceil(-self.capacity * math.log(error_rate) / math.log(2) ** 2))
+        self.hashes = max(1, round(self.size / self.capacity * math.log(2)))
+        self.count = 0
+        self._bits = bytearray((self.size + 7) // 8)
+
+    def _positions(self, item: str):
+        # Double hashing: k positions from the two halves of one 128-bit digest
+        digest = hashlib.blake2b(item.encode("utf-8"), digest_size=16).digest()
+        first = int.from_bytes(digest[:8], "little")
+        step = int.from_bytes(digest[8:], "little") | 1
+        return [(first + i * step) % self.size for i in range(self.hashes)]
+
+    def add(self, item: str):
+        """ Not safe against concurrent adds; callers serialize writers """
+        added = False
+        for position in self._positions(item):
+            mask = 1 << (position & 7)
+            if not self._bits[position >> 3] & mask:
+                self._bits[position >> 3] |= mask
+                added = True
+        if added:
+            self.count += 1
+
+    def __contains__(self, item: str) -> bool:
+        bits = self._bits
+        return all(bits[position >> 3] & (1 << (position & 7)) for position in self._positions(item))
+
+    def stats(self) -> dict:
+        return {
+            "capacity": self.capacity,
+            "count": self.count,
+            "bits": self.size,
+            "bytes": len(self._bits),
+            "hashes": self.hashes,
+            "error_rate": self.error_rate,
+        }
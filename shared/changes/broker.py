@@ -0,0 +1,169 @@
+""" Change feed brokers: fan committed create/update/delete events out to stream subscribers.
+
+A Broker keeps one bounded asyncio.Queue per subscriber and always delivers on the event
+loop, so CRUD code may publish from threadpool workers. A subscriber that falls
+CHANGE_QUEUE_SIZE events behind is closed rather than allowed to grow without bound;
+its client reconnects with Last-Event-ID and catches up from the broker's log.
+"""
+import asyncio
+import os
+from abc import ABC, abstractmethod
+import threading
+import time
+from collections import deque
+from typing import Deque, Iterable, List, NamedTuple, Optional, Sequence, Set
+
+from dotenv import load_dotenv
+
+load_dotenv()
+
+# Events buffered per subscriber before it is disconnected
+CHANGE_QUEUE_SIZE = int(os.getenv("CHANGE_QUEUE_SIZE", "1000"))
+# Events the in-process broker keeps for Last-Event-ID resume
+CHANGE_LOG_SIZE = int(os.getenv("CHANGE_LOG_SIZE", "10000"))
+
+class Change(NamedTuple):
+    """ One committed change; data is the JSON-encoded payload """
+    id: int
+    topic: str
+    action: str
+    entity_id: Optional[int]
+    data: str
+
+class ChangeDraft(NamedTuple):
+    """ A change recorded inside a transaction, published once it commits """
+    topic: str
+    action: str
+    entity_id: Optional[int]
+    data: str
+
+class Subscription:
+    """ One stream's view of the feed; closed when its queue overflows """
+
+    def __init__(self, topics: Optional[Set[str]]):
+        self.topics = topics
+        self.queue: asyncio.Queue = asyncio.Queue(maxsize=CHANGE_QUEUE_SIZE)
+        self.overflowed = False
+
+    def wants(self, change: Change) -> bool:
+        return self.topics is None or change.topic in self.topics
+
+class Broker(ABC):
+    """ Base broker: local fan-out only. Subclasses decide how ids are assigned, how other
+    workers learn about changes and what backlog(last_event_id) can replay. """
+
+    def __init__(self):
+        self._subscribers: Set[Subscription] = set()
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._lock = threading.Lock()
+        self.published = 0
+        self.overflows = 0
+
+    # -- transaction hooks (called from Session events) ----------------------------------
+
+    def stage(self, session, drafts: Sequence[ChangeDraft]):
+        """ Called before the writing transaction commits, on its connection """
+
+    @abstractmethod
+    def committed(self, drafts: Sequence[ChangeDraft]):
+        """ Called after the writing transaction committed """
+
+    @abstractmethod
+    def backlog(self, last_event_id: int) -> Optional[List[Change]]:
+        """ Changes after last_event_id, or None when they are no longer available """
+
+    # -- subscribers ---------------------------------------------------------------------
+
+    def subscribe(self, topics: Optional[Iterable[str]] = None) -> Subscription:
+        """ Register a subscriber; must be called on the event loop that will read from it """
+        self._loop = asyncio.get_running_loop()
+        self.start()
+        subscription = Subscription(set(topics) if topics else None)
+        with self._lock:
+            self._subscribers.add(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription: Subscription):
+        with self._lock:
+            self._subscribers.discard(subscription)
+
+    def fan_out(self, changes: Sequence[Change]):
+        """ Thread-safe: hand changes to every local subscriber on the event loop """
+        self.published += len(changes)
+        loop = self._loop
+        if not changes or loop is None or not self._subscribers or loop.is_closed():
+            return
+        try:
+            running = asyncio.get_running_loop()
+        except RuntimeError:
+            running = None
+        if running is loop:
+            self._deliver(changes)
+        else:
+            loop.call_soon_threadsafe(self._deliver, changes)
+
+    def _deliver(self, changes: Sequence[Change]):
+        with self._lock:
+            subscribers = list(self._subscribers)
+        for subscription in subscribers:
+            if subscription.overflowed:
+                continue
+            for change in changes:
+                if not subscription.wants(change):
+                    continue
+                try:
+                    subscription.queue.put_nowait(change)
+                except asyncio.QueueFull:
+                    subscription.overflowed = True
+                    self.overflows += 1
+                    break
+
+    def start(self):
+        """ Start background work (e.g. tailing a shared log); called on every subscribe """
+
+    def stats(self) -> dict:
+        with self._lock:
+            subscribers = len(self._subscribers)
+        return {
+            "broker": type(self).__name__,
+            "subscribers": subscribers,
+            "published": self.published,
+            "overflows": self.overflows,
+        }
+
+class InProcessBroker(Broker):
+    """ Single-process broker: ids come from a local counter and the resume log is a ring
+    buffer of the last CHANGE_LOG_SIZE changes. Workers do not see each other's changes. """
+
+    def __init__(self, log_size: int = CHANGE_LOG_SIZE):
+        super().__init__()
+        # Ids start at the current time in milliseconds, so they keep growing across
+        # restarts and a stale Last-Event-ID is recognised as older than the log
+        self._next_id = int(time.time() * 1000)
+        self._log: Deque[Change] = deque(maxlen=log_size)
+        self._log_lock = threading.Lock()
+
+    def committed(self, drafts: Sequence[ChangeDraft]):
+        with self._log_lock:
+            changes = []
+            for draft in drafts:
+                self._next_id += 1
+                changes.append(Change(self._next_id, *draft))
+            self._log.extend(changes)
+        self.fan_out(changes)
+
+    def backlog(self, last_event_id: int) -> Optional[List[Change]]:
+        with self._log_lock:
+            if not self._log:
+                return [] if last_event_id >= self._next_id else None
+            # The change right after last_event_id must still be in the log
+            if last_event_id < self._log[0].id - 1 or last_event_id > self._log[-1].id:
+                return None
+            return [change for change in self._log if change.id > last_event_id]
+
+    def stats(self) -> dict:
+        stats = super().stats()
+        with self._log_lock:
+            stats["log_size"] = len(self._log)
+            stats["last_event_id"] = self._log[-1].id if self._log else None
+        return stats
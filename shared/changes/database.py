@@ -0,0 +1,183 @@
+""" Change feed shared by every worker through a change_log table.
+
+Each writing transaction inserts its changes into change_log before it commits, so the
+log holds exactly the committed writes and their ids are global. Every process tails the
+table from a background thread and fans new rows out to its own subscribers; Last-Event-ID
+resume reads straight from the table. On PostgreSQL the writer also issues pg_notify and the
+tailer LISTENs, so other workers wake immediately instead of on the next poll.
+
+Concurrent PostgreSQL transactions can commit out of id order. Ids skipped by a poll are
+re-checked for CHANGE_GAP_SECONDS, so a late commit is still delivered (possibly after
+higher ids); delivery is at-least-once and clients should treat events as idempotent.
+"""
+import logging
+import os
+import select as selector
+import threading
+import time
+from typing import Dict, List, Optional, Sequence
+
+from dotenv import load_dotenv
+from sqlalchemy import Column, DateTime, Integer, String, Text, delete, func, insert, or_, select
+from sqlalchemy.orm import Session
+
+from shared.changes.broker import CHANGE_LOG_SIZE, Broker, Change, ChangeDraft
+from shared.database.base import Base
+
+load_dotenv()
+
+logger = logging.getLogger(__name__)
+
+# Seconds between polls when nothing wakes the tailer earlier
+CHANGE_POLL_SECONDS = float(os.getenv("CHANGE_POLL_SECONDS", "0.5"))
+# Rows read per poll
+CHANGE_POLL_BATCH = int(os.getenv("CHANGE_POLL_BATCH", "1000"))
+# How long an id skipped by a poll may still show up from a slow transaction
+CHANGE_GAP_SECONDS = float(os.getenv("CHANGE_GAP_SECONDS", "5"))
+CHANGE_NOTIFY_CHANNEL = os.getenv("CHANGE_NOTIFY_CHANNEL", "dayflow_changes")
+
+class ChangeLogEntry(Base):
+    """ Committed change, kept for the last CHANGE_LOG_SIZE ids """
+    __tablename__ = "change_log"
+    # Ids are event ids: never reuse them
+    __table_args__ = {"sqlite_autoincrement": True}
+
+    id = Column(Integer, primary_key=True)
+    topic = Column(String(32), nullable=False)
+    action = Column(String(32), nullable=False)
+    entity_id = Column(Integer, nullable=True)
+    data = Column(Text, nullable=False)
+    created_at = Column(DateTime, server_default=func.now())
+
+_COLUMNS = (ChangeLogEntry.id, ChangeLogEntry.topic, ChangeLogEntry.action, ChangeLogEntry.entity_id, ChangeLogEntry.data)
+
+class DatabaseBroker(Broker):
+    """ Broker for multi-worker deployments, backed by the change_log table """
+
+    def __init__(self, engine=None, log_size: int = CHANGE_LOG_SIZE):
+        super().__init__()
+        self._engine = engine
+        self.log_size = log_size
+        self._wake = threading.Event()
+        self._stopped = threading.Event()
+        self._started = False
+        self._start_lock = threading.Lock()
+        self._last_seen = 0
+        self._gaps: Dict[int, float] = {}
+        self._pruned_below = 0
+        self.polls = 0
+
+    @property
+    def engine(self):
+        if self._engine is None:
+            from shared.database.session import get_engine
+            self._engine = get_engine()
+        return self._engine
+
+    def stage(self, session: Session, drafts: Sequence[ChangeDraft]):
+        session.execute(insert(ChangeLogEntry), [draft._asdict() for draft in drafts])
+        if session.get_bind().dialect.name == "postgresql":
+            # Delivered to listeners only if and when this transaction commits
+            session.execute(select(func.pg_notify(CHANGE_NOTIFY_CHANNEL, "")))
+
+    def committed(self, drafts: Sequence[ChangeDraft]):
+        # The rows are already in change_log; the local tailer just picks them up now
+        self._wake.set()
+
+    def backlog(self, last_event_id: int) -> Optional[List[Change]]:
+        with self.engine.connect() as conn:
+            lowest, highest = conn.execute(select(func.min(ChangeLogEntry.id), func.max(ChangeLogEntry.id))).one()
+            if highest is None or last_event_id > highest:
+                return None
+            # Anything between last_event_id and the oldest kept row may have been pruned
+            if last_event_id < lowest - 1:
+                return None
+            rows = conn.execute(select(*_COLUMNS).where(ChangeLogEntry.id > last_event_id).order_by(ChangeLogEntry.id))
+            return [Change(*row) for row in rows]
+
+    # -- tailing -------------------------------------------------------------------------
+
+    def start(self):
+        if self._started:
+            return
+        with self._start_lock:
+            if self._started:
+                return
+            with self.engine.connect() as conn:
+                self._last_seen = conn.scalar(select(func.coalesce(func.max(ChangeLogEntry.id), 0)))
+            threading.Thread(target=self._tail, name="change-log-tail", daemon=True).start()
+            if self.engine.dialect.name == "postgresql":
+                threading.Thread(target=self._listen, name="change-log-listen", daemon=True).start()
+            self._started = True
+
+    def stop(self):
+        self._stopped.set()
+        self._wake.set()
+
+    def _tail(self):
+        while not self._stopped.is_set():
+            self._wake.wait(CHANGE_POLL_SECONDS)
+            self._wake.clear()
+            try:
+                if self.poll() >= CHANGE_POLL_BATCH:
+                    self._wake.set()
+            except Exception:
+                logger.exception("Polling change_log failed")
+                self._stopped.wait(CHANGE_POLL_SECONDS)
+
+    def poll(self) -> int:
+        """ Fan out rows committed since the last poll (and late rows filling earlier gaps) """
+        self.polls += 1
+        now = time.monotonic()
+        self._gaps = {change_id: deadline for change_id, deadline in self._gaps.items() if deadline > now}
+        condition = ChangeLogEntry.id > self._last_seen
+        if self._gaps:
+            condition = or_(condition, ChangeLogEntry.id.in_(list(self._gaps)))
+        with self.engine.connect() as conn:
+            rows = conn.execute(select(*_COLUMNS).where(condition).order_by(ChangeLogEntry.id).limit(CHANGE_POLL_BATCH)).all()
+        changes = [Change(*row) for row in rows]
+        for change in changes:
+            if change.id > self._last_seen:
+                if change.id - self._last_seen <= CHANGE_POLL_BATCH:
+                    self._gaps.update((missing, now + CHANGE_GAP_SECONDS) for missing in range(self._last_seen + 1, change.id))
+                self._last_seen = change.id
+            else:
+                self._gaps.pop(change.id, None)
+        self.fan_out(changes)
+        if self._last_seen - self._pruned_below > self.log_size + self.log_size // 10:
+            self.prune()
+        return len(changes)
+
+    def prune(self):
+        """ Drop rows older than the last log_size ids; every worker may do this, it is idempotent """
+        below = self._last_seen - self.log_size
+        with self.engine.begin() as conn:
+            conn.execute(delete(ChangeLogEntry).where(ChangeLogEntry.id <= below))
+        self._pruned_below = below
+
+    def _listen(self):
+        """ Wake the tailer on NOTIFY; needs a driver exposing psycopg2's poll()/notifies API """
+        raw = self.engine.raw_connection()
+        try:
+            connection = raw.driver_connection
+            if not hasattr(connection, "poll"):
+                logger.warning("Driver cannot LISTEN; change_log is polled every %ss", CHANGE_POLL_SECONDS)
+                return
+            connection.autocommit = True
+            with connection.cursor() as cursor:
+                cursor.execute(f"LISTEN {CHANGE_NOTIFY_CHANNEL}")
+            while not self._stopped.is_set():
+                if selector.select([connection], [], [], CHANGE_POLL_SECONDS)[0]:
+                    connection.poll()
+                    if connection.notifies:
+                        connection.notifies.clear()
+                        self._wake.set()
+        except Exception:
+            logger.exception("LISTEN on %s failed; falling back to polling", CHANGE_NOTIFY_CHANNEL)
+        finally:
+            raw.invalidate()
+
+    def stats(self) -> dict:
+        stats = super().stats()
+        stats.update(last_event_id=self._last_seen or None, polls=self.polls, pending_gaps=len(self._gaps))
+        return stats
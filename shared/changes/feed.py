@@ -0,0 +1,79 @@
+""" Recording CRUD changes and handing them to the configured broker once they commit.
+
+CRUD functions call record_change() inside their transaction; the change waits in
+session.info until the session commits (and is dropped on rollback), so subscribers never
+see a write that did not land. Session events are registered on the Session class and
+therefore cover sync sessions and the sync side of AsyncSession alike.
+"""
+import importlib
+import os
+import threading
+from typing import Any, Optional
+
+from dotenv import load_dotenv
+from pydantic_core import to_json
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+
+from shared.changes.broker import Broker, ChangeDraft, InProcessBroker
+
+load_dotenv()
+
+CHANGES_ENABLED = os.getenv("CHANGES_ENABLED", "true").lower() in ("1", "true", "yes")
+# "memory" (one process), "database" (change_log table shared by every worker)
+# or "package.module:Class" for any other Broker subclass
+CHANGE_BROKER = os.getenv("CHANGE_BROKER", "memory")
+
+TOPICS = ("todos", "schedules", "recurrences")
+
+_PENDING = "pending_changes"
+
+_broker: Optional[Broker] = None
+_broker_lock = threading.Lock()
+
+def _build_broker(name: str) -> Broker:
+    if name == "memory":
+        return InProcessBroker()
+    if name == "database":
+        from shared.changes.database import DatabaseBroker
+        return DatabaseBroker()
+    module, _, attr = name.partition(":")
+    if not attr:
+        raise ValueError(f"Unknown CHANGE_BROKER '{name}'")
+    broker_class = getattr(importlib.import_module(module), attr)
+    if not (isinstance(broker_class, type) and issubclass(broker_class, Broker)):
+        raise TypeError(f"CHANGE_BROKER '{name}' is not a Broker subclass")
+    return broker_class()
+
+def get_broker() -> Broker:
+    """ The process-wide broker, built on first use from CHANGE_BROKER """
+    global _broker
+    if _broker is None:
+        with _broker_lock:
+            if _broker is None:
+                _broker = _build_broker(CHANGE_BROKER)
+    return _broker
+
+def record_change(db: Session, topic: str, action: str, entity_id: Optional[int] = None, data: Any = None):
+    """ Queue a change for publication when db's transaction commits. data is encoded to
+    JSON right away, so later edits to the objects it came from do not leak into it. """
+    if not CHANGES_ENABLED:
+        return
+    payload = to_json(data if data is not None else {"id": entity_id}).decode()
+    db.info.setdefault(_PENDING, []).append(ChangeDraft(topic, action, entity_id, payload))
+
+@event.listens_for(Session, "before_commit")
+def _stage_changes(session: Session):
+    drafts = session.info.get(_PENDING)
+    if drafts:
+        get_broker().stage(session, drafts)
+
+@event.listens_for(Session, "after_commit")
+def _publish_changes(session: Session):
+    drafts = session.info.pop(_PENDING, None)
+    if drafts:
+        get_broker().committed(drafts)
+
+@event.listens_for(Session, "after_rollback")
+def _discard_changes(session: Session):
+    session.info.pop(_PENDING, None)
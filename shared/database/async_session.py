@@ -0,0 +1,68 @@
+import os
+from typing import Optional
+
+from fastapi import Request, Response
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import AsyncEngine, async_sessionmaker, create_async_engine
+from dotenv import load_dotenv
+
+from shared.database.pool import instrument_engine, pool_options
+from shared.database.replicas import DATABASE_REPLICA_URLS, ReplicaSet, reads_from_replica, register_replicas
+
+load_dotenv()
+
+# Async drivers used when ASYNC_DATABASE_URL is not given explicitly
+ASYNC_DRIVERS = {
+    "sqlite": "sqlite+aiosqlite",
+    "postgresql": "postgresql+asyncpg",
+    "mysql": "mysql+aiomysql",
+}
+
+def to_async_url(url: str) -> str:
+    """ Map a sync DATABASE_URL onto the matching async driver """
+    parsed = make_url(url)
+    backend = parsed.get_backend_name()
+    if backend not in ASYNC_DRIVERS:
+        raise ValueError(f"No async driver configured for '{backend}'")
+    return parsed.set(drivername=ASYNC_DRIVERS[backend]).render_as_string(hide_password=False)
+
+ASYNC_DATABASE_URL = os.getenv("ASYNC_DATABASE_URL") or to_async_url(os.getenv("DATABASE_URL"))
+
+_async_engine: Optional[AsyncEngine] = None
+
+def get_async_engine() -> AsyncEngine:
+    """ Build the async primary engine on first use rather than at import time """
+    global _async_engine
+    if _async_engine is None:
+        _async_engine = create_async_engine(ASYNC_DATABASE_URL, **pool_options())
+        instrument_engine("async", _async_engine.sync_engine)
+    return _async_engine
+
+# Unbound: sessions are opened with bind= the primary (get_async_engine()) or a replica
+AsyncSessionLocal = async_sessionmaker(autoflush=False, expire_on_commit=False)
+
+def __getattr__(name: str):
+    # Keep `from shared.database.async_session import async_engine` working without eager construction
+    if name == "async_engine":
+        return get_async_engine()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+async def get_async_db():
+    async with AsyncSessionLocal(bind=get_async_engine()) as db:
+        yield db
+
+async_replicas = register_replicas(
+    "async", ReplicaSet([to_async_url(url) for url in DATABASE_REPLICA_URLS], create_async_engine, prefix="async_replica")
+)
+
+async def read_bind(request: Request, response: Optional[Response] = None) -> Optional[AsyncEngine]:
+    """ Replica engine for this request, or None for the primary (writes, pinned callers, no healthy replica) """
+    if async_replicas and reads_from_replica(request, response):
+        return await async_replicas.areader()
+    return None
+
+async def get_routed_async_db(request: Request, response: Response):
+    """ get_async_db variant that sends safe requests to a replica and everything else to the primary """
+    bind = await read_bind(request, response)
+    async with AsyncSessionLocal(bind=bind or get_async_engine()) as db:
+        yield db
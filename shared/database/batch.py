@@ -0,0 +1,47 @@
+import os
+from typing import Iterator, Sequence, TypeVar
+
+from dotenv import load_dotenv
+from sqlalchemy import insert
+from sqlalchemy.orm import Session
+
+load_dotenv()
+
+# Largest number of operations a single batch request may carry
+BATCH_MAX_SIZE = int(os.getenv("BATCH_MAX_SIZE", "1000"))
+# Rows sent per bulk statement inside a batch transaction
+BATCH_CHUNK_SIZE = int(os.getenv("BATCH_CHUNK_SIZE", "200"))
+# Largest page a list or search endpoint returns
+PAGE_MAX_SIZE = int(os.getenv("PAGE_MAX_SIZE", "1000"))
+
+T = TypeVar("T")
+
+def chunked(items: Sequence[T], size: int = BATCH_CHUNK_SIZE) -> Iterator[Sequence[T]]:
+    """ Yield consecutive slices of at most `size` items """
+    for start in range(0, len(items), size):
+        yield items[start:start + size]
+
+def supports_returning(db: Session) -> bool:
+    """ Whether the bound dialect supports UPDATE ... RETURNING and DELETE ... RETURNING """
+    dialect = db.get_bind().dialect
+    return dialect.update_returning and dialect.delete_returning
+
+def supports_insert_returning(db: Session) -> bool:
+    """ Whether a single-row INSERT can return its generated columns """
+    return db.get_bind().dialect.insert_returning
+
+def supports_bulk_insert_returning(db: Session) -> bool:
+    """ Whether an executemany INSERT can return generated keys in parameter order """
+    return db.get_bind().dialect.insert_executemany_returning_sort_by_parameter_order
+
+def bulk_insert(db: Session, model, rows: list[dict]) -> list[int]:
+    """ Insert rows with one executemany statement and return their ids in input order """
+    if not rows:
+        return []
+    if supports_bulk_insert_returning(db):
+        stmt = insert(model).returning(model.id, sort_by_parameter_order=True)
+        return list(db.scalars(stmt, rows))
+    objects = [model(**row) for row in rows]
+    db.add_all(objects)
+    db.flush()
+    return [obj.id for obj in objects]
@@ -0,0 +1,22 @@
+""" Schema management, kept out of the service import path.
+
+    python -m shared.database.manage init-schema [--include-replicas]
+"""
+import argparse
+import sys
+
+from shared.database.session import create_tables
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(prog="python -m shared.database.manage")
+    parser.add_argument("command", choices=["init-schema"])
+    parser.add_argument("--include-replicas", action="store_true",
+                        help="also create the schema on DATABASE_REPLICA_URLS (local stand-in replicas only)")
+    args = parser.parse_args(argv)
+
+    create_tables(include_replicas=args.include_replicas)
+    print("Schema initialized")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,130 @@
+import os
+import threading
+import time
+from typing import Any, Dict
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from dotenv import load_dotenv
+
+load_dotenv()
+
+# Optional per-service prefix, e.g. SERVICE_NAME=todo reads TODO_DB_POOL_SIZE before DB_POOL_SIZE
+SERVICE_NAME = os.getenv("SERVICE_NAME", "")
+
+_POOL_SETTINGS = {
+    "pool_size": ("DB_POOL_SIZE", int),
+    "max_overflow": ("DB_MAX_OVERFLOW", int),
+    "pool_timeout": ("DB_POOL_TIMEOUT", float),
+    "pool_recycle": ("DB_POOL_RECYCLE", int),
+    "pool_pre_ping": ("DB_POOL_PRE_PING", lambda value: value.lower() in ("1", "true", "yes")),
+}
+
+# Upper bounds (seconds) of the checkout latency histogram buckets
+LATENCY_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, float("inf"))
+
+def _setting(name: str):
+    if SERVICE_NAME:
+        value = os.getenv(f"{SERVICE_NAME.upper()}_{name}")
+        if value is not None:
+            return value
+    return os.getenv(name)
+
+def pool_options() -> Dict[str, Any]:
+    """ create_engine keyword arguments for every pool setting present in the environment """
+    options = {}
+    for option, (env_name, cast) in _POOL_SETTINGS.items():
+        value = _setting(env_name)
+        if value is not None:
+            options[option] = cast(value)
+    return options
+
+class PoolMetrics:
+    """ Connection pool counters and checkout latency histogram fed by pool events """
+
+    def __init__(self, engine: Engine):
+        self.engine = engine
+        self._lock = threading.Lock()
+        self.connects = 0
+        self.checkouts = 0
+        self.checkins = 0
+        self.invalidations = 0
+        self.wait_total = 0.0
+        self.wait_max = 0.0
+        self.buckets = [0] * len(LATENCY_BUCKETS)
+        self._attach(engine.pool)
+
+    def _attach(self, pool):
+        event.listen(pool, "connect", self._on_connect)
+        event.listen(pool, "checkout", self._on_checkout)
+        event.listen(pool, "checkin", self._on_checkin)
+        event.listen(pool, "invalidate", self._on_invalidate)
+        # Pools have no "before checkout" event, so time the public connect() call
+        # to capture how long callers queue for a connection.
+        acquire = pool.connect
+
+        def timed_connect():
+            started = time.perf_counter()
+            try:
+                return acquire()
+            finally:
+                self._observe_wait(time.perf_counter() - started)
+
+        pool.connect = timed_connect
+
+    def _on_connect(self, dbapi_connection, connection_record):
+        with self._lock:
+            self.connects += 1
+
+    def _on_checkout(self, dbapi_connection, connection_record, connection_proxy):
+        with self._lock:
+            self.checkouts += 1
+
+    def _on_checkin(self, dbapi_connection, connection_record):
+        with self._lock:
+            self.checkins += 1
+
+    def _on_invalidate(self, dbapi_connection, connection_record, exception):
+        with self._lock:
+            self.invalidations += 1
+
+    def _observe_wait(self, seconds: float):
+        with self._lock:
+            self.wait_total += seconds
+            self.wait_max = max(self.wait_max, seconds)
+            for i, bound in enumerate(LATENCY_BUCKETS):
+                if seconds <= bound:
+                    self.buckets[i] += 1
+                    break
+
+    def snapshot(self) -> Dict[str, Any]:
+        pool = self.engine.pool
+        with self._lock:
+            observed = sum(self.buckets)
+            return {
+                "pool_class": type(pool).__name__,
+                "size": pool.size() if hasattr(pool, "size") else None,
+                "checked_out": pool.checkedout() if hasattr(pool, "checkedout") else self.checkouts - self.checkins,
+                "overflow": pool.overflow() if hasattr(pool, "overflow") else None,
+                "connects": self.connects,
+                "checkouts": self.checkouts,
+                "invalidations": self.invalidations,
+                "wait_seconds_total": self.wait_total,
+                "wait_seconds_max": self.wait_max,
+                "wait_seconds_avg": self.wait_total / observed if observed else 0.0,
+                "checkout_latency_histogram": {
+                    ("+Inf" if bound == float("inf") else str(bound)): count
+                    for bound, count in zip(LATENCY_BUCKETS, self.buckets)
+                },
+            }
+
+_registry: Dict[str, PoolMetrics] = {}
+
+def instrument_engine(name: str, engine: Engine) -> PoolMetrics:
+    """ Start collecting pool metrics for an engine under the given name """
+    metrics = PoolMetrics(engine)
+    _registry[name] = metrics
+    return metrics
+
+def pool_snapshot() -> Dict[str, Dict[str, Any]]:
+    return {name: metrics.snapshot() for name, metrics in _registry.items()}
@@ -0,0 +1,212 @@
+""" Read replica routing: round-robin over healthy replicas with primary fallback,
+plus a per-client read-your-writes window that pins reads to the primary after a write.
+
+A write stamps its response with the time of the write, as the last_write cookie and the
+X-Last-Write header. A read that carries the stamp (the cookie, or the header echoed back
+by clients without a cookie jar) stays on the primary for READ_YOUR_WRITES_SECONDS. The
+stamp travels with the client, so the pin holds on every worker and behind proxies that
+share one address among many clients. Bearer-token callers that send neither are also
+pinned in this process's memory, keyed by their token.
+"""
+import hashlib
+import itertools
+import os
+import threading
+import time
+from typing import Any, Callable, Dict, List, Optional
+
+from fastapi import Request, Response
+from sqlalchemy import event, text
+from dotenv import load_dotenv
+
+from shared.cache import TTLCache
+from shared.database.pool import instrument_engine, pool_options
+
+load_dotenv()
+
+# Comma-separated replica URLs; empty keeps every query on the primary
+DATABASE_REPLICA_URLS = [url.strip() for url in os.getenv("DATABASE_REPLICA_URLS", "").split(",") if url.strip()]
+# Seconds after a client's write during which its reads stay on the primary
+READ_YOUR_WRITES_SECONDS = float(os.getenv("READ_YOUR_WRITES_SECONDS", "5"))
+# Seconds an unhealthy replica sits out before it is probed again
+REPLICA_RETRY_SECONDS = float(os.getenv("REPLICA_RETRY_SECONDS", "10"))
+REPLICA_PIN_CACHE_SIZE = int(os.getenv("REPLICA_PIN_CACHE_SIZE", "10000"))
+
+SAFE_METHODS = ("GET", "HEAD", "OPTIONS")
+LAST_WRITE_COOKIE = "last_write"
+LAST_WRITE_HEADER = "X-Last-Write"
+
+_pins = TTLCache(maxsize=REPLICA_PIN_CACHE_SIZE, ttl=READ_YOUR_WRITES_SECONDS)
+
+def client_key(request: Request) -> Optional[str]:
+    """ Identify a bearer-token caller for the in-process pin; None for anonymous callers,
+    whose client address may be a proxy's shared by everyone behind it """
+    authorization = request.headers.get("authorization")
+    if authorization:
+        return hashlib.sha256(authorization.encode("utf-8")).hexdigest()
+    return None
+
+def _last_write(request: Request) -> Optional[float]:
+    stamp = request.cookies.get(LAST_WRITE_COOKIE) or request.headers.get(LAST_WRITE_HEADER)
+    try:
+        return float(stamp)
+    except (TypeError, ValueError):
+        return None
+
+def pin_to_primary(request: Request, response: Optional[Response] = None):
+    if response is not None:
+        stamp = f"{time.time():.3f}"
+        response.set_cookie(LAST_WRITE_COOKIE, stamp, max_age=max(1, int(READ_YOUR_WRITES_SECONDS)), httponly=True, samesite="lax")
+        response.headers[LAST_WRITE_HEADER] = stamp
+    key = client_key(request)
+    if key is not None:
+        _pins.set(key, True)
+
+def is_pinned(request: Request) -> bool:
+    last_write = _last_write(request)
+    # Tolerate clock skew between workers in both directions, but no stamp pins for longer
+    # than the window: one far in the future is a client's invention, not a write of ours
+    if last_write is not None and abs(time.time() - last_write) < READ_YOUR_WRITES_SECONDS:
+        return True
+    key = client_key(request)
+    return key is not None and _pins.get(key) is not None
+
+def reads_from_replica(request: Request, response: Optional[Response] = None) -> bool:
+    """ Safe requests go to a replica unless the caller wrote recently; writes pin the caller
+    and, given the response, stamp it with the write time """
+    if request.method not in SAFE_METHODS:
+        pin_to_primary(request, response)
+        return False
+    return not is_pinned(request)
+
+class ReplicaSet:
+    """ Lazily built replica engines with passive and active health tracking.
+    A connection error marks a replica down; after REPLICA_RETRY_SECONDS it is probed again. """
+
+    def __init__(self, urls: List[str], create: Callable[..., Any], prefix: str = "replica"):
+        self.urls = urls
+        self._create = create
+        self._prefix = prefix
+        self._engines: Optional[List[Any]] = None
+        # Replicas start out due for a probe, so a dead one never serves a first request
+        self._down_until = [time.monotonic()] * len(urls)
+        self._reads = [0] * len(urls)
+        self._failures = [0] * len(urls)
+        self._fallbacks = 0
+        self._rotation = itertools.cycle(range(len(urls)))
+        self._lock = threading.Lock()
+
+    def __bool__(self) -> bool:
+        return bool(self.urls)
+
+    def engines(self) -> List[Any]:
+        with self._lock:
+            if self._engines is None:
+                self._engines = [self._build(index, url) for index, url in enumerate(self.urls)]
+            return self._engines
+
+    def _build(self, index: int, url: str):
+        engine = self._create(url, **pool_options())
+        sync_engine = getattr(engine, "sync_engine", engine)
+        instrument_engine(f"{self._prefix}{index}", sync_engine)
+
+        def on_error(context):
+            # Failed connects arrive without a connection; dropped ones are flagged as disconnects
+            if context.is_disconnect or context.connection is None:
+                self.mark_down(index)
+
+        event.listen(sync_engine, "handle_error", on_error)
+        return engine
+
+    def mark_down(self, index: int):
+        now = time.monotonic()
+        with self._lock:
+            # A failed probe is reported by both handle_error and the caller; count it once
+            if self._down_until[index] <= now:
+                self._failures[index] += 1
+            self._down_until[index] = now + REPLICA_RETRY_SECONDS
+
+    def _candidates(self):
+        """ Replica indexes in round-robin order, healthy first, then those due for a re-probe """
+        with self._lock:
+            start = next(self._rotation)
+        order = [(start + offset) % len(self.urls) for offset in range(len(self.urls))]
+        now = time.monotonic()
+        healthy = [index for index in order if self._down_until[index] == 0.0]
+        due = [index for index in order if 0.0 < self._down_until[index] <= now]
+        return healthy, due
+
+    def _chosen(self, index: int):
+        with self._lock:
+            self._down_until[index] = 0.0
+            self._reads[index] += 1
+        return self.engines()[index]
+
+    def _fallback(self):
+        with self._lock:
+            self._fallbacks += 1
+        return None
+
+    def reader(self):
+        """ A healthy replica engine, or None to read from the primary """
+        if not self.urls:
+            return None
+        engines = self.engines()
+        healthy, due = self._candidates()
+        if healthy:
+            return self._chosen(healthy[0])
+        for index in due:
+            try:
+                with engines[index].connect() as connection:
+                    connection.execute(text("SELECT 1"))
+            except Exception:
+                self.mark_down(index)
+                continue
+            return self._chosen(index)
+        return self._fallback()
+
+    async def areader(self):
+        """ Async counterpart of reader() for AsyncEngine replicas """
+        if not self.urls:
+            return None
+        engines = self.engines()
+        healthy, due = self._candidates()
+        if healthy:
+            return self._chosen(healthy[0])
+        for index in due:
+            try:
+                async with engines[index].connect() as connection:
+                    await connection.execute(text("SELECT 1"))
+            except Exception:
+                self.mark_down(index)
+                continue
+            return self._chosen(index)
+        return self._fallback()
+
+    def status(self) -> Dict[str, Any]:
+        now = time.monotonic()
+        with self._lock:
+            return {
+                "replicas": [
+                    {
+                        "index": index,
+                        "healthy": self._down_until[index] == 0.0,
+                        "retry_in_seconds": max(0.0, self._down_until[index] - now) if self._down_until[index] else 0.0,
+                        "reads": self._reads[index],
+                        "failures": self._failures[index],
+                    }
+                    for index in range(len(self.urls))
+                ],
+                "primary_fallbacks": self._fallbacks,
+                "read_your_writes_seconds": READ_YOUR_WRITES_SECONDS,
+                "pinned_clients": _pins.stats()["size"],
+            }
+
+_registry: Dict[str, ReplicaSet] = {}
+
+def register_replicas(name: str, replicas: ReplicaSet) -> ReplicaSet:
+    _registry[name] = replicas
+    return replicas
+
+def replica_snapshot() -> Dict[str, Dict[str, Any]]:
+    return {name: replicas.status() for name, replicas in _registry.items() if replicas}
@@ -1,19 +1,48 @@
 import os
+from typing import Optional
+
+from fastapi import Request, Response
 from sqlalchemy import create_engine
-from sqlalchemy.orm import sessionmaker
+from sqlalchemy.engine import Engine
+from sqlalchemy.orm import Session, sessionmaker
 from shared.database.base import Base
+from shared.database.pool import instrument_engine, pool_options
+from shared.database.replicas import DATABASE_REPLICA_URLS, ReplicaSet, reads_from_replica, register_replicas
 from dotenv import load_dotenv
 
-from app.user.models import User
-from app.todo.models import Todo
-from app.time.models import Schedule
-
 load_dotenv() 
 
 DATABASE_URL = os.getenv("DATABASE_URL")
+# "sync" serves routes from the threadpool; "async" uses shared.database.async_session
+DATABASE_MODE = os.getenv("DATABASE_MODE", "sync").lower()
+
+_engine: Optional[Engine] = None
+
+def get_engine() -> Engine:
+    """ Build the primary engine on first use rather than at import time """
+    global _engine
+    if _engine is None:
+        _engine = create_engine(DATABASE_URL, **pool_options())
+        instrument_engine("primary", _engine)
+    return _engine
+
+class LazySession(Session):
+    """ Session that binds to the primary engine the first time it needs a connection """
+
+    def get_bind(self, *args, **kwargs):
+        if self.bind is None:
+            self.bind = get_engine()
+        return super().get_bind(*args, **kwargs)
+
+SessionLocal = sessionmaker(class_=LazySession, autocommit=False, autoflush=False)
 
-engine = create_engine(DATABASE_URL)
-SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+def __getattr__(name: str):
+    # Keep `from shared.database.session import engine` working without eager construction
+    if name == "engine":
+        return get_engine()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+replicas = register_replicas("sync", ReplicaSet(DATABASE_REPLICA_URLS, create_engine))
 
 def get_db():
     db = SessionLocal()
@@ -22,7 +51,36 @@ def get_db():
     finally:
         db.close()
 
-def create_tables():
-    Base.metadata.create_all(bind=engine)
+def read_bind(request: Request, response: Optional[Response] = None) -> Optional[Engine]:
+    """ Replica engine for this request, or None for the primary (writes, pinned callers, no healthy replica) """
+    if replicas and reads_from_replica(request, response):
+        return replicas.reader()
+    return None
+
+def get_routed_db(request: Request, response: Response):
+    """ get_db variant that sends safe requests to a replica and everything else to the primary """
+    db = SessionLocal(bind=read_bind(request, response))
+    try:
+        yield db
+    finally:
+        db.close()
+
+def import_models():
+    """ Register every service's models on Base.metadata (only needed for schema management) """
+    import app.user.models.user  # noqa: F401
+    import app.user.models.deletion  # noqa: F401
+    import app.user.models.token  # noqa: F401
+    import app.todo.models.todo  # noqa: F401
+    import app.time.models.schedule  # noqa: F401
+    import app.time.models.rollup  # noqa: F401
+    import app.time.models.recurrence  # noqa: F401
+    import shared.changes.database  # noqa: F401
 
-create_tables()
\ No newline at end of file
+def create_tables(include_replicas: bool = False):
+    """ Create the schema on the primary; include_replicas also covers stand-in replicas
+    (separate SQLite files or containers) that are not fed by real replication. """
+    import_models()
+    Base.metadata.create_all(bind=get_engine())
+    if include_replicas:
+        for replica in replicas.engines():
+            Base.metadata.create_all(bind=replica)
@@ -0,0 +1,72 @@
+import csv
+import io
+import json
+import os
+from datetime import date, datetime
+from typing import AsyncIterator, Iterable, Iterator, Sequence
+
+from dotenv import load_dotenv
+from sqlalchemy import Select
+
+load_dotenv()
+
+EXPORT_FORMATS = {"ndjson": "application/x-ndjson", "csv": "text/csv"}
+# Rows fetched per server-side cursor round trip and encoded per response chunk
+EXPORT_BATCH_SIZE = int(os.getenv("EXPORT_BATCH_SIZE", "1000"))
+
+def _plain(value):
+    if isinstance(value, (date, datetime)):
+        return value.isoformat()
+    return value
+
+def _encode_batch(rows: Sequence, columns: Sequence[str], fmt: str) -> str:
+    if fmt == "csv":
+        buffer = io.StringIO()
+        csv.writer(buffer).writerows([[_plain(value) for value in row] for row in rows])
+        return buffer.getvalue()
+    return "".join(
+        json.dumps({column: _plain(value) for column, value in zip(columns, row)}) + "\n"
+        for row in rows
+    )
+
+def _header(columns: Sequence[str], fmt: str) -> str:
+    if fmt != "csv":
+        return ""
+    buffer = io.StringIO()
+    csv.writer(buffer).writerow(columns)
+    return buffer.getvalue()
+
+def encode_rows(partitions: Iterable[Sequence], columns: Sequence[str], fmt: str) -> Iterator[str]:
+    """ Encode row batches one at a time so only a single batch is ever held in memory """
+    header = _header(columns, fmt)
+    if header:
+        yield header
+    for rows in partitions:
+        yield _encode_batch(rows, columns, fmt)
+
+def stream_query(stmt: Select, fmt: str, bind=None) -> Iterator[str]:
+    """ Run stmt on its own session with a server-side cursor and yield encoded chunks.
+    The session outlives the request handler, so it is opened and closed here;
+    bind selects a replica engine, None the primary. """
+    from shared.database.session import SessionLocal
+
+    columns = [column.key for column in stmt.selected_columns]
+    db = SessionLocal(bind=bind)
+    try:
+        result = db.execute(stmt.execution_options(yield_per=EXPORT_BATCH_SIZE))
+        yield from encode_rows(result.partitions(), columns, fmt)
+    finally:
+        db.close()
+
+async def astream_query(stmt: Select, fmt: str, bind=None) -> AsyncIterator[str]:
+    """ Async counterpart of stream_query using AsyncSession.stream """
+    from shared.database.async_session import AsyncSessionLocal, get_async_engine
+
+    columns = [column.key for column in stmt.selected_columns]
+    header = _header(columns, fmt)
+    if header:
+        yield header
+    async with AsyncSessionLocal(bind=bind if bind is not None else get_async_engine()) as db:
+        result = await db.stream(stmt.execution_options(yield_per=EXPORT_BATCH_SIZE))
+        async for rows in result.partitions():
+            yield _encode_batch(rows, columns, fmt)
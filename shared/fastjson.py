@@ -0,0 +1,45 @@
+import os
+from typing import Any, Sequence
+
+from dotenv import load_dotenv
+from fastapi.responses import Response
+from pydantic_core import to_json
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - optional dependency
+    orjson = None
+
+load_dotenv()
+
+# Opt-in: serve list endpoints from column tuples instead of response_model validation
+FAST_SERIALIZATION = os.getenv("FAST_SERIALIZATION", "false").lower() in ("1", "true", "yes")
+
+def _orjson_safe_float(value: float) -> bool:
+    # FastAPI serializes response models with pydantic-core, which writes exponents
+    # as "1e+16" where orjson writes "1e16"; below that the two agree exactly.
+    return abs(value) < 1e16
+
+def dumps(content: Any, floats: Sequence[float] = ()) -> bytes:
+    """ Encode exactly like FastAPI's response_model path, using orjson when that is byte-identical """
+    if orjson is not None and all(_orjson_safe_float(value) for value in floats):
+        return orjson.dumps(content, option=orjson.OPT_UTC_Z)
+    return to_json(content)
+
+def rows_to_dicts(fields: Sequence[str], rows: Sequence[Sequence]) -> list:
+    return [dict(zip(fields, row)) for row in rows]
+
+def rows_response(fields: Sequence[str], rows: Sequence[Sequence], float_columns: Sequence[int] = (), wrap=None) -> Response:
+    """ JSON list response built straight from column tuples ordered like the response model.
+    float_columns are coerced to float (as pydantic would) and checked for orjson parity;
+    wrap, when given, receives the list and returns the final payload. """
+    if float_columns:
+        rows = [list(row) for row in rows]
+        for row in rows:
+            for index in float_columns:
+                row[index] = float(row[index])
+    floats = [row[index] for row in rows for index in float_columns]
+    content = rows_to_dicts(fields, rows)
+    if wrap is not None:
+        content = wrap(content)
+    return Response(content=dumps(content, floats), media_type="application/json")
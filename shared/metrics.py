@@ -0,0 +1,236 @@
+""" Per-request latency and SQL instrumentation, rendered in the Prometheus text format.
+
+RequestMetricsMiddleware opens a per-request scope in a context variable; engine-level
+cursor events (registered on the Engine class, so every primary, replica and async engine
+is covered) add query counts and database time to it. Sync routes run in the threadpool
+with a copy of the request context, so their queries land in the same scope.
+"""
+import logging
+import os
+import threading
+import time
+from collections import Counter, deque
+from contextvars import ContextVar
+from typing import Any, Dict, List, Optional, Tuple
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from dotenv import load_dotenv
+
+from shared.database.pool import pool_snapshot
+
+load_dotenv()
+
+logger = logging.getLogger(__name__)
+
+METRICS_ENABLED = os.getenv("METRICS_ENABLED", "true").lower() in ("1", "true", "yes")
+# Statements slower than this are counted and kept as samples
+SLOW_QUERY_MS = float(os.getenv("SLOW_QUERY_MS", "100"))
+SLOW_QUERY_SAMPLES = int(os.getenv("SLOW_QUERY_SAMPLES", "50"))
+# Log when one request runs the same statement more than this many times; 0 disables
+N_PLUS_ONE_THRESHOLD = int(os.getenv("N_PLUS_ONE_THRESHOLD", "0"))
+
+# Upper bounds (seconds) for request and per-request database time histograms
+DURATION_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, float("inf"))
+# Upper bounds for the per-request query count histogram
+QUERY_COUNT_BUCKETS = (0, 1, 2, 3, 5, 10, 20, 50, 100, float("inf"))
+
+class RequestStats:
+    """ SQL activity of one request """
+
+    __slots__ = ("queries", "db_seconds", "statements")
+
+    def __init__(self):
+        self.queries = 0
+        self.db_seconds = 0.0
+        self.statements: Counter = Counter()
+
+_current: ContextVar[Optional[RequestStats]] = ContextVar("request_stats", default=None)
+# Raw request path, attached to slow-query samples
+_current_path: ContextVar[Optional[str]] = ContextVar("request_path", default=None)
+
+class Histogram:
+    __slots__ = ("bounds", "counts", "total", "observations")
+
+    def __init__(self, bounds: Tuple[float, ...]):
+        self.bounds = bounds
+        self.counts = [0] * len(bounds)
+        self.total = 0.0
+        self.observations = 0
+
+    def observe(self, value: float):
+        self.total += value
+        self.observations += 1
+        for i, bound in enumerate(self.bounds):
+            if value <= bound:
+                self.counts[i] += 1
+                break
+
+class MetricsRegistry:
+    """ Process-wide counters and histograms; every uvicorn worker keeps its own """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.requests: Counter = Counter()
+        self.durations: Dict[Tuple[str, str], Histogram] = {}
+        self.query_counts: Dict[Tuple[str, str], Histogram] = {}
+        self.db_durations: Dict[Tuple[str, str], Histogram] = {}
+        self.n_plus_one: Counter = Counter()
+        self.queries = 0
+        self.query_seconds = 0.0
+        self.slow_queries = 0
+        self.slow_samples: deque = deque(maxlen=SLOW_QUERY_SAMPLES)
+
+    def observe_query(self, statement: str, seconds: float, stats: Optional[RequestStats], path: Optional[str]):
+        with self._lock:
+            self.queries += 1
+            self.query_seconds += seconds
+            if seconds * 1000 >= SLOW_QUERY_MS:
+                self.slow_queries += 1
+                self.slow_samples.append({
+                    "at": time.time(),
+                    "path": path,
+                    "duration_ms": seconds * 1000,
+                    "statement": statement[:1000],
+                })
+        if stats is not None:
+            stats.queries += 1
+            stats.db_seconds += seconds
+            stats.statements[statement] += 1
+
+    def observe_request(self, method: str, route: str, status: int, seconds: float, stats: RequestStats):
+        key = (method, route)
+        with self._lock:
+            self.requests[(method, route, str(status))] += 1
+            self.durations.setdefault(key, Histogram(DURATION_BUCKETS)).observe(seconds)
+            self.query_counts.setdefault(key, Histogram(QUERY_COUNT_BUCKETS)).observe(stats.queries)
+            self.db_durations.setdefault(key, Histogram(DURATION_BUCKETS)).observe(stats.db_seconds)
+        if N_PLUS_ONE_THRESHOLD:
+            repeated = [(statement, count) for statement, count in stats.statements.items() if count > N_PLUS_ONE_THRESHOLD]
+            if repeated:
+                with self._lock:
+                    self.n_plus_one[key] += 1
+            for statement, count in repeated:
+                logger.warning(
+                    "Possible N+1: %s %s ran a statement %d times: %s",
+                    method, route, count, " ".join(statement.split())[:300],
+                )
+
+    def slow_query_samples(self) -> List[Dict[str, Any]]:
+        with self._lock:
+            return list(self.slow_samples)
+
+    def render(self) -> str:
+        """ Prometheus text exposition format 0.0.4 """
+        lines: List[str] = []
+        with self._lock:
+            _family(lines, "http_requests_total", "counter", "Requests by method, route template and status")
+            for (method, route, status), count in sorted(self.requests.items()):
+                lines.append(f"http_requests_total{_labels(method=method, route=route, status=status)} {count}")
+            _histograms(lines, "http_request_duration_seconds", "Request latency", self.durations)
+            _histograms(lines, "http_request_db_queries", "SQL statements per request", self.query_counts)
+            _histograms(lines, "http_request_db_seconds", "Database time per request", self.db_durations)
+            _family(lines, "http_request_n_plus_one_total", "counter", "Requests that repeated a statement past N_PLUS_ONE_THRESHOLD")
+            for (method, route), count in sorted(self.n_plus_one.items()):
+                lines.append(f"http_request_n_plus_one_total{_labels(method=method, route=route)} {count}")
+            _family(lines, "db_queries_total", "counter", "SQL statements executed, in or out of requests")
+            lines.append(f"db_queries_total {self.queries}")
+            _family(lines, "db_query_seconds_total", "counter", "Time spent executing SQL")
+            lines.append(f"db_query_seconds_total {self.query_seconds}")
+            _family(lines, "db_slow_queries_total", "counter", f"Statements slower than {SLOW_QUERY_MS:g} ms")
+            lines.append(f"db_slow_queries_total {self.slow_queries}")
+        pools = pool_snapshot()
+        _family(lines, "db_pool_checked_out", "gauge", "Connections currently checked out")
+        for name, pool in pools.items():
+            lines.append(f"db_pool_checked_out{_labels(engine=name)} {pool['checked_out'] or 0}")
+        _family(lines, "db_pool_connects_total", "counter", "New DBAPI connections opened")
+        for name, pool in pools.items():
+            lines.append(f"db_pool_connects_total{_labels(engine=name)} {pool['connects']}")
+        return "\n".join(lines) + "\n"
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+def _labels(**labels: str) -> str:
+    return "{" + ",".join(f'{key}="{_escape(str(value))}"' for key, value in labels.items()) + "}"
+
+def _family(lines: List[str], name: str, kind: str, help_text: str):
+    lines.append(f"# HELP {name} {help_text}")
+    lines.append(f"# TYPE {name} {kind}")
+
+def _histograms(lines: List[str], name: str, help_text: str, histograms: Dict[Tuple[str, str], Histogram]):
+    _family(lines, name, "histogram", help_text)
+    for (method, route), histogram in sorted(histograms.items()):
+        cumulative = 0
+        for bound, count in zip(histogram.bounds, histogram.counts):
+            cumulative += count
+            le = "+Inf" if bound == float("inf") else f"{bound:g}"
+            lines.append(f"{name}_bucket{_labels(method=method, route=route, le=le)} {cumulative}")
+        lines.append(f"{name}_sum{_labels(method=method, route=route)} {histogram.total}")
+        lines.append(f"{name}_count{_labels(method=method, route=route)} {histogram.observations}")
+
+registry = MetricsRegistry()
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    conn.info.setdefault("metrics_started", []).append(time.perf_counter())
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    started = conn.info["metrics_started"].pop()
+    registry.observe_query(statement, time.perf_counter() - started, _current.get(), _current_path.get())
+
+def _handle_error(context):
+    # after_cursor_execute never fires for a failed statement; drop its start time
+    connection = context.connection
+    if connection is not None and connection.info.get("metrics_started"):
+        connection.info["metrics_started"].pop()
+
+if METRICS_ENABLED:
+    event.listen(Engine, "before_cursor_execute", _before_cursor_execute)
+    event.listen(Engine, "after_cursor_execute", _after_cursor_execute)
+    event.listen(Engine, "handle_error", _handle_error)
+
+def route_template(scope) -> str:
+    """ Label a matched request by its path template, e.g. /todos/{todo_id}, by folding the
+    matched path parameters back into the concrete path (router prefixes included). """
+    if scope.get("route") is None:
+        return "unmatched"
+    segments = scope["path"].split("/")
+    position = 0
+    for name, value in scope.get("path_params", {}).items():
+        for index in range(position, len(segments)):
+            if segments[index] == str(value):
+                segments[index] = "{" + name + "}"
+                position = index + 1
+                break
+    return "/".join(segments)
+
+class RequestMetricsMiddleware:
+    """ ASGI middleware timing each request until its last body chunk is sent, so streamed
+    exports are measured in full. Routes are labelled by template, e.g. /todos/{todo_id}. """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or not METRICS_ENABLED:
+            await self.app(scope, receive, send)
+            return
+        stats = RequestStats()
+        stats_token = _current.set(stats)
+        path_token = _current_path.set(scope.get("path"))
+        status = 500
+
+        async def send_with_status(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+
+        started = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            elapsed = time.perf_counter() - started
+            _current.reset(stats_token)
+            _current_path.reset(path_token)
+            registry.observe_request(scope["method"], route_template(scope), status, elapsed, stats)
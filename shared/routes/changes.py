@@ -0,0 +1,99 @@
+""" Server-sent events stream of committed todo, schedule and recurrence changes.
+
+    GET /changes/stream?topics=todos,schedules
+
+Each event is "id: <change id>", "event: <topic>" and a JSON data line
+{"action": ..., "id": <entity id>, "data": {...}}. Browsers' EventSource reconnects on its
+own and sends Last-Event-ID; the stream then replays what was missed, or sends a "reset"
+event when the broker no longer has it and the client should refetch instead.
+"""
+import asyncio
+import os
+from contextlib import asynccontextmanager
+from typing import Optional
+
+from dotenv import load_dotenv
+from fastapi import APIRouter, Header, HTTPException, Query
+from fastapi.responses import StreamingResponse
+from starlette.concurrency import run_in_threadpool
+
+from shared.changes.broker import Change
+from shared.changes.feed import CHANGES_ENABLED, TOPICS, get_broker
+
+load_dotenv()
+
+# Idle seconds before a comment line is sent to keep proxies from closing the stream
+CHANGE_KEEPALIVE_SECONDS = float(os.getenv("CHANGE_KEEPALIVE_SECONDS", "15"))
+# Reconnect delay suggested to EventSource clients, in milliseconds
+CHANGE_RETRY_MS = int(os.getenv("CHANGE_RETRY_MS", "2000"))
+
+@asynccontextmanager
+async def _build_broker(app):
+    # Build the broker at startup, so a bad CHANGE_BROKER fails here and not at the first commit
+    if CHANGES_ENABLED:
+        get_broker()
+    yield
+
+router = APIRouter(prefix="/changes", tags=["changes"], lifespan=_build_broker)
+
+def _frame(change: Change) -> str:
+    entity_id = "null" if change.entity_id is None else change.entity_id
+    return (
+        f"id: {change.id}\nevent: {change.topic}\n"
+        f'data: {{"action":"{change.action}","id":{entity_id},"data":{change.data}}}\n\n'
+    )
+
+async def _events(broker, topics: Optional[set], last_event_id: Optional[int]):
+    # Subscribe before reading the backlog so nothing committed in between is missed
+    subscription = broker.subscribe(topics)
+    try:
+        yield f"retry: {CHANGE_RETRY_MS}\n\n"
+        replayed = set()
+        if last_event_id is not None:
+            backlog = await run_in_threadpool(broker.backlog, last_event_id)
+            if backlog is None:
+                yield "event: reset\ndata: {}\n\n"
+            else:
+                for change in backlog:
+                    replayed.add(change.id)
+                    if subscription.wants(change):
+                        yield _frame(change)
+        while True:
+            # A subscriber that overflowed is closed once its queue drains; the client
+            # reconnects with Last-Event-ID and the gap is replayed from the log
+            if subscription.overflowed and subscription.queue.empty():
+                return
+            try:
+                change = await asyncio.wait_for(subscription.queue.get(), CHANGE_KEEPALIVE_SECONDS)
+            except asyncio.TimeoutError:
+                yield ": keepalive\n\n"
+                continue
+            if change.id in replayed:
+                continue
+            yield _frame(change)
+    finally:
+        broker.unsubscribe(subscription)
+
+@router.get("/stream")
+async def stream_changes(
+    topics: Optional[str] = Query(None, description="Comma-separated topics; all when omitted"),
+    last_event_id: Optional[int] = Query(None, description="Resume point for clients that cannot send Last-Event-ID"),
+    last_event_id_header: Optional[str] = Header(None, alias="Last-Event-ID"),
+):
+    """ Stream changes as they commit, resuming after Last-Event-ID when given """
+    selected = None
+    if topics:
+        selected = {topic.strip() for topic in topics.split(",") if topic.strip()}
+        unknown = selected - set(TOPICS)
+        if unknown:
+            raise HTTPException(status_code=400, detail=f"Unknown topics: {', '.join(sorted(unknown))}")
+    if last_event_id_header:
+        try:
+            last_event_id = int(last_event_id_header)
+        except ValueError:
+            raise HTTPException(status_code=400, detail="Last-Event-ID must be an integer")
+    return StreamingResponse(
+        _events(get_broker(), selected, last_event_id),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
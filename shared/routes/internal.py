@@ -0,0 +1,29 @@
+from fastapi import APIRouter
+
+from shared.changes.feed import get_broker
+from shared.database.pool import pool_snapshot
+from shared.database.replicas import replica_snapshot
+from shared.metrics import registry
+
+router = APIRouter(prefix="/internal", tags=["internal"])
+
+@router.get("/pool")
+def read_pool_metrics():
+    """ Connection pool occupancy, overflow and checkout latency for every engine in this process """
+    return pool_snapshot()
+
+
+@router.get("/replicas")
+def read_replica_status():
+    """ Replica health, read counts and primary fallbacks for every configured replica set """
+    return replica_snapshot()
+
+@router.get("/slow-queries")
+def read_slow_queries():
+    """ Most recent statements slower than SLOW_QUERY_MS, with the request path that ran them """
+    return registry.slow_query_samples()
+
+@router.get("/changes")
+def read_change_feed_status():
+    """ Change feed broker in this process: subscribers, events published and overflowed subscribers """
+    return get_broker().stats()
@@ -0,0 +1,11 @@
+from fastapi import APIRouter
+from fastapi.responses import PlainTextResponse
+
+from shared.metrics import registry
+
+router = APIRouter(tags=["internal"])
+
+@router.get("/metrics", response_class=PlainTextResponse)
+def read_metrics():
+    """ Request latency, per-request SQL counts and database time in Prometheus text format """
+    return PlainTextResponse(registry.render(), media_type="text/plain; version=0.0.4")
@@ -0,0 +1,14 @@
+""" Response schemas shared by the services' batch endpoints """
+from typing import List, Optional
+
+from pydantic import BaseModel
+
+class BatchItemResult(BaseModel):
+    """ Outcome of one batch item, by its position in the request. status is the action taken
+    (created, updated, deleted), not_found, or duplicate for a repeat of an earlier item. """
+    index: int
+    id: Optional[int] = None
+    status: str
+
+class BatchResult(BaseModel):
+    results: List[BatchItemResult]
@@ -0,0 +1,29 @@
+import os
+import tempfile
+
+# Configure before any app module reads its settings at import time
+_db_dir = tempfile.mkdtemp()
+os.environ["DATABASE_URL"] = f"sqlite:///{_db_dir}/test.db"
+os.environ.setdefault("JWT_SECRET_KEY", "test-secret")
+os.environ["HASH_WORKERS"] = "0"
+os.environ["BCRYPT_ROUNDS"] = "4"
+os.environ["METRICS_ENABLED"] = "false"
+os.environ["USER_PURGE_IN_PROCESS"] = "false"
+
+import pytest
+from fastapi.testclient import TestClient
+
+from shared.database.base import Base
+from shared.database.session import create_tables, get_engine
+
+@pytest.fixture
+def client():
+    from app.main import app
+    from app.user.auth.cache import token_cache, user_cache
+
+    Base.metadata.drop_all(bind=get_engine())
+    create_tables()
+    user_cache.clear()
+    token_cache.clear()
+    with TestClient(app) as test_client:
+        yield test_client
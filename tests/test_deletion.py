@@ -0,0 +1,29 @@
+from app.user.models.deletion import UserDeletion
+from app.user.purge import PurgeWorker
+from shared.database.session import SessionLocal
+
+def register_and_login(client, username: str):
+    user = client.post("/users/register", json={"username": username, "email": f"{username}@example.com", "password": "secret"}).json()
+    tokens = client.post("/users/login", json={"username": username, "password": "secret"}).json()
+    return user["id"], {"Authorization": f"Bearer {tokens['access_token']}"}
+
+def test_finished_job_of_a_previous_user_is_not_inherited(client):
+    # A database that reuses ids leaves the old user's finished job under the new user's id
+    user_id, headers = register_and_login(client, "alice")
+    with SessionLocal() as db:
+        db.add(UserDeletion(user_id=user_id, username="previous", status="done", todos_deleted=3, schedules_deleted=0, recurrences_deleted=0))
+        db.commit()
+
+    assert client.put(f"/users/{user_id}/deactivate", headers=headers).status_code == 200
+    assert client.put(f"/users/{user_id}/activate", headers=headers).status_code == 200
+
+    deletion = client.delete(f"/users/{user_id}", headers=headers).json()["deletion"]
+    assert (deletion["status"], deletion["username"], deletion["todos_deleted"]) == ("pending", "alice", 0)
+    assert PurgeWorker().run_pending() == 1
+    assert client.post("/users/login", json={"username": "alice", "password": "secret"}).status_code == 401
+
+def test_purged_user_id_is_not_reused(client):
+    user_id, headers = register_and_login(client, "alice")
+    client.delete(f"/users/{user_id}", headers=headers)
+    PurgeWorker().run_pending()
+    assert register_and_login(client, "bob")[0] > user_id
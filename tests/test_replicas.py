@@ -0,0 +1,20 @@
+from fastapi import Request, Response
+
+from shared.database.replicas import LAST_WRITE_HEADER, reads_from_replica
+
+def make_request(method: str, headers: dict = None, client=("10.0.0.1", 1234)) -> Request:
+    raw = [(name.lower().encode(), value.encode()) for name, value in (headers or {}).items()]
+    return Request({"type": "http", "method": method, "path": "/", "headers": raw, "client": client})
+
+def test_write_stamp_pins_reads_on_any_worker():
+    response = Response()
+    assert not reads_from_replica(make_request("POST"), response)
+    stamp = response.headers[LAST_WRITE_HEADER]
+    assert "last_write=" in response.headers["set-cookie"]
+    assert not reads_from_replica(make_request("GET", {"Cookie": f"last_write={stamp}"}))
+    assert not reads_from_replica(make_request("GET", {LAST_WRITE_HEADER: stamp}))
+
+def test_anonymous_write_does_not_pin_others_behind_the_same_proxy():
+    reads_from_replica(make_request("POST"), Response())
+    assert reads_from_replica(make_request("GET"))
+    assert reads_from_replica(make_request("GET", {LAST_WRITE_HEADER: "9999999999"}))
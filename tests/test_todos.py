@@ -0,0 +1,32 @@
+def test_updates_within_one_second_change_the_etags(client):
+    todo_id = client.post("/todos/", json={"title": "first"}).json()["id"]
+    single = client.get(f"/todos/{todo_id}").headers["etag"]
+    collection = client.get("/todos/").headers["etag"]
+
+    assert client.put(f"/todos/{todo_id}", json={"title": "second"}).status_code == 200
+    assert client.get(f"/todos/{todo_id}", headers={"If-None-Match": single}).status_code == 200
+    assert client.get("/todos/", headers={"If-None-Match": collection}).status_code == 200
+
+    single = client.get(f"/todos/{todo_id}").headers["etag"]
+    collection = client.get("/todos/").headers["etag"]
+    assert client.patch("/todos/batch", json={"items": [{"id": todo_id, "completed": True}]}).status_code == 200
+    assert client.get(f"/todos/{todo_id}", headers={"If-None-Match": single}).status_code == 200
+    assert client.get("/todos/", headers={"If-None-Match": collection}).status_code == 200
+
+def test_unchanged_todo_answers_304(client):
+    todo_id = client.post("/todos/", json={"title": "first"}).json()["id"]
+    etag = client.get(f"/todos/{todo_id}").headers["etag"]
+    assert client.get(f"/todos/{todo_id}", headers={"If-None-Match": etag}).status_code == 304
+
+def test_explicit_null_is_rejected_for_required_fields(client):
+    todo_id = client.post("/todos/", json={"title": "first"}).json()["id"]
+    assert client.put(f"/todos/{todo_id}", json={"title": None}).status_code == 422
+    assert client.put(f"/todos/{todo_id}", json={"completed": None}).status_code == 422
+    assert client.patch("/todos/batch", json={"items": [{"id": todo_id, "completed": None}]}).status_code == 422
+    assert client.put(f"/todos/{todo_id}", json={"description": None}).status_code == 200
+    assert client.get(f"/todos/{todo_id}").json()["completed"] is False
+
+def test_batch_delete_reports_repeated_ids_as_duplicate(client):
+    todo_id = client.post("/todos/", json={"title": "first"}).json()["id"]
+    response = client.request("DELETE", "/todos/batch", json={"ids": [todo_id, todo_id, todo_id + 1]})
+    assert [item["status"] for item in response.json()["results"]] == ["deleted", "duplicate", "not_found"]
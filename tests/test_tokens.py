@@ -0,0 +1,53 @@
+from app.user.purge import PurgeWorker
+
+def register(client, username: str) -> dict:
+    response = client.post("/users/register", json={"username": username, "email": f"{username}@example.com", "password": "secret"})
+    assert response.status_code == 200, response.text
+    return response.json()
+
+def login(client, username: str) -> dict:
+    response = client.post("/users/login", json={"username": username, "password": "secret"})
+    assert response.status_code == 200, response.text
+    return response.json()
+
+def refresh(client, tokens: dict):
+    return client.post("/users/token/refresh", json={"refresh_token": tokens["refresh_token"]})
+
+def me(client, tokens: dict):
+    return client.get("/users/me", headers={"Authorization": f"Bearer {tokens['access_token']}"})
+
+def test_refresh_rotates_and_reuse_revokes_the_family(client):
+    register(client, "alice")
+    first = login(client, "alice")
+    second = refresh(client, first).json()
+    third = refresh(client, second).json()
+    assert me(client, third).status_code == 200
+
+    reused = refresh(client, first)
+    assert reused.status_code == 401
+    assert "reuse" in reused.json()["detail"]
+    assert refresh(client, third).status_code == 401
+    assert me(client, third).status_code == 401
+
+def test_logout_revokes_only_that_session(client):
+    register(client, "alice")
+    phone, laptop = login(client, "alice"), login(client, "alice")
+
+    assert client.post("/users/token/revoke", json={"refresh_token": phone["refresh_token"]}).status_code == 200
+    assert me(client, phone).status_code == 401
+    assert refresh(client, phone).status_code == 401
+    assert me(client, laptop).status_code == 200
+    assert refresh(client, laptop).status_code == 200
+
+def test_deleted_users_tokens_do_not_open_a_reregistered_account(client):
+    old_id = register(client, "alice")["id"]
+    tokens = login(client, "alice")
+    headers = {"Authorization": f"Bearer {tokens['access_token']}"}
+    assert client.delete(f"/users/{old_id}", headers=headers).status_code == 202
+    assert refresh(client, tokens).status_code == 401
+    PurgeWorker().run_pending()
+
+    assert register(client, "alice")["id"] != old_id
+    assert refresh(client, tokens).status_code == 401
+    assert me(client, tokens).status_code == 401
+    assert me(client, login(client, "alice")).status_code == 200